@@ -0,0 +1,113 @@
+from collections import deque
+from math import ceil
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from timeout_session import new_session # type: ignore
+
+from .utils.debug import Debug
+
+from .constants import SPANSH_RESULTS, HTTP_TIMEOUTS, HTTP_DEFAULT_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF, HTTP_SAMPLES
+
+
+def percentile(values:list, pct:float) -> float:
+    """ Nearest rank percentile of some sorted values """
+    if values == []: return 0.0
+    return values[max(0, ceil(pct / 100 * len(values)) - 1)]
+
+
+class Endpoint:
+    """
+        Requests to one kind of endpoint with its default timeout. It uses the session's methods as they
+        were when it was made so a request on another thread gets the same session throughout.
+    """
+    def __init__(self, client:'HttpClient', name:str) -> None:
+        self.client:HttpClient = client
+        self.name:str = name
+        self._get:Callable = client.session.get
+        self._post:Callable = client.session.post
+
+
+    def get(self, url:str, **kwargs) -> Response:
+        return self.client.request(self.name, self._get, url, **kwargs)
+
+
+    def post(self, url:str, **kwargs) -> Response:
+        return self.client.request(self.name, self._post, url, **kwargs)
+
+
+class HttpClient:
+    """
+        All the plugin's HTTP traffic goes through one keep-alive session (gzip is requested by default),
+        so repeat requests to a host reuse its connection. GETs are retried with a backoff on connection
+        errors and busy servers, each kind of request has its own timeout and is timed. Results polls give up
+        on a slow reply themselves and ask again, so their read timeouts are raised straight away, not retried.
+    """
+    def __init__(self, session:Any = None) -> None:
+        self.session:Any = session or new_session()
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        retry:Retry = Retry(total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF, status_forcelist=(429, 500, 502, 503, 504),
+                            allowed_methods=frozenset({'GET', 'HEAD'}), raise_on_status=False)
+        for adapter in getattr(self.session, 'adapters', {}).values():
+            adapter.max_retries = retry
+        if hasattr(self.session, 'mount'):
+            self.session.mount(SPANSH_RESULTS, HTTPAdapter(max_retries=retry.new(read=False)))
+
+        self.latency:dict = {} # Recent request times by endpoint
+        self.errors:dict = {}  # Failed requests by endpoint
+        self._lock:Lock = Lock()
+
+
+    def endpoint(self, name:str) -> Endpoint:
+        return Endpoint(self, name)
+
+
+    def get(self, name:str, url:str, **kwargs) -> Response:
+        return self.endpoint(name).get(url, **kwargs)
+
+
+    def post(self, name:str, url:str, **kwargs) -> Response:
+        return self.endpoint(name).post(url, **kwargs)
+
+
+    def request(self, name:str, method:Callable, url:str, **kwargs) -> Response:
+        """ Make a request with the endpoint's timeout, timing it """
+        kwargs.setdefault('timeout', HTTP_TIMEOUTS.get(name, HTTP_DEFAULT_TIMEOUT))
+        start:float = monotonic()
+        try:
+            response:Response = method(url, **kwargs)
+        except Exception:
+            with self._lock:
+                self.errors[name] = self.errors.get(name, 0) + 1
+            raise
+        with self._lock:
+            self.latency.setdefault(name, deque(maxlen=HTTP_SAMPLES)).append(monotonic() - start)
+        return response
+
+
+    def stats(self) -> dict:
+        """ Count, errors and 50th/90th/99th percentile seconds for each endpoint """
+        with self._lock:
+            samples:dict = {name: sorted(times) for name, times in self.latency.items()}
+            errors:dict = dict(self.errors)
+
+        return {name: {'count': len(samples.get(name, [])), 'errors': errors.get(name, 0),
+                       'p50': percentile(samples.get(name, []), 50),
+                       'p90': percentile(samples.get(name, []), 90),
+                       'p99': percentile(samples.get(name, []), 99)}
+                for name in sorted(samples.keys() | errors.keys())}
+
+
+    def report(self) -> None:
+        """ Log the request timings """
+        for name, s in self.stats().items():
+            Debug.logger.info(f"HTTP {name}: {s['count']} requests, {s['errors']} failed, "
+                              f"p50 {s['p50']*1000:.0f}ms p90 {s['p90']*1000:.0f}ms p99 {s['p99']*1000:.0f}ms")
+
+
+HTTP:HttpClient = HttpClient()
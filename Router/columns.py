@@ -0,0 +1,273 @@
+import re
+from array import array
+from collections.abc import Sequence
+from sys import intern
+from typing import Any, Callable, Iterator
+
+INT_RE:re.Pattern = re.compile(r"^(\d+)$")
+FLOAT_RE:re.Pattern = re.compile(r"^\d+\.(\d+)?$")
+
+class Flags:
+    """
+        Column of booleans stored as a bitset
+    """
+    def __init__(self, values:list) -> None:
+        self.size:int = len(values)
+        self.bits:bytearray = bytearray((self.size + 7) // 8)
+        for i, v in enumerate(values):
+            if v: self.bits[i >> 3] |= 1 << (i & 7)
+
+
+    def __len__(self) -> int:
+        return self.size
+
+
+    def __getitem__(self, i:int) -> bool:
+        if i < 0: i += self.size
+        if i < 0 or i >= self.size: raise IndexError("flag index out of range")
+        return bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+
+    def __setitem__(self, i:int, v:bool) -> None:
+        if not isinstance(v, bool): raise TypeError("flags only hold booleans")
+        if i < 0: i += self.size
+        if v: self.bits[i >> 3] |= 1 << (i & 7)
+        else: self.bits[i >> 3] &= ~(1 << (i & 7))
+
+
+    def __iter__(self) -> Iterator[bool]:
+        return (self[i] for i in range(self.size))
+
+
+class Strings:
+    """
+        Dictionary encoded column of strings, each row holds a code into a list of distinct values
+    """
+    def __init__(self, values:list) -> None:
+        self.values:list = [intern(v) for v in dict.fromkeys(values)]
+        self.index:dict = {v: i for i, v in enumerate(self.values)}
+        self.codes:array = array(self._typecode(len(self.values)), [self.index[v] for v in values])
+
+
+    def _typecode(self, n:int) -> str:
+        """ Smallest unsigned array type that can hold n codes """
+        return 'B' if n <= 0xFF else 'H' if n <= 0xFFFF else 'L'
+
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+    def __getitem__(self, i:int) -> str:
+        return self.values[self.codes[i]]
+
+
+    def __setitem__(self, i:int, v:str) -> None:
+        if not isinstance(v, str): raise TypeError("strings only hold str")
+        code:int|None = self.index.get(v)
+        if code is None:
+            code = len(self.values)
+            self.values.append(intern(v))
+            self.index[v] = code
+            if self._typecode(len(self.values)) != self.codes.typecode:
+                self.codes = array(self._typecode(len(self.values)), self.codes)
+        self.codes[i] = code
+
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.values[c] for c in self.codes)
+
+
+class Numbers:
+    """
+        Column mixing ints and floats, stored as floats with a bitset marking the cells that were ints
+        so they come back as ints
+    """
+    def __init__(self, values:list) -> None:
+        self.values:array = array('d', values)
+        self.ints:Flags = Flags([type(v) is int for v in values])
+
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+    def __getitem__(self, i:int) -> int|float:
+        v:float = self.values[i]
+        return int(v) if self.ints[i] else v
+
+
+    def __setitem__(self, i:int, v:int|float) -> None:
+        if type(v) not in (int, float): raise TypeError("numbers only hold ints and floats")
+        if type(v) is int and abs(v) > 2**53: raise OverflowError("int too large to hold exactly")
+        self.values[i] = v
+        self.ints[i] = type(v) is int
+
+
+    def __iter__(self) -> Iterator[int|float]:
+        return (self[i] for i in range(len(self.values)))
+
+
+def encode_column(values:list) -> Any:
+    """ Pick the most compact representation for a column of values """
+    types:set = set(map(type, values))
+
+    if types == {bool}:
+        return Flags(values)
+
+    if types == {int}:
+        lo:int = min(values)
+        hi:int = max(values)
+        if -2**31 <= lo and hi < 2**31: return array('i', values)
+        if -2**63 <= lo and hi < 2**63: return array('q', values)
+        return list(values)
+
+    if types == {float}:
+        return array('d', values)
+
+    if types == {int, float}:
+        if all(abs(v) <= 2**53 for v in values if type(v) is int): return Numbers(values)
+        return list(values)
+
+    if types == {str}:
+        if len(set(values)) <= len(values) // 2: return Strings(values)
+        # Mostly distinct, like system names, so codes would only add to the distinct values they index
+        return [intern(v) for v in values]
+
+    return list(values)
+
+
+class RowView(Sequence):
+    """
+        A single row of a ColumnStore, reads and writes go straight through to the columns
+    """
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store:'ColumnStore', row:int) -> None:
+        self.store:ColumnStore = store
+        self.row:int = row
+
+
+    def __len__(self) -> int:
+        return len(self.store.columns)
+
+
+    def __getitem__(self, col:Any) -> Any:
+        if isinstance(col, slice):
+            return [self.store.columns[c][self.row] for c in range(*col.indices(len(self)))]
+        return self.store.columns[col][self.row]
+
+
+    def __setitem__(self, col:int, val:Any) -> None:
+        self.store.set(self.row, col, val)
+
+
+    def __eq__(self, other:Any) -> bool:
+        if not isinstance(other, (list, tuple, RowView)): return NotImplemented
+        return list(self) == list(other)
+
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class ColumnStore(Sequence):
+    """
+        Columnar backing for a route. Behaves like the list of rows it replaces, but holds each column as a
+        numeric array, floats with a mask of the ints among them, a bitset, dictionary encoded (interned)
+        strings, interned strings, or a plain list for anything else.
+    """
+    def __init__(self, rows:list = [], columns:list|None = None) -> None:
+        self.columns:list = columns if columns is not None else \
+            [encode_column([r[c] for r in rows]) for c in range(len(rows[0]) if rows else 0)]
+        self.size:int = len(self.columns[0]) if self.columns else 0
+
+
+    def __len__(self) -> int:
+        return self.size
+
+
+    def __getitem__(self, i:Any) -> Any:
+        if isinstance(i, slice):
+            return [RowView(self, r) for r in range(*i.indices(self.size))]
+        if i < 0: i += self.size
+        if i < 0 or i >= self.size: raise IndexError("route index out of range")
+        return RowView(self, i)
+
+
+    def __eq__(self, other:Any) -> bool:
+        if not isinstance(other, (list, ColumnStore)): return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+
+    def column(self, col:int) -> list:
+        """ All the values of a column """
+        return list(self.columns[col])
+
+
+    def set(self, row:int, col:int, val:Any) -> None:
+        """ Update a single value, falling back to a plain list if it doesn't fit the column's type """
+        try:
+            self.columns[col][row] = val
+        except (TypeError, OverflowError):
+            self.columns[col] = list(self.columns[col])
+            self.columns[col][row] = val
+
+
+    def tolist(self) -> list:
+        """ The route as a list of row lists """
+        return [list(r) for r in zip(*self.columns)]
+
+
+def normalize_cell(val:Any) -> Any:
+    """ Turn a value that's written as an unsigned number into an int or a float rounded to 2 places """
+    txt:str = str(val)
+    if INT_RE.match(txt): return round(int(val), 2)
+    if FLOAT_RE.match(txt): return round(float(val), 2)
+    return val
+
+
+def _number(val:str) -> Any:
+    """ normalize_cell for a string that's probably a number """
+    if val.isdecimal(): return int(val)
+    whole, dot, frac = val.partition('.')
+    if dot and whole.isdecimal() and (frac == '' or frac.isdecimal()):
+        return float(val) if len(frac) <= 2 else round(float(val), 2) # Already as rounded as it gets
+    return normalize_cell(val)
+
+
+def _text(val:str) -> Any:
+    """ normalize_cell for a string that's probably text, which can only be a number if it starts with a digit """
+    return _number(val) if val[:1].isdecimal() else val
+
+
+def _float(val:float) -> Any:
+    """ normalize_cell for a float, whose str() is only plain digits between 1e-4 and 1e16 """
+    return round(val, 2) if 1e-4 <= val < 1e16 or val == 0 else normalize_cell(val)
+
+
+# ints and bools (and None) are never changed by normalize_cell
+UNCHANGED:frozenset = frozenset({int, bool, type(None)})
+
+def normalize_column(values:list, kind:str|None = None) -> list:
+    """
+        normalize_cell for a whole column. The column's kind ('int', 'float', 'str', ...) comes from the
+        schema or, without one, a sample of the values; either way each value gets the same result as
+        normalize_cell, the kind just picks the quickest way there.
+    """
+    sample:list = values[:64]
+    types:set = set(map(type, sample))
+    if types <= UNCHANGED and all(type(v) in UNCHANGED for v in values):
+        return values
+
+    if kind is None:
+        strs:list = [v for v in sample if type(v) is str]
+        kind = 'float' if strs and sum(v[:1].isdecimal() for v in strs) * 2 > len(strs) else 'str'
+    conv:dict[type, Callable] = {float: _float, str: _number if kind in ('int', 'float') else _text}
+
+    # All the same type, as columns read from a file always are
+    if len(types) == 1 and (t := types.pop()) in conv and all(type(v) is t for v in values):
+        fn:Callable = conv[t]
+        return [fn(v) for v in values]
+
+    return [v if (t := type(v)) in UNCHANGED else conv[t](v) if t in conv else normalize_cell(v) for v in values]
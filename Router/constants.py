@@ -21,6 +21,10 @@ UPDATE_CHECK_INTERVAL:int = (3600 * 24)
 
 # Coriolis Modules GH
 GH_MODULES:str = "https://raw.githubusercontent.com/Brighter-Applications/coriolis-data/master/modules"
+# The files we need from it and the key their modules are under
+MODULE_SOURCES:dict = {'fsd': 'standard/frame_shift_drive.json',
+                       'gfsb': 'internal/guardian_fsd_booster.json',
+                       'ft': 'standard/fuel_tank.json'}
 
 # Spansh URLs
 SPANSH_API:str = "https://spansh.co.uk/api"
@@ -39,10 +43,64 @@ SPANSH_SEARCH_SYSTEMS:str = f"{SPANSH_API}/search/systems"  # richer system sear
 
 # Directory we store our save data in
 DATA_DIR = 'data'
-SHIP_DIR = 'ships'
+SHIP_DIR = 'ships'              # One file per ship, replaced by the shipyard
+SHIPYARD = 'shipyard.json'      # Every ship's loadout, by ship id
+SHIPYARD_CACHE:int = 8          # Ships kept ready built
+PLOT_CACHE_DIR = 'plot_cache'
+ROUTE_SNAPSHOT = 'route.snap'    # The current route's table and indexes, written once per route
+ROUTE_BODY = 'route_body.json'  # Its earlier JSON form
+PROGRESS_LOG = 'progress.jsonl' # Append-only log of progress along it
+MODULE_DATA = 'module_data.json' # Module details indexed by symbol
+MODULE_META = 'module_meta.json' # Validators for each file they came from
+TYPEAHEAD_CACHE = 'typeahead.json' # Recent autocomplete suggestions
+SYSTEM_DUMP = 'systems.txt'     # Optional list of system names to complete offline, one per line or a Spansh dump
+
+# Plotted routes kept on disk: total size, how long each route type stays fresh (seconds), and the
+# params that don't change the result so aren't part of the key
+PLOT_CACHE_SIZE:int = 20 * 1024 * 1024
+PLOT_CACHE_TTL:dict = {'Neutron': 86400 * 30, 'Galaxy': 86400 * 30, 'Tourist': 86400 * 30,
+                       'FleetCarrier': 86400 * 7, 'Trade': 3600}
+PLOT_CACHE_DEFAULT_TTL:int = 86400 * 7
+PLOT_CACHE_IGNORE:tuple = ('max_time',)
+
+# Autocomplete suggestions kept: how many inputs, for how long (seconds), the shortest input that's looked
+# up and how many new inputs before they're saved
+TYPEAHEAD_CACHE_SIZE:int = 2000
+TYPEAHEAD_TTL:int = 86400 * 7
+TYPEAHEAD_MIN:int = 3
+TYPEAHEAD_SAVE_EVERY:int = 25
+# Spansh's typeahead replies are a bare list with no paging, this is the most it has been seen to send.
+# A reply with fewer is taken to be every match, so if Spansh ever sends fewer per page this must follow it.
+TYPEAHEAD_MAX_RESULTS:int = 10
 ASSET_DIR = 'assets'
 ROUTE_DIR = 'routes'
 
+# Jumps kept for speed statistics and the windows (in seconds, 0 is the whole session) they can cover
+JUMP_LOG_SIZE:int = 1000
+SPEED_WINDOWS:dict = {'quarter': 900, 'hour': 3600, 'session': 0}
+
+# Spansh job polling: first and longest gap between polls (seconds), how fast the gap grows,
+# and the extra time allowed on top of the plot's max_time before giving up
+POLL_MIN:float = 0.5
+POLL_MAX:float = 5.0
+POLL_BACKOFF:float = 1.5
+POLL_GRACE:float = 5.0
+POLL_READ:float = 1.0 # Read timeout for each poll, so a cancel is noticed this quickly
+
+# HTTP: timeout (seconds) for each kind of request, GET retries on connection errors and busy
+# servers and the backoff between them, and how many recent timings to keep per kind of request
+HTTP_TIMEOUTS:dict = {'plot': 10, 'results': 5, 'typeahead': 3, 'modules': 10, 'updater': 10}
+HTTP_DEFAULT_TIMEOUT:int = 10
+HTTP_RETRIES:int = 2
+HTTP_BACKOFF:float = 0.5
+HTTP_SAMPLES:int = 200
+
+# Bytes read at a time when streaming a plot result
+STREAM_CHUNK:int = 64 * 1024
+
+# Routes with at least this many rows are stored column by column to save memory
+COMPACT_ROUTE_ROWS:int = 5000
+
 FLEET_CARRIER_STATS:dict = {'fleet': {'capacity': 25000, 'mass': 25000}, 'squadron': {'capacity': 60000, 'mass': 15000}}
 
 # Font info
@@ -154,6 +212,9 @@ lbls:dict = {
     "jump": "jump",
     "jumps": "jumps",
     "range": "Ship Range",
+    "range_current": "Current: {r:.2f}ly",
+    "range_unladen": "Unladen: {r:.2f}ly",
+    "range_laden": "Laden: {r:.2f}ly",
     "waypoints": "waypoints",
     "distance": "distance",
     "total_distance": "Total Distance",
@@ -196,6 +257,8 @@ lbls:dict = {
     "loop": "Loop",
     "cooldown_complete": "Carrier cooldown completed",
     "plotting": "Plotting route, please wait ...",
+    "plot_elapsed": "{e}s elapsed",
+    "plot_remaining": "{e}s elapsed, about {r}s remaining",
     "progress": "Progress",
     "speed": "Speed",
     "jumps_per_hour": " jumps/hr",
@@ -209,6 +272,7 @@ lbls:dict = {
     "carrier_cooldown": "Carrier Cooldown",
     "next_refuel": "Refuel in {r}",
     "refuel_now": "Refuel now!",
+    "fuel_short": "Not enough fuel to reach {s} ({j} jumps)",
     "overlays": "Overlays",
     "router": "Router"
 }
@@ -313,7 +377,12 @@ cnf:dict = {
     "options": "Neutron Dancer Options",
     "select": "Select",
     "show_carrier_cooldown": "Show Carrier Cooldown Popup",
-    "routes_directory": "Default Route File Directory"
+    "bypass_plot_cache": "Always Plot Fresh Routes (Ignore Cached Routes)",
+    "routes_directory": "Default Route File Directory",
+    "speed_window": "Speed Statistics Cover",
+    "speed_quarter": "Last 15 Minutes",
+    "speed_hour": "Last Hour",
+    "speed_session": "Whole Session"
 }
 
 ovr:dict = {
@@ -1,5 +1,6 @@
 # pyright: reportAssignmentType=false
 import os
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from pathlib import Path
 import tkinter as tk
@@ -34,7 +35,8 @@ class Context:
     parent:tkWidget = None
 
     # Global variables
-    modules:list = field(default_factory=list) # Module details from Coriolis
+    modules:dict = field(default_factory=dict) # Module details from Coriolis, by lowercase symbol
+    modules_ready:Future = None # Made by the router, resolves on the main thread once the module details have been loaded
 
     # Global objects
     prefs:'Prefs' = None
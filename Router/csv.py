@@ -2,11 +2,11 @@ import ast
 import csv
 from pathlib import Path
 from tkinter import filedialog
-import re
 
 from config import config # type: ignore
 
-from .constants import HEADERS, ROUTE_DIR, errs
+from .constants import HEADERS, HEADER_TYPES, ROUTE_DIR, errs
+from .columns import ColumnStore, normalize_column
 from .utils.debug import Debug, catch_exceptions
 from .utils.misc import singleton
 from .context import Context
@@ -75,23 +75,15 @@ class CSV:
                     Debug.logger.error(f"File {filename} is of unsupported format")
                     return False
 
-                route:list = []
-                for row in route_reader:
-                    r:list = []
-                    if row in (None, "", []): continue
-                    for col in hdrs:
-                        if col not in row: continue
-                        if col in ["body_name", "body_subtype"]:
-                            r.append(ast.literal_eval(row[col]))
-                            continue
-                        if re.match(r"^(\d+)$", str(row[col])):
-                            r.append(round(int(row[col]), 2))
-                            continue
-                        if re.match(r"^\d+\.(\d+)?$", str(row[col])):
-                            r.append(round(float(row[col]), 2))
-                            continue
-                        r.append(row[col])
-                    route.append(r)
+                rows:list = [row for row in route_reader if row not in (None, "", [])]
+                columns:list = []
+                for col in hdrs:
+                    values:list = [row[col] for row in rows]
+                    if col in ["body_name", "body_subtype"]:
+                        columns.append([ast.literal_eval(v) for v in values])
+                        continue
+                    columns.append(normalize_column(values, HEADER_TYPES.get(col, [None])[0]))
+                route:list = [list(r) for r in zip(*columns)]
 
                 #self.fleetcarrier = True if "Fuel Used" in hdrs else False
                 #self.roadtoriches = True if "Estimated Scan Value" in hdrs else False
@@ -105,7 +97,7 @@ class CSV:
             return False
 
 
-    def write(self, headers:list, route:list) -> bool:
+    def write(self, headers:list, route:list|ColumnStore) -> bool:
         """ Export the route as a csv """
 
         if route == [] or headers == []:
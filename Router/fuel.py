@@ -0,0 +1,116 @@
+from array import array
+from dataclasses import dataclass, field
+
+from .route import Route
+from .ship import Ship
+
+
+def jump_fuel(ship:Ship, dist:float, mass:float, supercharge:int = 1) -> float:
+    """
+        Fuel a jump of dist ly uses at a given total mass. A supercharged jump covers supercharge times
+        the distance for the same fuel, and a guardian booster's extra range is treated as scaling the
+        distance the FSD itself has to cover, which is how it behaves near the top of its range.
+    """
+    d:float = dist / supercharge
+    if ship.range_boost:
+        base:float = (ship.optimal_mass / mass) * (ship.max_fuel_per_jump / ship.fuel_multiplier) ** (1 / ship.fuel_power)
+        d = d * base / (base + ship.range_boost)
+    return ship.fuel_multiplier * (d * mass / ship.optimal_mass) ** ship.fuel_power
+
+
+@dataclass
+class FuelPlan:
+    """
+        Fuel used getting to, and left on arriving at, each row of a route from `start` onwards,
+        and the rows we'd run out of fuel (or range) on the way to
+    """
+    start:int = 0
+    cargo:int = 0
+    fuel:float = 0
+    used:array = field(default_factory=lambda: array('d'))
+    left:array = field(default_factory=lambda: array('d'))
+    stranded:list = field(default_factory=list)
+
+
+    def at(self, row:int) -> tuple[float, float]:
+        """ Fuel used getting to a row and what's left on arrival """
+        return (self.used[row - self.start], self.left[row - self.start])
+
+
+class FuelSimulator:
+    """
+        Simulate the fuel burned jumping along the rest of a route. Rows with several jumps are split
+        into equal hops. Without a refuel column every hop is assumed to start with a scooped full tank,
+        otherwise the tank's only filled at rows flagged for refuelling.
+        The last plan is kept and when only the starting fuel or row changes just the jumps up to the
+        next refuel are simulated again since the tank's full from there on either way.
+    """
+    def __init__(self, route:Route, ship:Ship, supercharge:int|None = None) -> None:
+        self.route:Route = route
+        self.ship:Ship = ship
+        self.supercharge:int = supercharge or ship.supercharge_multiplier
+        self.plan:FuelPlan|None = None
+        self.simulated:int = 0 # Rows simulated, rather than reused, by the last run
+
+        self.scoop_every_hop:bool = route.colind('Refuel') is None and route.colind('Restock') is None
+        self.dists:list = [v if isinstance(v, (int, float)) else 0 for v in route.column(route.dc)]
+        self.hops:list = [max(1, v) if isinstance(v, int) else 1 for v in route.column(route.jc)]
+
+
+    def run(self, start:int, cargo:int, fuel:float) -> FuelPlan:
+        """ Plan the fuel from row start, with cargo on board and fuel in the main tank """
+        start = max(0, start)
+        plan:FuelPlan = FuelPlan(start, cargo, fuel)
+        prev:FuelPlan|None = self.plan
+        reuse:bool = prev is not None and prev.cargo == cargo and prev.start <= start
+
+        self.simulated = 0
+        tank:float = min(fuel, self.ship.tank_size)
+        plan.used.append(0.0) # The start row, nothing used to get there
+        plan.left.append(tank)
+        for row in range(start + 1, len(self.dists)):
+            # Past a refuel we'd be in the same state as last time so the rest is the same
+            if reuse and prev is not None and row - 1 > start and self._refuels(row - 1):
+                self._splice(plan, prev, row)
+                break
+
+            used, tank, stranded = self._row(row, cargo, tank)
+            plan.used.append(used)
+            plan.left.append(tank)
+            if stranded: plan.stranded.append(row)
+            self.simulated += 1
+            if self._refuels(row): tank = self.ship.tank_size
+
+        self.plan = plan
+        return plan
+
+
+    def _refuels(self, row:int) -> bool:
+        return self.scoop_every_hop or self.route.fuel_stop(row)
+
+
+    def _row(self, row:int, cargo:int, tank:float) -> tuple[float, float, bool]:
+        """ Jump to a row, returns the fuel used, the fuel left and whether we couldn't make it """
+        hops:int = self.hops[row] if self.hops else 1
+        dist:float = self.dists[row] / hops
+        used:float = 0
+        stranded:bool = False
+        for hop in range(hops):
+            if self.scoop_every_hop: tank = self.ship.tank_size
+            # A neutron star boosts the jump leaving it, the first hop from the row before
+            supercharge:int = self.supercharge if hop == 0 and row > 0 and self.route.neutron(row - 1) else 1
+            need:float = jump_fuel(self.ship, dist, self.ship.base_mass + cargo + tank, supercharge)
+            if need > self.ship.max_fuel_per_jump or need > tank:
+                stranded = True
+                tank = self.ship.tank_size # Assume it gets sorted out so later problems still show
+            used += need
+            tank -= need
+        return (used, max(tank, 0.0), stranded)
+
+
+    def _splice(self, plan:FuelPlan, prev:FuelPlan, row:int) -> None:
+        """ Copy the last plan from row onwards """
+        i:int = row - prev.start
+        plan.used.extend(prev.used[i:])
+        plan.left.extend(prev.left[i:])
+        plan.stranded.extend(r for r in prev.stranded if r >= row)
@@ -0,0 +1,190 @@
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator
+
+WHITESPACE:str = ' \t\n\r'
+ENDS:str = WHITESPACE + ',]}:'
+DECODER:json.JSONDecoder = json.JSONDecoder()
+STRUCTURE:re.Pattern = re.compile(r'["{}\[\]]') # Characters that open or close something
+STRING_END:re.Pattern = re.compile(r'["\\]')  # Characters that end or escape within a string
+
+
+class JsonStream:
+    """
+        Incremental reader over a JSON document that arrives in chunks. Only the value currently being
+        decoded is held in memory, so the items of a large array can be handled one at a time. A value
+        split over several chunks is scanned once as they arrive and only decoded when it's complete.
+    """
+    def __init__(self, chunks:Iterable[bytes|str]) -> None:
+        self.chunks:Iterator = iter(chunks)
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buf:str = ''
+        self.pos:int = 0
+        self.done:bool = False
+
+
+    def _chunk(self) -> str:
+        """ The next chunk of text """
+        try:
+            chunk = next(self.chunks)
+            return chunk if isinstance(chunk, str) else self.utf8.decode(chunk)
+        except StopIteration:
+            self.done = True
+            return self.utf8.decode(b'', final=True)
+
+
+    def _more(self) -> bool:
+        """ Read another chunk onto the buffer, False at the end of the document """
+        if self.done: return False
+        if self.pos > 0:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += self._chunk()
+        return True
+
+
+    def peek(self) -> str:
+        """ The next non-whitespace character, '' at the end of the document """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf): return self.buf[self.pos]
+            if not self._more(): return ''
+
+
+    def expect(self, char:str) -> None:
+        """ Consume the given character """
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at {self.pos} but found {self.buf[self.pos:self.pos+20]!r}")
+        self.pos += 1
+
+
+    def value(self) -> Any:
+        """ Decode the next complete value """
+        if self.peek() in ('{', '[', '"'):
+            try:
+                val, self.pos = DECODER.raw_decode(self.buf, self.pos)
+                return val
+            except json.JSONDecodeError:
+                if self.done: raise
+            return self._split_value()
+
+        while True:
+            try:
+                val, end = DECODER.raw_decode(self.buf, self.pos)
+                # A number (or true/false/null) is only complete once we can see what follows it
+                if self.done or (end < len(self.buf) and self.buf[end] in ENDS):
+                    self.pos = end
+                    return val
+            except json.JSONDecodeError:
+                if self.done: raise
+            self._more()
+
+
+    def _split_value(self) -> Any:
+        """ Decode an object, array or string that runs past the end of the buffer """
+        parts:list = []
+        depth:int = 0
+        in_str:bool = False
+        start:int = self.pos
+        i:int = self.pos
+        while True:
+            buf:str = self.buf
+            while True:
+                m:re.Match|None = (STRING_END if in_str else STRUCTURE).search(buf, i)
+                if m is None: break
+                c:str = m.group()
+                i = m.end()
+                if c == '\\':
+                    i += 1 # Skip whatever's escaped
+                elif c == '"':
+                    in_str = not in_str
+                elif c in '{[':
+                    depth += 1
+                else:
+                    depth -= 1
+                if depth == 0 and not in_str and i <= len(buf):
+                    parts.append(buf[start:i])
+                    self.pos = i
+                    return DECODER.decode(''.join(parts))
+
+            parts.append(buf[start:])
+            if self.done: return DECODER.decode(''.join(parts)) # Cut short, raises
+            i = max(0, i - len(buf)) # An escape at the very end skips the next chunk's first character
+            self.buf = self._chunk()
+            self.pos = start = 0
+
+
+    def items(self) -> Iterator[Any]:
+        """ Decode an array one item at a time """
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect(']')
+            return
+
+
+def iter_items(chunks:Iterable[bytes|str], *path:str|tuple) -> Iterator[Any]:
+    """
+        Yield the items of the array found by following path through nested objects. Each step is a
+        key or a tuple of keys to try in order, e.g. iter_items(chunks, 'result', ('jumps', 'system_jumps')).
+        Yields nothing if the path isn't there or doesn't lead to an array.
+    """
+    stream:JsonStream = JsonStream(chunks)
+    yield from _follow(stream, list(path))
+
+
+def _follow(stream:JsonStream, path:list) -> Iterator[Any]:
+    if not path:
+        if stream.peek() == '[': yield from stream.items()
+        return
+
+    if stream.peek() != '{': return
+    keys:tuple = path[0] if isinstance(path[0], tuple) else (path[0],)
+
+    # Remember values we skip in case a preferred key turns up after a fallback one
+    skipped:dict = {}
+    for key in _keys(stream):
+        if key == keys[0]:
+            yield from _follow(stream, path[1:])
+            return
+        val:Any = stream.value()
+        if key in keys: skipped[key] = val
+
+    for key in keys[1:]:
+        if key in skipped:
+            yield from _walk(skipped[key], path[1:])
+            return
+
+
+def _keys(stream:JsonStream) -> Iterator[str]:
+    """ Keys of the object at the current position, the caller consumes each value in between """
+    stream.expect('{')
+    if stream.peek() == '}':
+        stream.pos += 1
+        return
+    while True:
+        key:str = stream.value()
+        stream.expect(':')
+        yield key
+        if stream.peek() == ',':
+            stream.pos += 1
+            continue
+        stream.expect('}')
+        return
+
+
+def _walk(val:Any, path:list) -> Iterator[Any]:
+    """ _follow for a value that's already been decoded """
+    for step in path:
+        if not isinstance(val, dict): return
+        keys:tuple = step if isinstance(step, tuple) else (step,)
+        val = next((val[k] for k in keys if k in val), None)
+    if isinstance(val, list): yield from val
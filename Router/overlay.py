@@ -18,6 +18,7 @@ import edmc_data # type: ignore
 from .utils.debug import Debug, catch_exceptions
 from .utils.misc import singleton, hfplus, str_truncate
 from .context import Context
+from .route import RouteProgress
 from .constants import OVERLAY_PROGRESS_DEFAULT, CarrierStates, lbls, ovr, cnf, errs
 
 try:
@@ -90,11 +91,12 @@ class Overlay():
                 self.clear_frame('Carrier')
             return
 
+        prog:RouteProgress = Context.route.progress()
         primary:str = Context.route.next_stop()
         detail:str = Context.route.next_stop_station()
         wp:str = f"{primary} · {detail}" if detail else primary
-        if Context.route.jumps_to_wp() != 0:
-            wp += f" ({Context.route.jumps_to_wp()} {lbls['jumps'] if Context.route.jumps_to_wp() != 1 else lbls['jump']})"
+        if prog.jumps_to_wp != 0:
+            wp += f" ({prog.jumps_to_wp} {lbls['jumps'] if prog.jumps_to_wp != 1 else lbls['jump']})"
         # 40 is a guessed overlay width -- adjust if it looks off in-game.
         wp = str_truncate(wp, length=40, loc='right')
 
@@ -108,13 +110,7 @@ class Overlay():
             return
 
         if self.progress_bar:
-            prog:int = round(Context.route.perc_jumps_rem())
-            if Context.route.total_dist() > 0:
-                prog = round(Context.route.perc_dist_rem())
-            if Context.route.jumps_remaining() == 0:
-                prog = 100
-
-            message.insert(0, {'progressbar': prog, 'width': 200,'colour': self.ovfrs['Default'].text_colour})
+            message.insert(0, {'progressbar': prog.percent, 'width': 200,'colour': self.ovfrs['Default'].text_colour})
 
         if Context.route.tracks_refuel_or_neutron():
             # The following variables are available for the progress display:
@@ -135,24 +131,24 @@ class Overlay():
 
                 # Star type next stop {st}
 
-            jc:str = hfplus(tuple([Context.route.total_jumps() - Context.route.jumps_remaining(), 'int', '-' if Context.route.offset < 0 else '0']))
-            jr:str = hfplus(tuple([Context.route.jumps_remaining(), 'int', '0']))
-            jt:str = hfplus(tuple([Context.route.total_jumps(), 'int']))
+            jc:str = hfplus(tuple([prog.total_jumps - prog.jumps_remaining, 'int', '-' if prog.offset < 0 else '0']))
+            jr:str = hfplus(tuple([prog.jumps_remaining, 'int', '0']))
+            jt:str = hfplus(tuple([prog.total_jumps, 'int']))
 
-            dc:str = hfplus(tuple([Context.route.total_dist() - Context.route.dist_remaining(), 'float', '0']))
-            dr:str = hfplus(tuple([Context.route.dist_remaining(), 'float', '0']))
-            dt:str = hfplus(tuple([Context.route.total_dist(), 'float', '0']))
+            dc:str = hfplus(tuple([prog.total_dist - prog.dist_remaining, 'float', '0']))
+            dr:str = hfplus(tuple([prog.dist_remaining, 'float', '0']))
+            dt:str = hfplus(tuple([prog.total_dist, 'float', '0']))
 
-            dh:str = hfplus(tuple([Context.route.dist_per_hour(), 'float', '-']))
-            jh:str = hfplus(tuple([Context.route.jumps_per_hour(), 'float', '-']))
+            dh:str = hfplus(tuple([prog.dist_per_hour, 'float', '-']))
+            jh:str = hfplus(tuple([prog.jumps_per_hour, 'float', '-']))
 
-            rj:str = hfplus(tuple([Context.route.jumps_to_refuel(), 'int', '-']))
-            rd:str = hfplus(tuple([Context.route.dist_to_refuel(), 'float', '-']))
+            rj:str = hfplus(tuple([prog.jumps_to_refuel, 'int', '-']))
+            rd:str = hfplus(tuple([prog.dist_to_refuel, 'float', '-']))
 
             rs:str = lbls["next_refuel"].format(rd=rd) if rd != '-' else ""
 
             # or: ✨ ◄ ⭐ ► ◄ 𐫰 ► 🌀 ⚛
-            st:str = "⛽" if Context.route.jumps_to_refuel() == 0 else "🌀" if Context.route.is_neutron() else "✨"
+            st:str = "⛽" if prog.jumps_to_refuel == 0 else "🌀" if prog.is_neutron else "✨"
 
             try:
                 message.append({'size': "normal", 'text': self.progress_display.format(jc=jc, jr=jr, jt=jt, dc=dc, dr=dr, dt=dt, dh=dh, jh=jh, rj=rj, rd=rd, rs=rs, st=st)})
@@ -169,9 +165,9 @@ class Overlay():
 
         if Context.route.refuel() and not Context.route.fuel_full:
             self.display_alert(ovr["refuel"])
-        elif Context.route.is_neutron() == True:
+        elif prog.is_neutron == True:
             Context.overlay.display_alert(ovr["neutron"])
-        elif Context.route.refuel() and Context.route.fuel_full and not Context.route.is_neutron():
+        elif Context.route.refuel() and Context.route.fuel_full and not prog.is_neutron:
             self.clear_frame("Alert")
 
 
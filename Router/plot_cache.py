@@ -0,0 +1,125 @@
+import json
+import hashlib
+import os
+from pathlib import Path
+from time import time
+from typing import Iterator
+
+from .utils.debug import Debug, catch_exceptions
+
+from .constants import PLOT_CACHE_SIZE, PLOT_CACHE_TTL, PLOT_CACHE_DEFAULT_TTL, PLOT_CACHE_IGNORE
+
+
+def normalize(val:object) -> object:
+    """ Reduce a param to a canonical form so equivalent plots share a key """
+    if isinstance(val, dict):
+        return {k: normalize(v) for k, v in sorted(val.items()) if k not in PLOT_CACHE_IGNORE}
+    if isinstance(val, (list, tuple)):
+        return [normalize(v) for v in val]
+    if isinstance(val, bool):
+        return int(val)
+    if isinstance(val, (int, float)):
+        return round(float(val), 2)
+    if isinstance(val, str):
+        try:
+            return round(float(val), 2)
+        except ValueError:
+            return val.strip().lower()
+    return val
+
+
+class PlotCache:
+    """
+        Plotted routes saved on disk, one file per route type and params. Entries expire after their route
+        type's TTL and the least recently used are removed once the cache grows past its size limit. The names
+        of each route's systems are kept in a list beside it, so indexing them doesn't mean reading every route.
+    """
+    def __init__(self, dir:Path, size:int = PLOT_CACHE_SIZE) -> None:
+        self.dir:Path = dir
+        self.size:int = size
+
+
+    def key(self, which:str, params:dict) -> str:
+        """ Cache key for a route type and its params """
+        blob:str = json.dumps([which, normalize(params)], separators=(',', ':'))
+        return hashlib.sha1(blob.encode()).hexdigest()
+
+
+    def _file(self, which:str, params:dict) -> Path:
+        return self.dir / f"{self.key(which, params)}.json"
+
+
+    @catch_exceptions
+    def get(self, which:str, params:dict) -> tuple[list, list]|None:
+        """ The cached headers and rows for this plot, if we have a fresh copy """
+        file:Path = self._file(which, params)
+        if not file.exists(): return None
+
+        with open(file) as f:
+            entry:dict = json.load(f)
+
+        if time() - entry.get('time', 0) > PLOT_CACHE_TTL.get(which, PLOT_CACHE_DEFAULT_TTL):
+            Debug.logger.debug(f"Cached {which} route has expired")
+            file.unlink(missing_ok=True)
+            file.with_suffix('.systems').unlink(missing_ok=True)
+            return None
+
+        os.utime(file) # Mark it as recently used
+        return (entry['hdrs'], entry['route'])
+
+
+    @catch_exceptions
+    def put(self, which:str, params:dict, hdrs:list, route:list) -> None:
+        """ Save a plotted route, and the names of its systems for the system index """
+        self.dir.mkdir(parents=True, exist_ok=True)
+        file:Path = self._file(which, params)
+        tmp:Path = file.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'which': which, 'params': params, 'time': time(), 'hdrs': hdrs, 'route': route}, f,
+                      separators=(',', ':'))
+        tmp.replace(file)
+        self._write_systems(file.with_suffix('.systems'), hdrs, route)
+        self._evict()
+
+
+    def systems(self) -> Iterator[str]:
+        """ The system names in every cached route, read from each route's list of them rather than the route """
+        for file in self.dir.glob('*.json'):
+            names:Path = file.with_suffix('.systems')
+            try:
+                if not names.exists(): # Cached before the lists were kept
+                    with open(file) as f:
+                        entry:dict = json.load(f)
+                    self._write_systems(names, entry['hdrs'], entry['route'])
+                with open(names, encoding='utf-8') as f:
+                    yield from (line.rstrip('\n') for line in f)
+            except Exception as e:
+                Debug.logger.error(f"Failed to read {names}, exception info:", exc_info=e)
+
+
+    def clear(self) -> None:
+        """ Remove all cached routes """
+        for file in self.dir.glob('*.json'):
+            file.unlink(missing_ok=True)
+            file.with_suffix('.systems').unlink(missing_ok=True)
+
+
+    def _write_systems(self, file:Path, hdrs:list, route:list) -> None:
+        """ Save the system names in a route, one per line """
+        col:int|None = next((hdrs.index(h) for h in ['System Name', 'system', 'name'] if h in hdrs), None)
+        names:list = [] if col is None else [row[col] for row in route if isinstance(row[col], str)]
+        tmp:Path = file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.writelines(f"{n}\n" for n in names)
+        tmp.replace(file)
+
+
+    def _evict(self) -> None:
+        """ Remove the least recently used routes until we're within our size """
+        files:list = sorted(((f.stat(), f) for f in self.dir.glob('*.json')), key=lambda s: s[0].st_mtime)
+        total:int = sum(st.st_size for st, _ in files)
+        for st, f in files:
+            if total <= self.size: break
+            f.unlink(missing_ok=True)
+            f.with_suffix('.systems').unlink(missing_ok=True)
+            total -= st.st_size
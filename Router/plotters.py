@@ -76,7 +76,7 @@ class Plotter(ABC):
                               name:str = '', menu:dict|None = None, initial:str = '',
                               add_cmd=None, remove_cmd=None, pady:int = 5) -> th.Autocompleter:
         """ An autocompleter system entry widget with optional name (source/dest), menu (right-click history), and -/+ buttons. """
-        kw:dict = {'width': 30, 'func': Context.ui.query_systems}
+        kw:dict = {'width': 30, 'func': Context.ui.query_systems, 'local': Context.router.systems.search}
         if menu:
             kw['menu'] = menu
         if name:
@@ -146,7 +146,7 @@ class Plotter(ABC):
 
     def _create_range(self, parent:th.Frame, row:int, col:int, range_val:str = "32.0", width:int=9) -> None:
         """Create range entry widget."""
-        range_entry:th.Spinbox = th.Spinbox(parent, placeholder=lbls['range'], from_=5.0, to=120.0, increment=5.0, width=width-2, menu=Context.ui._ship_dict(), justify=tk.CENTER, name="range_entry")
+        range_entry:th.Spinbox = th.Spinbox(parent, placeholder=lbls['range'], from_=5.0, to=120.0, increment=5.0, width=width-2, menu=Context.ui._range_dict(), justify=tk.CENTER, name="range_entry")
         range_entry.set_text(str(range_val), False)
         range_entry.grid(row=row, column=col, padx=5, pady=5)
 
@@ -224,8 +224,9 @@ class Plotter(ABC):
         sfr.grid(row=row, column=col, columnspan=5, sticky=tk.EW)
 
     def _validate_system(self, inp:str, widget:th.Autocompleter) -> str|None:
-        """ Validate and return the exact system name. """
-        validated = next((x for x in Context.ui.query_systems(inp) if x.casefold() == inp.casefold()), None)
+        """ Validate and return the exact system name, only asking Spansh about systems we don't know. """
+        validated = Context.router.systems.find(inp) or \
+            next((x for x in Context.ui.query_systems(inp) if x.casefold() == inp.casefold()), None)
         if validated is None:
             widget.set_text(inp, False)
             widget.set_error_style()
@@ -354,8 +355,8 @@ class NeutronPlotter(Plotter):
         # No pre-validation per via system -- Spansh errors on a bad name regardless.
         params['via'] = [v for hop in self.hop_rows if (v := self._row_value(hop['ac'])) != '']
 
-        Context.router.plot_route('Neutron', params)
         Context.ui._show_busy_gui(True)
+        Context.router.plot_route('Neutron', params)
 
 
 class GalaxyPlotter(Plotter):
@@ -493,8 +494,8 @@ class GalaxyPlotter(Plotter):
 
         params['source'] = src_ac.get().strip()
         params['destination'] = dest_ac.get().strip()
-        Context.router.plot_route('Galaxy', params)
         Context.ui._show_busy_gui(True)
+        Context.router.plot_route('Galaxy', params)
 
 
 class RichesPlotter(Plotter):
@@ -630,8 +631,8 @@ class RichesPlotter(Plotter):
         elif spec.min_value is not None:
             params['min_value'] = spec.min_value
 
-        Context.router.plot_route(self.route_type, params)
         Context.ui._show_busy_gui(True)
+        Context.router.plot_route(self.route_type, params)
 
 
 class TradePlotter(Plotter):
@@ -762,8 +763,8 @@ class TradePlotter(Plotter):
         for opt in self.options:
             params[opt] = 1 if options.selection_includes(self.options.index(opt)) else 0
 
-        Context.router.plot_route('Trade', params)
         Context.ui._show_busy_gui(True)
+        Context.router.plot_route('Trade', params)
 
 
 class TouristPlotter(Plotter):
@@ -852,8 +853,8 @@ class TouristPlotter(Plotter):
             params['destination'] = params.get('final_destination', '')
         #params['loop'] = self.loop_var.get()
 
-        Context.router.plot_route('Tourist', params)
         Context.ui._show_busy_gui(True)
+        Context.router.plot_route('Tourist', params)
 
 class FleetCarrierPlotter(Plotter):
     """Plotter for /api/fleetcarrier/route"""
@@ -955,8 +956,8 @@ class FleetCarrierPlotter(Plotter):
         params['capacity_used'] = int(capacity_used)
         params['calculate_starting_fuel'] = "1"
 
-        Context.router.plot_route('FleetCarrier', params)
         Context.ui._show_busy_gui(True)
+        Context.router.plot_route('FleetCarrier', params)
 
 
 PLOTTER_SPECS:dict = {
@@ -0,0 +1,132 @@
+from email.utils import parsedate_to_datetime
+from datetime import UTC, datetime
+from threading import Event
+from time import monotonic
+from typing import Any, Callable
+
+import requests
+from requests import Response
+
+from config import config # type: ignore
+
+from .constants import POLL_MIN, POLL_MAX, POLL_BACKOFF, POLL_READ, HTTP_TIMEOUTS
+
+
+def retry_after(response:Response) -> float|None:
+    """ Seconds the server asked us to wait before polling again, if it said """
+    try:
+        val = response.headers.get('Retry-After')
+        if not isinstance(val, str) or val.strip() == '': return None
+        if val.strip().isdigit(): return float(val)
+        when:datetime = parsedate_to_datetime(val)
+        return max(0.0, (when - datetime.now(UTC)).total_seconds())
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class JobPoller:
+    """
+        Poll a Spansh results job until it's finished. The gap between polls starts short and grows,
+        stretches to the expected finish time when we have one, and honours any Retry-After. A poll that's
+        slow to answer is given up on after POLL_READ seconds and sent again, so a cancel (or EDMC shutting
+        down) is noticed that quickly while we wait on a reply. A response that arrives after a cancel is
+        closed, freeing its connection, and the finished result is downloaded with the usual read timeout.
+    """
+    def __init__(self, get:Callable, url:str, headers:dict, cancel:Event, budget:float,
+                 estimate:float|None = None, progress:Callable|None = None) -> None:
+        self.get:Callable = get
+        self.url:str = url
+        self.headers:dict = headers
+        self.cancel:Event = cancel
+        self.budget:float = budget
+        self.estimate:float|None = estimate
+        self.progress:Callable|None = progress
+        self.start:float = monotonic()
+        self.interval:float = POLL_MIN
+        self.polls:int = 0
+
+
+    def cancelled(self) -> bool:
+        return self.cancel.is_set() or config.shutting_down
+
+
+    def elapsed(self) -> float:
+        return monotonic() - self.start
+
+
+    def remaining(self) -> float|None:
+        """ Estimated seconds until the job finishes """
+        if self.estimate is None: return None
+        return max(0.0, self.estimate - self.elapsed())
+
+
+    def run(self) -> Response|None:
+        """ Poll until the job isn't pending. Returns the last response, or None if cancelled """
+        while True:
+            response:Response|None = self._fetch()
+            if response is None or response.status_code != 202:
+                return response
+            response.content # Still pending, it's tiny so read it and free the connection
+
+            delay:float = self._next_delay(response)
+            if self.elapsed() + delay > self.budget:
+                return response # Out of time, still pending
+
+            if not self._wait(delay):
+                return None
+
+
+    def _next_delay(self, response:Response) -> float:
+        """ How long to wait before the next poll """
+        delay:float = self.interval
+        self.interval = min(self.interval * POLL_BACKOFF, POLL_MAX)
+
+        # Expecting it to take a while yet, don't ask until it should be ready
+        rem:float|None = self.remaining()
+        if rem is not None and rem > delay:
+            delay = min(rem, POLL_MAX)
+
+        ra:float|None = retry_after(response)
+        if ra is not None:
+            delay = max(delay, ra)
+        return delay
+
+
+    def _wait(self, delay:float) -> bool:
+        """ Wait between polls, reporting progress. False if we were cancelled """
+        end:float = monotonic() + delay
+        while (left := end - monotonic()) > 0:
+            self._report()
+            if self.cancel.wait(min(left, 1.0)): return False
+            if config.shutting_down: return False
+        return not self.cancelled()
+
+
+    def _fetch(self) -> Response|None:
+        """ Make one poll request, asking again if it's slow to answer until the results timeout has passed """
+        end:float = monotonic() + HTTP_TIMEOUTS['results']
+        while not self.cancelled():
+            self.polls += 1
+            try:
+                response:Response = self.get(self.url, headers=self.headers,
+                                             timeout=(HTTP_TIMEOUTS['results'], POLL_READ), stream=True)
+            except requests.Timeout:
+                if monotonic() >= end: raise
+                continue
+            if self.cancelled():
+                response.close()
+                return None
+            if response.status_code == 200: self._read_timeout(response, HTTP_TIMEOUTS['results'])
+            return response
+        return None
+
+
+    def _read_timeout(self, response:Response, timeout:float) -> None:
+        """ Set the read timeout for the rest of a response, its body can be large and stall for a moment """
+        sock:Any = getattr(getattr(getattr(response, 'raw', None), 'connection', None), 'sock', None)
+        if sock is not None: sock.settimeout(timeout)
+
+
+    def _report(self) -> None:
+        if self.progress is not None:
+            self.progress(self.elapsed(), self.remaining())
@@ -2,7 +2,7 @@ import tkinter as tk
 from tkinter import ttk, font
 from tkinter import filedialog
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import myNotebook as nb # type: ignore
 
 from config import config # type: ignore
@@ -10,7 +10,7 @@ from config import config # type: ignore
 from .utils.misc import singleton
 from .utils.debug import Debug, catch_exceptions
 
-from .constants import ROUTE_DIR, cnf
+from .constants import ROUTE_DIR, SPEED_WINDOWS, cnf
 from .context import Context
 
 @dataclass
@@ -19,11 +19,15 @@ class Pref:
     name:str
     desc:str
     var_type:type[tk.StringVar]|type[tk.BooleanVar]
-    entry_type:type[tk.Entry]|type[tk.Checkbutton]
+    entry_type:type[tk.Entry]|type[tk.Checkbutton]|type[ttk.Combobox]
+    options:dict = field(default_factory=dict) # value: label for choices
 
 PREFS = [
     Pref('dir', 'routes_directory', cnf['routes_directory'], tk.StringVar, tk.Entry),
     Pref('bool', 'cooldown_popup', cnf['show_carrier_cooldown'], tk.BooleanVar, tk.Checkbutton),
+    Pref('bool', 'bypass_plot_cache', cnf['bypass_plot_cache'], tk.BooleanVar, tk.Checkbutton),
+    Pref('choice', 'speed_window', cnf['speed_window'], tk.StringVar, ttk.Combobox,
+         {w: cnf[f"speed_{w}"] for w in SPEED_WINDOWS}),
     ]
 
 @singleton
@@ -82,6 +86,15 @@ class Prefs:
                     entry:tk.Entry = tk.Entry(prefsfr, textvariable=self.pref_vars[k.name], width=75)
                     entry.grid(row=row, column=col, padx=5, pady=5, sticky=tk.W)
                     entry.bind("<Button-1>", lambda e, en=entry, v=self.pref_vars[k.name]: select_folder(en, v))
+                case 'choice':
+                    val:str = config.get(f"{Context.plugin_name}_{k.name}") or list(k.options)[-1]
+                    self.pref_vars[k.name] = tk.StringVar(value=val)
+                    nb.Label(prefsfr, text=k.desc).grid(row=row, column=col, padx=10, pady=5, sticky=tk.W)
+                    col += 1
+                    cb:ttk.Combobox = ttk.Combobox(prefsfr, values=list(k.options.values()), state='readonly', width=25)
+                    cb.set(k.options.get(val, ''))
+                    cb.bind("<<ComboboxSelected>>", lambda e, c=cb, p=k: self.pref_vars[p.name].set(list(p.options)[c.current()]))
+                    cb.grid(row=row, column=col, padx=5, pady=5, sticky=tk.W)
 
             col = 0;row += 1
         col = 0
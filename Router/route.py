@@ -1,22 +1,136 @@
 from time import time
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from dataclasses import dataclass
+from collections import deque
 from .utils.debug import Debug
 from .utils.misc import hfplus
-from .constants import HEADER_MAP, tts, lbls, TRUE
+from .constants import HEADER_MAP, COMPACT_ROUTE_ROWS, JUMP_LOG_SIZE, SPEED_WINDOWS, tts, lbls, TRUE
+from .columns import ColumnStore
 from typing import Any, TYPE_CHECKING
 if TYPE_CHECKING:
     from .context import Context
 
+class SpeedWindow:
+    """
+        Jumps made in the last `secs` seconds with their running count and distance
+    """
+    __slots__ = ('secs', 'jumps', 'count', 'dist')
+
+    def __init__(self, secs:int) -> None:
+        self.secs:int = secs
+        self.jumps:deque = deque()
+        self.count:int = 0
+        self.dist:float = 0
+
+
+    def drop(self) -> None:
+        """ Remove the oldest jump """
+        _, dist = self.jumps.popleft()
+        self.count -= 1
+        self.dist -= dist
+
+
+class JumpLog:
+    """
+        Ring buffer of this session's jumps ([time, system, distance]) with running totals for the whole
+        session and for each speed window, so speeds are read without rescanning the jumps.
+    """
+    def __init__(self, size:int = JUMP_LOG_SIZE) -> None:
+        self.size:int = size
+        self.entries:deque = deque(maxlen=size)
+        self.first:float = 0
+        self.count:int = 0
+        self.dist:float = 0
+        self.windows:dict = {secs: SpeedWindow(secs) for secs in SPEED_WINDOWS.values() if secs > 0}
+
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+    def __getitem__(self, i:int) -> list:
+        return self.entries[i]
+
+
+    def __iter__(self):
+        return iter(self.entries)
+
+
+    def append(self, jump:list) -> None:
+        """ Record a jump and roll the windows forward to it """
+        t, _, dist = jump
+        if self.count == 0: self.first = t
+        self.count += 1
+        self.dist += dist
+        self.entries.append(jump)
+
+        for win in self.windows.values():
+            if len(win.jumps) == self.size: win.drop()
+            win.jumps.append((t, dist))
+            win.count += 1
+            win.dist += dist
+            while t - win.jumps[0][0] > win.secs: win.drop()
+
+
+    def clear(self) -> None:
+        """ Forget all the jumps """
+        self.__init__(self.size)
+
+
+    def hours(self, window:int = 0) -> float:
+        """ Hours between the first and last jump in the window (0 for the whole session) """
+        if self.count == 0: return 0
+        first:float = self.first
+        if window in self.windows: first = self.windows[window].jumps[0][0]
+        return (int(self.entries[-1][0]) - int(first)) / 3600
+
+
+    def speed(self, window:int = 0) -> tuple[float, float]:
+        """ Jumps and distance per hour over the window (0 for the whole session) """
+        td:float = self.hours(window)
+        if td <= 0: return (0, 0)
+        if window in self.windows:
+            return (self.windows[window].count / td, self.windows[window].dist / td)
+        return (self.count / td, self.dist / td)
+
+
+@dataclass(frozen=True)
+class RouteProgress:
+    """
+        Immutable snapshot of progress along a route, taken once per offset or jump change
+    """
+    offset:int = -1
+    window:int = 0
+    total_jumps:int = 0
+    jumps_remaining:int = 0
+    jumps_to_wp:int = 0
+    total_dist:float = 0
+    dist_remaining:float = 0
+    dist_to_next:float = 0
+    perc_jumps:float = 0
+    perc_dist:float = 0
+    percent:int = 0
+    jumps_per_hour:float = 0
+    dist_per_hour:float = 0
+    jumps_to_refuel:int|None = None
+    dist_to_refuel:float|None = None
+    is_neutron:bool = False
+
+
 class Route:
     """
         Class to store, maintain, and return current route information
     """
-    def __init__(self, hdrs:list = [], route:list = [], offset:int = -1) -> None:
+    def __init__(self, hdrs:list = [], route:list = [], offset:int = -1, compact:bool|None = None) -> None:
         self.hdrs:list = hdrs
-        self.route:list = route
-        self.jumps:list = []
+        self.route:list|ColumnStore = route
+        self.jumps:JumpLog = JumpLog()
         self.offset:int = offset
         self.fleetcarrier:bool = False
         self.fuel_full = False
+        self._progress:RouteProgress|None = None
 
         self.sc:int|None = None # System column index
         self.nc:int|None = None # System / body column index
@@ -24,6 +138,15 @@ class Route:
         self.dc:int|None = None # Distance column index
         self.dr:int|None = None # Distance remaining column index
 
+        self._cum_jumps:array = array('q', [0]) # Running total of the jumps column, _cum_jumps[i] is the sum of route[:i]
+        self._cum_values:dict = {}  # Running totals of each numeric column keyed by column index
+        self._positions:dict = {}   # Row position(s) of each system / body name
+        self._schema:dict = {}      # Column index of each header and header alias
+        self._fuel_stops:list = []  # Sorted row positions flagged Refuel (or Restock)
+        self._neutrons:list = []    # Sorted row positions flagged Neutron
+        self._name_col:int = 0      # Default (system / body name) column index
+
+        self._resolve_columns()
         if hdrs == [] or route == []: return
 
         # Detect if this route appears to be a fleet carrier loadout (tritium column)
@@ -32,29 +155,189 @@ class Route:
         self.jc = self.colind('Jumps')
         self.dc = self.colind('Distance')
 
-        # If necessary calculate jumps or waypoints remaining and insert into the headers & the route
-        if 'Jumps Rem' not in hdrs and 'Waypoints Rem' not in hdrs and self.fleetcarrier == False:
-            jr:int = len(hdrs)
-            if self.jc != None: jr = self.jc+1
+        # If necessary calculate jumps/waypoints remaining and distance remaining and insert them into the headers & the route
+        add_jr:bool = 'Jumps Rem' not in hdrs and 'Waypoints Rem' not in hdrs and self.fleetcarrier == False
+        add_dr:bool = 'Distance Remaining' not in hdrs and 'Distance Rem' not in hdrs and self.dc != None
+        if add_jr or add_dr:
+            jrem, drem = self._remaining_columns()
+
+            if add_jr:
+                jr:int = len(self.hdrs)
+                if self.jc != None: jr = self.jc+1
 
-            self.hdrs.insert(jr, 'Jumps Rem' if self.jc != None else 'Waypoints Rem')
-            for i in range(0, len(route)):
-                self.route[i].insert(jr, self.jumps_remaining(i))
+                self.hdrs.insert(jr, 'Jumps Rem' if self.jc != None else 'Waypoints Rem')
+                for row, rem in zip(self.route, jrem):
+                    row.insert(jr, rem)
+                if self.dc != None and jr <= self.dc: self.dc += 1
 
-        # Calculate distance remaining if we have a distance column and insert into the headers & the route
-        if 'Distance Remaining' not in hdrs and 'Distance Rem' not in hdrs and self.dc != None:
-            dr:int = len(hdrs)
-            if self.dc != None: dr = self.dc+1
+            if add_dr and self.dc is not None:
+                dr:int = self.dc+1
+                self.hdrs.insert(dr, 'Distance Remaining')
+                for row, rem in zip(self.route, drem):
+                    row.insert(dr, rem)
+                if self.jc != None and dr <= self.jc: self.jc += 1
 
-            self.hdrs.insert(dr, 'Distance Remaining')
-            for i in range(0, len(route)):
-                rem:int = sum(item[self.dc] for item in self.route[i+1:]) if i+1 < len(self.route) else 0
-                self.route[i].insert(dr, rem)
+            self._resolve_columns()
 
         self.sc = self.colind(['System Name', 'system', 'name'])
         self.nc = self.colind()
         self.dr = self.colind('Distance Remaining' if 'Distance Remaining' in self.hdrs else 'Distance Rem')
 
+        # Long routes are held column by column rather than as a list of row lists
+        if compact or (compact is None and len(self.route) >= COMPACT_ROUTE_ROWS):
+            if not isinstance(self.route, ColumnStore): self.route = ColumnStore(self.route)
+
+        self._build_indexes()
+
+
+    @classmethod
+    def restore(cls, hdrs:list, store:ColumnStore, offset:int = -1, indexes:dict|None = None) -> 'Route':
+        """ Rebuild a saved route whose derived columns are already present, reusing its saved indexes """
+        route:Route = cls(hdrs, [], offset)
+        if hdrs == [] or len(store) == 0: return route
+
+        route.route = store if len(store) >= COMPACT_ROUTE_ROWS else store.tolist()
+        route.fleetcarrier = any('tritium' in h.lower() for h in hdrs)
+        route.jc = route.colind('Jumps')
+        route.dc = route.colind('Distance')
+        route.sc = route.colind(['System Name', 'system', 'name'])
+        route.nc = route.colind()
+        route.dr = route.colind('Distance Remaining' if 'Distance Remaining' in hdrs else 'Distance Rem')
+
+        if indexes is None:
+            route._build_indexes()
+            return route
+
+        route._index_names()
+        route._fuel_stops = list(indexes['fuel_stops'])
+        route._neutrons = list(indexes['neutrons'])
+        route._cum_jumps = indexes['cum_jumps']
+        route._cum_values = dict(indexes['cum_values'])
+        return route
+
+
+    def indexes(self) -> dict:
+        """ The derived indexes, for saving alongside the route """
+        return {'fuel_stops': self._fuel_stops, 'neutrons': self._neutrons,
+                'cum_jumps': self._cum_jumps, 'cum_values': self._cum_values}
+
+
+    def _index_names(self) -> None:
+        """ Build the index of row positions by system / body name """
+        self._positions = {}
+        if self.nc is None: return
+        names:list = self._column(self.nc)
+        self._positions = dict(zip(names, range(len(names))))
+        if len(self._positions) == len(names): return
+
+        # Some names repeat (loop routes), collect every position of those
+        self._positions = {}
+        for i, name in enumerate(names):
+            pos:int|list|None = self._positions.get(name)
+            if pos is None: self._positions[name] = i
+            elif isinstance(pos, int): self._positions[name] = [pos, i]
+            else: pos.append(i)
+
+
+    def _build_indexes(self) -> None:
+        """ Build the name, fuel stop, neutron and running total indexes """
+        self._index_names()
+
+        self._fuel_stops = self._flagged(self.colind('Refuel') or self.colind('Restock'))
+        self._neutrons = self._flagged(self.colind('Neutron') or self.colind('Neutron Star'))
+
+        if self.jc != None: self._cum_jumps = self._prefix_sums(self._column(self.jc))
+        for c in range(len(self.hdrs)):
+            values:list = self._column(c)
+            if any(isinstance(v, (int, float)) for v in values):
+                self._cum_values[c] = self._prefix_sums(values)
+
+
+    def _column(self, col:int) -> list:
+        """ All the values of a column """
+        if isinstance(self.route, ColumnStore): return self.route.column(col)
+        return [r[col] for r in self.route]
+
+
+    def _resolve_columns(self) -> None:
+        """ Map every header and header alias to its column index """
+        self._schema = {k: self.hdrs.index(v) for k, v in HEADER_MAP.items() if v in self.hdrs}
+        for i in range(len(self.hdrs)-1, -1, -1):
+            self._schema[self.hdrs[i]] = i
+
+        self._name_col = next((self._schema[h] for h in ['Body Name', 'body', 'System Name', 'system', 'name']
+                               if h in self.hdrs), 0)
+
+
+    def _remaining_columns(self) -> tuple[list, list]:
+        """ Jumps (or waypoints) and distance remaining after each row, in a single reverse pass """
+        jrem:list = [0] * len(self.route)
+        drem:list = [0] * len(self.route)
+        jtot:int|float = 0
+        dtot:int|float = 0
+        for i in range(len(self.route)-1, -1, -1):
+            jrem[i] = jtot
+            drem[i] = dtot
+            row:list = self.route[i]
+            if self.jc == None: jtot += 1
+            elif isinstance(row[self.jc], (int, float)): jtot += row[self.jc]
+            if self.dc != None and isinstance(row[self.dc], (int, float)): dtot += row[self.dc]
+        return jrem, drem
+
+
+    def _flagged(self, col:int|None) -> list:
+        """ Sorted positions of the rows whose value in a column is true """
+        if col == None: return []
+        return [i for i, v in enumerate(self._column(col)) if v in TRUE]
+
+
+    def _is_flagged(self, positions:list, i:int) -> bool:
+        """ Whether row i is in a sorted list of positions """
+        k:int = bisect_left(positions, i)
+        return k < len(positions) and positions[k] == i
+
+
+    def _prefix_sums(self, values:list) -> array:
+        """ Running totals of a column, element i is the sum of the numeric values in values[:i] """
+        nums:list = [v if isinstance(v, (int, float)) else 0 for v in values]
+        cum:array = array('q' if all(type(v) is int or type(v) is bool for v in nums) else 'd', [0])
+        cum.extend(accumulate(nums))
+        return cum
+
+
+    def progress(self) -> RouteProgress:
+        """ Return the progress snapshot, recalculating it if we've moved or jumped since it was taken """
+        window:int = self.speed_window()
+        if self._progress is not None and self._progress.offset == self.offset and self._progress.window == window:
+            return self._progress
+
+        if self.route == []:
+            self._progress = RouteProgress(offset=self.offset, window=window)
+            return self._progress
+
+        jr:int = self.jumps_remaining()
+        td:float = self.total_dist()
+        pj:float = self.perc_jumps_rem()
+        pd:float = self.perc_dist_rem()
+        jph, dph = self.jumps.speed(window)
+        self._progress = RouteProgress(offset=self.offset,
+                                       window=window,
+                                       total_jumps=self.total_jumps(),
+                                       jumps_remaining=jr,
+                                       jumps_to_wp=self.jumps_to_wp(),
+                                       total_dist=td,
+                                       dist_remaining=self.dist_remaining(),
+                                       dist_to_next=self.dist_to_next(),
+                                       perc_jumps=pj,
+                                       perc_dist=pd,
+                                       percent=100 if jr == 0 else round(pd) if td > 0 else round(pj),
+                                       jumps_per_hour=jph,
+                                       dist_per_hour=dph,
+                                       jumps_to_refuel=self.jumps_to_refuel(),
+                                       dist_to_refuel=self.dist_to_refuel(),
+                                       is_neutron=self.is_neutron())
+        return self._progress
+
 
     def source(self) -> str:
         if self.route == []: return ''
@@ -90,9 +373,10 @@ class Route:
     def sum_value(self, header:str, through:int|None = None) -> float:
         """ Sum a numeric column across route[:through] (default: through the next stop) """
         ind:int|None = self.colind(header)
-        if ind is None or self.route == []: return 0
+        if ind is None or ind not in self._cum_values: return 0
         if through is None: through = self.offset+2
-        return sum(r[ind] for r in self.route[:through] if isinstance(r[ind], (int, float)))
+        if through < 0: through = max(0, len(self.route) + through)
+        return self._cum_values[ind][min(through, len(self.route))]
 
 
     def route_value(self) -> tuple[str, str] | None:
@@ -183,39 +467,46 @@ class Route:
         """ Returns how many jumps until the next fuel stop. Returns None if no fuel stops. """
         if self.route == [] or self.offset >= len(self.route): return None
 
-        ind:int|None = self.colind("Refuel") or self.colind("Restock")
-        if ind == None: return None
-        if self.route[self.offset][ind] in TRUE: return 0
-
-        waypoint_range:list = self.route[self.offset:len(self.route)]
-        return next((i for i, wp in enumerate(waypoint_range) if wp[ind] in TRUE), None)
+        offset:int = max(0, self.offset)
+        i:int = bisect_left(self._fuel_stops, offset)
+        if i == len(self._fuel_stops): return None
+        return self._fuel_stops[i] - offset
 
 
     def dist_to_refuel(self) -> int|None:
         """ Returns distance to the next fuel stop. Returns None if no fuel stops. """
         if self.route == [] or self.offset >= len(self.route) or self.dr == None: return None
 
-        ind:int|None = self.colind("Refuel") or self.colind("Restock")
-        if ind == None: return None
-        if self.route[self.offset][ind] in TRUE: return 0
-        refind:int|None = next((i for i, wp in enumerate(self.route[self.offset:len(self.route)]) if wp[ind] in TRUE), None)
-        return self.route[self.offset][self.dr] - self.route[self.offset+refind][self.dr] if refind is not None else None
+        offset:int = max(0, self.offset)
+        i:int = bisect_left(self._fuel_stops, offset)
+        if i == len(self._fuel_stops): return None
+        return self.route[offset][self.dr] - self.route[self._fuel_stops[i]][self.dr]
 
 
     def refuel(self) -> bool:
         """ Return whether we need to refuel at this waypoint """
         if self.fuel_full == True: return False
-        ind:int|None = self.colind('Refuel') or self.colind('Restock')
-        if ind == None: return False
-        return self.route[self.offset][ind] in TRUE
+        return self._is_flagged(self._fuel_stops, self.offset)
 
 
     def is_neutron(self) -> bool:
         """ Return whether we need to neutron boost at this waypoint """
-        ind:int|None = self.colind('Neutron') or self.colind('Neutron Star')
+        return self._is_flagged(self._neutrons, self.offset+1)
+
+
+    def column(self, col:int|None) -> list:
+        """ All the values of a column, empty if there's no such column """
+        return [] if col == None else self._column(col)
+
 
-        if ind == None or self.offset+1 >= len(self.route): return False
-        return self.route[self.offset+1][ind] in TRUE
+    def fuel_stop(self, row:int) -> bool:
+        """ Whether the route says to refuel at a row """
+        return self._is_flagged(self._fuel_stops, row)
+
+
+    def neutron(self, row:int) -> bool:
+        """ Whether a row's star is a neutron star, so the jump leaving it is boosted """
+        return self._is_flagged(self._neutrons, row)
 
 
     def jumps_to_wp(self) -> int:
@@ -237,15 +528,23 @@ class Route:
         if offset+1 >= len(self.route): return 0
 
         # No jump count column
-        j = len(self.route[offset:])-1
-        if self.jc == None: return len(self.route[offset:])-1
-        return sum([j[self.jc] for j in self.route[offset+1:]])
+        if self.jc == None: return len(self.route) - offset - 1
+        return self._cum_jumps[-1] - self._cum_jumps[offset+1]
+
+
+    def jumps_to(self, row:int, offset:int|None = None) -> int:
+        """ Jumps from the offset to arriving at a row """
+        if offset == None: offset = max(0, self.offset)
+        if row <= offset: return 0
+        if self.jc == None: return row - offset
+        return self._cum_jumps[row+1] - self._cum_jumps[offset+1]
 
 
     def perc_jumps_rem(self, offset:int|None = None) -> float:
         """ Percentage of jumps remaining """
-        if self.route == [] or self.total_jumps() == 0: return 0
-        return (self.total_jumps() - self.jumps_remaining(offset)) * 100 / self.total_jumps()
+        total:int = self.total_jumps()
+        if total == 0: return 0
+        return (total - self.jumps_remaining(offset)) * 100 / total
 
 
     def dist_to_next(self) -> int:
@@ -271,28 +570,30 @@ class Route:
         return self.dist_remaining(0)
 
 
-    def jumps_per_hour(self) -> float:
+    def speed_window(self) -> int:
+        """ Seconds of jumps the speed statistics cover, 0 for the whole session """
+        from .context import Context
+        return SPEED_WINDOWS.get(getattr(Context.prefs, 'speed_window', None) or 'session', 0)
+
+
+    def jumps_per_hour(self, window:int|None = None) -> float:
         """ Jumps per hour on this route """
-        if self.jumps == []: return 0
-        td:float = (int(self.jumps[-1][0]) - int(self.jumps[0][0])) / 3600
-        return len(self.jumps) / td if td > 0 else 0
+        return self.jumps.speed(self.speed_window() if window is None else window)[0]
 
 
-    def dist_per_hour(self) -> float:
+    def dist_per_hour(self, window:int|None = None) -> float:
         """ Ly per hour on this route """
-        if self.jumps == []: return 0
-        td:float = (int(self.jumps[-1][0]) - int(self.jumps[0][0])) / 3600
-        return sum([j[2] for j in self.jumps]) / td if td > 0 else 0
+        return self.jumps.speed(self.speed_window() if window is None else window)[1]
+
 
     def credits_per_hour(self, header:str) -> float:
         """ Credits per hour on this route """
-        if self.jumps == []: return 0
-        i:int|None = self.colind(header)
-        if i is None or self.route == []: return 0
+        if self.colind(header) is None: return 0
 
-        td:float = (int(self.jumps[-1][0]) - int(self.jumps[0][0])) / 3600
+        td:float = self.jumps.hours()
         return self.sum_value(header) / td if td > 0 else 0
 
+
     def dist_remaining(self, offset:int|None = None) -> int:
         """ Distance remaining if we know it """
         if self.route == [] or self.dr == None: return 0
@@ -310,19 +611,11 @@ class Route:
         """ Return the index of a given column, by default the system name column """
         if self.hdrs == []: return None
 
-        if which == '':
-            for h in ['Body Name', 'body', 'System Name', 'system', 'name']:
-                if h in self.hdrs:
-                    Debug.logger.debug(f"{h} {self.hdrs.index(h)}")
-                    return self.hdrs.index(h)
-            return 0
+        if which == '': return self._name_col
         if isinstance(which, str): which = [which]
         for w in which:
-            if w in self.hdrs or w.lower() in self.hdrs:
-                return self.hdrs.index(w)
-
-            if w in HEADER_MAP.keys() and HEADER_MAP[w] in self.hdrs:
-                return self.hdrs.index(HEADER_MAP[w])
+            ind:int|None = self._schema.get(w, self._schema.get(w.lower()))
+            if ind is not None: return ind
         return None
 
 
@@ -340,18 +633,23 @@ class Route:
         If no direction is given pickup from wherever we are on the route
         """
         if self.route == []: return -1
+        self._progress = None
 
         if direction == 0: # Figure out if we're on the route
-            self.offset = -1
-            for i, r in enumerate(self.route):
-                if r[self.nc] == system:
-                    self.offset = i
-                    break
+            positions:int|list = self._positions.get(system, [])
+            if isinstance(positions, int): positions = [positions]
 
             # We aren't on the route so just return
-            if self.offset == -1:
+            if positions == []:
+                self.offset = -1
                 Debug.logger.debug(f"We aren't on the route")
                 return -1
+
+            # Systems can appear more than once (loop routes), pick the occurrence nearest to where we were
+            i:int = bisect_left(positions, self.offset)
+            if i == len(positions) or (i > 0 and self.offset - positions[i-1] < positions[i] - self.offset):
+                i -= 1
+            self.offset = positions[i]
             Debug.logger.debug(f"New offset {self.offset} {direction} {self.route[self.offset][self.nc]}")
 
         # Are we at one end or the other?
@@ -370,6 +668,13 @@ class Route:
     def record_jump(self, dest:str, dist:float) -> None:
         """ Add details of an FSD jump """
         self.jumps.append([time(), dest, dist])
+        self._progress = None
+
+
+    def clear_jumps(self) -> None:
+        """ Forget the jumps recorded this session """
+        self.jumps.clear()
+        self._progress = None
 
 
     def __repr__(self) -> str:
@@ -382,4 +687,5 @@ class Route:
 
 
     def to_dict(self) -> list:
+        if isinstance(self.route, ColumnStore): return [self.hdrs, self.route.tolist(), self.offset]
         return [self.hdrs, self.route, self.offset]
@@ -1,30 +1,133 @@
 import json
-import re
+import os
 import requests
 from requests import Response
 from pathlib import Path
-from time import time, sleep
+from time import time, monotonic, time_ns
 from datetime import UTC, datetime, timedelta
-from threading import Thread
+from threading import Thread, Event
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain
+from typing import Iterable, Iterator
 
 from config import config # type: ignore
-from timeout_session import new_session # type: ignore
 
 from .utils.debug import Debug, catch_exceptions
 from .utils.misc import singleton
+from .utils import th
 
-from .constants import errs, CarrierStates, HEADERS, HEADER_MAP, DATA_DIR, SHIP_DIR, GH_MODULES, SPANSH_RESULTS, SPANSH_RICHES_ROUTE, SPANSH_EXOBIOLOGY_ROUTE, SPANSH_TRADE_ROUTE, SPANSH_FLEETCARRIER_ROUTE
+from .constants import errs, CarrierStates, HEADERS, HEADER_MAP, HEADER_TYPES, DATA_DIR, SHIP_DIR, SHIPYARD, PLOT_CACHE_DIR, SYSTEM_DUMP, ROUTE_BODY, ROUTE_SNAPSHOT, PROGRESS_LOG, MODULE_DATA, MODULE_META, GH_MODULES, MODULE_SOURCES, POLL_GRACE, STREAM_CHUNK, SPANSH_RESULTS, SPANSH_RICHES_ROUTE, SPANSH_EXOBIOLOGY_ROUTE, SPANSH_TRADE_ROUTE, SPANSH_FLEETCARRIER_ROUTE
 from .context import Context
-from .ship import Ship
+from .ship import Ship, index_modules
+from .fuel import FuelPlan, FuelSimulator
 from .route import Route
+from .columns import normalize_column
+from .jsonstream import iter_items
 from .plotters import PLOTTER_SPECS
+from .poller import JobPoller
+from .client import HTTP
+from .plot_cache import PlotCache
+from .shipyard import Shipyard
+from .system_index import SystemIndex
+from .snapshot import SnapshotError, read_snapshot, write_snapshot
 
 SAVE_VARS:dict = {'system': '', 'src': '', 'dest': '', 'last_plot': 'Neutron',
                   'carrier_id': '', 'carrier_location': '', 'route_params': {},
                   'ship_id': '', 'cargo': 0, 'shiplist': {}, 'history': [],
-                  'window_geometries' : {}}
-
-SESSION:requests.Session = new_session() # shared, per PLUGINS.md -- default timeout + UA
+                  'window_geometries' : {}, 'plot_times': {}}
+
+SESSION:requests.Session = HTTP.session
+
+
+def write_atomic(file:Path, text:str) -> None:
+    """ Write a file via a temporary file and a rename so it's never left half written """
+    tmp:Path = file.with_name(file.name + '.tmp')
+    with open(tmp, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(file)
+
+
+def flatten_bodies_result(systems:Iterable[dict]) -> Iterator[dict]:
+    """ Flatten Spansh's nested result """
+    for system in systems:
+        bodies:list = system.get('bodies', [])
+        if bodies == []:
+            yield {
+                'system': system.get('name', ''), 'jumps': system.get('jumps', 0),
+                'body_name': '', 'subtype': '', 'is_terraformable': False,
+                'distance_to_arrival': 0, 'estimated_scan_value': 0,
+                'estimated_mapping_value': 0, 'species': '', 'landmark_value': 0
+            }
+        for body in bodies:
+            row:dict = {
+                'system': system.get('name', ''), 'jumps': system.get('jumps', 0),
+                'body_name': body.get('name', ''), 'subtype': body.get('subtype', ''),
+                'is_terraformable': body.get('is_terraformable', False),
+                'distance_to_arrival': body.get('distance_to_arrival', 0),
+                'estimated_scan_value': body.get('estimated_scan_value', 0),
+                'estimated_mapping_value': body.get('estimated_mapping_value', 0)
+            }
+            landmarks:list = body.get('landmarks', [])
+            if landmarks:
+                top:dict = max(landmarks, key=lambda l: l.get('value', 0))
+                row['species'] = top.get('subtype', '')
+                row['landmark_value'] = body.get('landmark_value', 0)
+            yield row
+
+
+def flatten_trade_result(hops:Iterable[dict]) -> Iterator[dict]:
+    """ Flatten Spansh's trade route """
+    for hop in hops:
+        dest:dict = hop.get('destination', {})
+        for commodity in hop.get('commodities', []):
+            yield {
+                'system': dest.get('system', ''), 'station': dest.get('station', ''),
+                'distance': hop.get('distance', 0),
+                'commodity': commodity.get('name', ''), 'amount': commodity.get('amount', 0),
+                'profit': commodity.get('profit', 0), 'total_profit': commodity.get('total_profit', 0),
+                'cumulative_profit': hop.get('cumulative_profit', 0)
+            }
+
+
+def result_waypoints(url:str, chunks:Iterable[bytes]) -> Iterator[dict]:
+    """ Stream the waypoints out of a Spansh result for the given plotter url """
+    if url in (SPANSH_RICHES_ROUTE, SPANSH_EXOBIOLOGY_ROUTE):
+        # Every "systems containing bodies" route (Road to Riches and its body_types-filtered
+        # variants, plus Exobiology) returns this same nested shape.
+        return flatten_bodies_result(iter_items(chunks, 'result'))
+    if url == SPANSH_TRADE_ROUTE:
+        return flatten_trade_result(iter_items(chunks, 'result'))
+    if url == SPANSH_FLEETCARRIER_ROUTE:
+        # distance == 0 marks bookkeeping rows -- the initial source, and each
+        # requested stop's leg-restart duplicate -- not real jumps. Every other row,
+        # including every intermediate hop of a long single-leg route, is a real jump.
+        return (j for j in iter_items(chunks, 'result', 'jumps') if j.get('distance', 0) != 0)
+    return iter_items(chunks, 'result', ('jumps', 'system_jumps'))
+
+
+def route_rows(waypoints:Iterable[dict]) -> tuple[list, list]:
+    """ Headers and rows for a route, filled a waypoint at a time so the waypoints themselves aren't kept """
+    waypoints = iter(waypoints)
+    first:dict|None = next(waypoints, None)
+    if first is None: return [], []
+
+    cols:list = []; hdrs:list = []; h:str
+    for h in HEADERS:
+        k:str
+        for k in first.keys():
+            if HEADER_MAP.get(k, '') == h:
+                hdrs.append(h)
+                cols.append(k)
+
+    rows:list = [[waypoint.get(c, '') for c in cols] for waypoint in chain([first], waypoints)]
+
+    # Then normalize the numbers a column at a time
+    for i, h in enumerate(hdrs):
+        for row, val in zip(rows, normalize_column([row[i] for row in rows], HEADER_TYPES.get(h, [None])[0])):
+            row[i] = val
+    return hdrs, rows
 
 @singleton
 class Router():
@@ -42,6 +145,8 @@ class Router():
         # Current ship data
         self.ship_id:str = ""
         self.cargo:int = 0
+        self.fuel:float|None = None # Main tank level from the dashboard, if we've had one
+        self._fuel_sim:FuelSimulator|None = None
         self.ship:Ship|None = None
 
         # Record of used ships and shipyard
@@ -54,7 +159,12 @@ class Router():
         self.route_params:dict = {}
         for r in self.route_types.keys():
             self.route_params[r] = {}
-        self.cancel_plot:bool = False
+        self.plot_times:dict = {} # Smoothed seconds each route type takes to plot
+        self.shipyard:Shipyard = Shipyard(Path(Context.plugin_dir) / DATA_DIR / SHIPYARD,
+                                          Path(Context.plugin_dir) / DATA_DIR / SHIP_DIR)
+        self.plot_cache:PlotCache = PlotCache(Path(Context.plugin_dir) / DATA_DIR / PLOT_CACHE_DIR)
+        self.systems:SystemIndex = SystemIndex() # Systems we can complete without asking Spansh
+        self._cancel:Event = Event()
 
         # Carrier
         self.carrier_id:str = ''
@@ -64,7 +174,13 @@ class Router():
 
         self.window_geometries:dict = {}
 
+        # The route body on disk and the last offset logged against it
+        self._route_id:str = ''
+        self._logged_offset:int|None = None
+
         self._load()
+        self._indexer:Thread = Thread(target=self._index_systems, daemon=True, name="Neutron Dancer system indexer")
+        self._indexer.start()
 
         if Context.route.route == []:
             return
@@ -132,6 +248,7 @@ class Router():
         """ Called after a jump in order to update the route, the UI etc."""
 
         Context.route.fuel_full = False # We just jumped so we can't be full anymore
+        self.systems.add([entry.get('StarSystem', system)])
         if Context.route.route == [] or Context.route.fleetcarrier == True: return
         Context.route.record_jump(entry.get('StarSystem', system), entry.get('JumpDist', 0))
 
@@ -143,12 +260,14 @@ class Router():
             Debug.logger.debug(f"Updating route {system} {Context.route.get_waypoint()}")
             Context.ui.update_progress()
             Context.overlay.update_overlays()
+        self.save_progress()
 
 
     def update_route(self, i:int) -> None:
         """ Called to move forward or backward along the route 1 == forward, -1 == back """
         Debug.logger.debug(f"Update route {i} {Context.route.get_waypoint()}")
         Context.route.update_route(i)
+        self.save_progress()
         Context.ui.update_progress()
         Context.overlay.update_overlays()
 
@@ -179,6 +298,7 @@ class Router():
                 if Context.route.fleetcarrier == True:
                     Context.route.update_route(0, self.carrier_location)
                     Context.route.record_jump(entry.get('StarSystem', self.carrier_location), Context.route.dist_to_prev())
+                    self.save_progress()
                     Context.ui.update_progress()
                 self.carrier_state = CarrierStates.Cooldown
                 Context.ui.frame.after(300000, lambda: self.cooldown_complete())
@@ -211,6 +331,26 @@ class Router():
             Context.overlay.update_overlays()
 
 
+    def fuel_plan(self) -> FuelPlan|None:
+        """ Simulate our fuel along the rest of the route with the current ship, cargo and fuel """
+        route:Route = Context.route
+        if self.ship is None or len(self.ship.ranges) == 0 or route.route == [] or route.fleetcarrier or route.dc == None:
+            return None
+
+        if self._fuel_sim is None or self._fuel_sim.route is not route or self._fuel_sim.ship is not self.ship:
+            self._fuel_sim = FuelSimulator(route, self.ship)
+        return self._fuel_sim.run(route.offset, self.cargo, self.fuel if self.fuel is not None else self.ship.tank_size)
+
+
+    def update_fuel(self, fuel:float) -> None:
+        """ Track the fuel level so we can suggest the ship's current range """
+        changed:bool = self.fuel is None or int(fuel) != int(self.fuel)
+        self.fuel = fuel
+        if changed and getattr(Context, 'ui', None) is not None:
+            Context.ui.update_ranges()
+            Context.ui.update_progress()
+
+
     def jump_complete(self) -> None:
         """ If we didn't get a notification of the carrier jump completion complete it """
         if self.carrier_state != CarrierStates.Jumping: return
@@ -218,6 +358,7 @@ class Router():
         self.carrier_location = self.carrier_destination
         if Context.route.fleetcarrier == True:
             Context.route.update_route(0, self.carrier_location)
+            self.save_progress()
             Context.ui.update_progress()
         self.carrier_state = CarrierStates.Cooldown
         Context.ui.frame.after(300000, lambda: self.cooldown_complete())
@@ -239,6 +380,7 @@ class Router():
         if "" in self.history:
             self.history.remove("")
         self.history = list(dict.fromkeys(self.history))[:10] # Keep only last 10 unique entries
+        self.systems.add(self.history)
 
 
     def plot_route(self, which:str, params:dict) -> bool:
@@ -262,136 +404,76 @@ class Router():
         return True
 
 
-    def _flatten_bodies_result(self, systems:list) -> list:
-        """ Flatten Spansh's nested result """
-        rows:list = []
-        for system in systems:
-            bodies:list = system.get('bodies', [])
-            if bodies == []:
-                rows.append({
-                    'system': system.get('name', ''), 'jumps': system.get('jumps', 0),
-                    'body_name': '', 'subtype': '', 'is_terraformable': False,
-                    'distance_to_arrival': 0, 'estimated_scan_value': 0,
-                    'estimated_mapping_value': 0, 'species': '', 'landmark_value': 0
-                })
-            for body in bodies:
-                row:dict = {
-                    'system': system.get('name', ''), 'jumps': system.get('jumps', 0),
-                    'body_name': body.get('name', ''), 'subtype': body.get('subtype', ''),
-                    'is_terraformable': body.get('is_terraformable', False),
-                    'distance_to_arrival': body.get('distance_to_arrival', 0),
-                    'estimated_scan_value': body.get('estimated_scan_value', 0),
-                    'estimated_mapping_value': body.get('estimated_mapping_value', 0)
-                }
-                landmarks:list = body.get('landmarks', [])
-                if landmarks:
-                    top:dict = max(landmarks, key=lambda l: l.get('value', 0))
-                    row['species'] = top.get('subtype', '')
-                    row['landmark_value'] = body.get('landmark_value', 0)
-                rows.append(row)
-        return rows
-
-
-    def _flatten_trade_result(self, hops:list) -> list:
-        """ Flatten Spansh's trade route """
-        rows:list = []
-        for hop in hops:
-            dest:dict = hop.get('destination', {})
-            for commodity in hop.get('commodities', []):
-                rows.append({
-                    'system': dest.get('system', ''), 'station': dest.get('station', ''),
-                    'distance': hop.get('distance', 0),
-                    'commodity': commodity.get('name', ''), 'amount': commodity.get('amount', 0),
-                    'profit': commodity.get('profit', 0), 'total_profit': commodity.get('total_profit', 0),
-                    'cumulative_profit': hop.get('cumulative_profit', 0)
-                })
-        return rows
+    @property
+    def cancel_plot(self) -> bool:
+        """ Whether the current plot has been cancelled """
+        return self._cancel.is_set()
+
+
+    @cancel_plot.setter
+    def cancel_plot(self, val:bool) -> None:
+        self._cancel.set() if val else self._cancel.clear()
+
+
+    def _plot_time(self, which:str, secs:float) -> None:
+        """ Fold a plot's duration into the running estimate for its route type """
+        prev:float|None = self.plot_times.get(which)
+        self.plot_times[which] = round(secs if prev is None else prev * 0.7 + secs * 0.3, 1)
+
 
     def _plotter(self, which:str, url:str, params:dict) -> None:
         """ Async function to run the Spansh query """
 
-        self.cancel_plot = False
+        # Abandon any plot still in progress, this one gets its own cancel flag
+        self._cancel.set()
+        cancel:Event = Event()
+        self._cancel = cancel
+        post, get = HTTP.endpoint('plot').post, HTTP.endpoint('results').get
         try:
+            cached:tuple|None = None
+            if not getattr(Context.prefs, 'bypass_plot_cache', False):
+                cached = self.plot_cache.get(which, params)
+            if cached is not None:
+                Debug.logger.info(f"Using cached {which} route for {params}")
+                self._new_route(*cached)
+                return
+
+            start:float = monotonic()
             limit:int = int(params.get('max_time', 20))
-            results:Response = SESSION.post(url, data=params,
-                                             headers={'User-Agent': Context.plugin_useragent,
-                                                      'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'})
+            results:Response = post(url, data=params,
+                                    headers={'User-Agent': Context.plugin_useragent,
+                                             'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'})
 
             if results.status_code != 202:
                 self.plot_error(which, params, results)
                 return
 
-            tries = 0
-            route_response:Response|None = None
-            while tries < limit+1:
-                if config.shutting_down or self.cancel_plot: return # Quit
-                response:dict = json.loads(results.content)
-                job:str = response["job"]
+            job:str = json.loads(results.content)["job"]
+            poller:JobPoller = JobPoller(get, f"{SPANSH_RESULTS}/{job}", {'User-Agent': Context.plugin_useragent},
+                                         cancel, limit + POLL_GRACE, self.plot_times.get(which),
+                                         Context.ui.plot_progress if Context.ui else None)
+            route_response:Response|None = poller.run()
+            if cancel.is_set() or config.shutting_down: return # Quit
+            Debug.logger.debug(f"Plot {which} took {poller.elapsed():.1f}s and {poller.polls} polls")
 
-                results_url:str = f"{SPANSH_RESULTS}/{job}"
-                route_response = SESSION.get(results_url, headers={'User-Agent': Context.plugin_useragent}, timeout=5)
-                if route_response.status_code != 202:
-                    break
-                tries += 1
-                sleep(1)
-
-            if not route_response or route_response.status_code != 200 or self.cancel_plot:
+            if not route_response or route_response.status_code != 200:
                 self.plot_error(which, params, route_response)
                 return
+            self._plot_time(which, monotonic() - start)
+
+            # Stream the result straight into the route's columns rather than loading it whole
+            chunks:Iterable = route_response.iter_content(STREAM_CHUNK) if isinstance(route_response, Response) \
+                else [route_response.content]
+            hdrs, rte = route_rows(result_waypoints(url, chunks))
 
-            raw_result = json.loads(route_response.content)["result"]
-            if url in (SPANSH_RICHES_ROUTE, SPANSH_EXOBIOLOGY_ROUTE):
-                # Every "systems containing bodies" route (Road to Riches and its body_types-filtered
-                # variants, plus Exobiology) returns this same nested shape.
-                res:list = self._flatten_bodies_result(raw_result)
-            elif url == SPANSH_TRADE_ROUTE:
-                res:list = self._flatten_trade_result(raw_result)
-            elif url == SPANSH_FLEETCARRIER_ROUTE:
-                # distance == 0 marks bookkeeping rows -- the initial source, and each
-                # requested stop's leg-restart duplicate -- not real jumps. Every other row,
-                # including every intermediate hop of a long single-leg route, is a real jump.
-                res:list = [j for j in raw_result.get('jumps', []) if j.get('distance', 0) != 0]
-            else:
-                res:list = raw_result.get('jumps', raw_result.get('system_jumps', []))
-
-            if res == []:
+            if rte == []:
                 Debug.logger.info(f"Spansh returned no results for {which}, {params}")
                 Context.ui.show_frame(which) # Return to the plot gui
                 Context.ui.show_error(errs["plot_error"])
                 return
 
-            cols:list = []; hdrs:list = []; h:str
-            for h in HEADERS:
-                k:str
-                for k in res[0].keys():
-                    if HEADER_MAP.get(k, '') == h:
-                        hdrs.append(h)
-                        cols.append(k)
-
-            rte:list = []
-            for i, waypoint in enumerate(res):
-                r:list = []
-                for c in cols:
-                    if re.match(r"^(\d+)$", str(waypoint.get(c, ''))):
-                        r.append(round(int(waypoint.get(c, 0)), 2))
-                        continue
-                    if re.match(r"^\d+\.(\d+)?$", str(waypoint.get(c, ''))):
-                        r.append(round(float(waypoint.get(c, 0)), 2))
-                        continue
-                    r.append(waypoint.get(c, ''))
-                rte.append(r)
-
-            Context.route = Route(hdrs, rte)
-            Context.route.offset = 0
-
-            if Context.route.fleetcarrier and self.carrier_location != '':
-                Context.route.update_route(0, self.carrier_location)
-            if not Context.route.fleetcarrier:
-                Context.route.update_route(0, self.system)
-
-            Context.ui.show_frame('Route')
-            Context.overlay.update_overlays()
-            self.save()
+            self.plot_cache.put(which, params, hdrs, rte)
+            self._new_route(hdrs, rte)
 
         except Exception as e:
             Debug.logger.error(f"Failed to plot route {which}, {params}\nexception info:", exc_info=e)
@@ -399,6 +481,23 @@ class Router():
             Context.ui.show_error(errs["plot_error"])
 
 
+    def _new_route(self, hdrs:list, rte:list) -> None:
+        """ Make a freshly plotted route the current one and show it """
+        Context.route = Route(hdrs, rte)
+        Context.route.offset = 0
+        self.systems.add(Context.route.column(Context.route.sc))
+
+        if Context.route.fleetcarrier and self.carrier_location != '':
+            Context.route.update_route(0, self.carrier_location)
+        if not Context.route.fleetcarrier:
+            Context.route.update_route(0, self.system)
+
+        Context.ui.show_frame('Route')
+        Context.overlay.update_overlays()
+        self.save_route()
+        self.save()
+
+
     @catch_exceptions
     def plot_error(self, which:str, params:dict, response:Response|None) -> None:
         """ Parse the response from Spansh on a failed route query """
@@ -424,6 +523,7 @@ class Router():
         Context.route = Route([], [], -1)
         if Context.overlay:
             Context.overlay.update_overlays()
+        self.save_route()
         self.save()
 
     @catch_exceptions
@@ -437,10 +537,13 @@ class Router():
                 return False
 
             Context.route = Route(Context.csv.headers, Context.csv.route)
+            Context.csv.route = [] # The route owns the rows now
+            self.systems.add(Context.route.column(Context.route.sc))
             self.src = Context.route.source()
             self.dest = Context.route.destination()
 
             Context.route.update_route(0, self.system)
+            self.save_route()
             Context.overlay.update_overlays()
             Context.overlay.show_frame('Default')
 
@@ -467,58 +570,90 @@ class Router():
 
 
     def _get_module_data(self) -> None:
-        """ Download module data from Coriolis """
+        """ Download module data from Coriolis, only transferring the files that have changed """
         try:
-            modules:list = []
-            for key, url  in {"fsd": f"{GH_MODULES}/standard/frame_shift_drive.json",
-                              "gfsb": f"{GH_MODULES}/internal/guardian_fsd_booster.json",
-                              "ft": f"{GH_MODULES}/standard/fuel_tank.json"}.items():
-                r:Response = SESSION.get(url, headers={'User-Agent': Context.plugin_useragent}, timeout=10)
-                if r.status_code != 200:
-                    Debug.logger.info(f"Could not download FSD data (status code {r.status_code}): {r.text}")
-                    return
-
-                data:dict = json.loads(r.content)
-                if data.get(key, []) == []:
-                    Debug.logger.error(f"No {key} found {json.loads(r.content)} {r.content}")
-                    return
-                modules = modules + data.get(key, [])
-
-            Context.modules = modules
+            dir:Path = Path(Context.plugin_dir) / DATA_DIR
+            file:Path = dir / MODULE_DATA
+            meta_file:Path = dir / MODULE_META
+            meta:dict = {}
+            if Context.modules and meta_file.exists():
+                with open(meta_file) as json_file:
+                    meta = json.load(json_file)
+
+            with ThreadPoolExecutor(max_workers=len(MODULE_SOURCES), thread_name_prefix="Neutron Dancer module download") as pool:
+                results:dict = dict(zip(MODULE_SOURCES, pool.map(lambda k: self._get_module_file(k, meta.get(k, {})), MODULE_SOURCES)))
+
+            # Only replace the catalogue once we have every part of it
+            if any(r is None for r in results.values()): return
+            if all(r[1] == meta.get(k) for k, r in results.items()):
+                Debug.logger.debug("Module data is unchanged")
+                if file.exists(): os.utime(file)
+                return
+
+            Context.modules = index_modules([m for mods, _ in results.values() for m in mods])
+            self.shipyard.ships.clear() # Rebuild ships with the new data as they're next used
             Debug.logger.debug(f"Downloaded {len(Context.modules)} FSD entries from Coriolis")
 
-            dir:Path = Path(Context.plugin_dir) / DATA_DIR
             dir.mkdir(parents=True, exist_ok=True)
-            file:Path = Path(Context.plugin_dir) / DATA_DIR / 'module_data.json'
-
-            with open(file, 'w') as outfile:
-                json.dump(Context.modules, outfile)
+            write_atomic(file, json.dumps(Context.modules))
+            write_atomic(meta_file, json.dumps({k: r[1] for k, r in results.items()}))
 
         except Exception as e:
             Debug.logger.error("Failed to download FSD data, exception info:", exc_info=e)
 
 
+    def _get_module_file(self, key:str, meta:dict) -> tuple[list, dict]|None:
+        """ Fetch one module file, returns its modules and validators or None if it failed """
+        headers:dict = {'User-Agent': Context.plugin_useragent}
+        if meta.get('etag'): headers['If-None-Match'] = meta['etag']
+        if meta.get('modified'): headers['If-Modified-Since'] = meta['modified']
+        r:Response = HTTP.get('modules', f"{GH_MODULES}/{MODULE_SOURCES[key]}", headers=headers)
+
+        if r.status_code == 304:
+            mods:list = [Context.modules[s] for s in meta.get('symbols', []) if s in Context.modules]
+            if len(mods) == len(meta.get('symbols', [])): return (mods, meta)
+            Debug.logger.debug(f"Our copy of {key} is incomplete, downloading it again")
+            return self._get_module_file(key, {})
+
+        if r.status_code != 200:
+            Debug.logger.info(f"Could not download FSD data (status code {r.status_code}): {r.text}")
+            return None
+
+        data:dict = json.loads(r.content)
+        if data.get(key, []) == []:
+            Debug.logger.error(f"No {key} found {r.content}")
+            return None
+        return (data[key], {'etag': r.headers.get('ETag'), 'modified': r.headers.get('Last-Modified'),
+                            'symbols': [m['symbol'].lower() for m in data[key]]})
+
+
+    def _fetch_module_data(self) -> None:
+        """ Download module data in the background then hand over to the main thread """
+        self._get_module_data()
+        th.dispatcher.post(self._modules_loaded, Context.modules_ready)
+
+
+    @catch_exceptions
+    def _modules_loaded(self, ready:Future) -> None:
+        """ Let anything waiting on the module data know and show the current ship's range now we can calculate it """
+        if ready.done(): return # Just a refresh
+        ready.set_result(Context.modules) # Ships calculate their attributes now
+        if not Context.modules or Context.ui is None: return
+        if self.ship is None or self.ship.loadout == {}: return
+        Context.ui.switch_ship(self.ship)
+
+
     @catch_exceptions
     def load_ship(self, which:str = "") -> Ship|None:
         """ Load a ship """
         if which == self.ship_id and self.ship: return self.ship
         if which in self.shiplist.values(): which = self.shipid(which)
-
-        dir:Path = Path(Context.plugin_dir) / DATA_DIR / SHIP_DIR
-        dir.mkdir(parents=True, exist_ok=True)
-        file:Path = dir / f"{which}.json"
-        if file.exists():
-            with open(file) as json_file:
-                return Ship(json.load(json_file))
+        return self.shipyard.get(which)
 
 
     @catch_exceptions
     def _save_ship(self, ship:Ship) -> None:
-        dir:Path = Path(Context.plugin_dir) / DATA_DIR / SHIP_DIR
-        dir.mkdir(parents=True, exist_ok=True)
-        file:Path = dir / f"{ship.id}.json"
-        with open(file, 'w') as outfile:
-            json.dump(ship.as_dict(), outfile, indent=4)
+        self.shipyard.put(ship)
 
 
     @catch_exceptions
@@ -526,26 +661,44 @@ class Router():
         """ Load state from files """
 
         # Get the FSD data from Coriolis' github repo
-        Context.modules = []
-        file = Path(Context.plugin_dir) / DATA_DIR / 'module_data.json'
+        Context.modules = {}
+        Context.modules_ready = Future()
+        file = Path(Context.plugin_dir) / DATA_DIR / MODULE_DATA
         if file.exists():
             with open(file) as json_file:
                 Context.modules = json.load(json_file)
                 Debug.logger.debug(f"Loaded {len(Context.modules)} modules from local file")
-
-        # We need this so do it synchronously
-        if Context.modules == []:
-            self._get_module_data()
-
-        if not file.exists() or file.stat().st_mtime < time() - 86400:
-            Debug.logger.debug("Module data is more than a day old, downloading fresh data")
-            thread:Thread = Thread(target=self._get_module_data, args=[], name="Neutron Dancer FSD data downloader")
+            if isinstance(Context.modules, list): # The old unindexed form, replaced by the next download
+                Context.modules = index_modules(Context.modules)
+        if Context.modules:
+            Context.modules_ready.set_result(Context.modules)
+
+        # Ships work out their ranges once this finishes, so don't hold up EDMC's window waiting for it
+        if not Context.modules or file.stat().st_mtime < time() - 86400:
+            Debug.logger.debug("Module data is missing or more than a day old, downloading fresh data")
+            thread:Thread = Thread(target=self._fetch_module_data, args=[], daemon=True,
+                                   name="Neutron Dancer FSD data downloader")
             thread.start()
 
+        self._route_id = ''
         file:Path = Path(Context.plugin_dir) / DATA_DIR / 'route.json'
         if file.exists():
             with open(file) as json_file:
                 self._from_dict(json.load(json_file))
+        if self._route_id == '': # Not migrated from the state file
+            self._load_route()
+
+
+    @catch_exceptions
+    def _index_systems(self) -> None:
+        """ Index the systems in our history, the current and cached routes and any systems dump """
+        self.systems.add(chain(self.history, [self.system, self.src, self.dest, self.carrier_location]))
+        self.systems.add(Context.route.column(Context.route.sc))
+        self.systems.add(self.plot_cache.systems())
+
+        dump:Path = Path(Context.plugin_dir) / DATA_DIR / SYSTEM_DUMP
+        if dump.exists(): self.systems.load(dump)
+        Debug.logger.debug(f"Indexed {len(self.systems)} systems")
 
 
     @catch_exceptions
@@ -554,9 +707,84 @@ class Router():
 
         dir:Path = Path(Context.plugin_dir) / DATA_DIR
         dir.mkdir(parents=True, exist_ok=True)
-        file:Path = dir / 'route.json'
-        with open(file, 'w') as outfile:
-            json.dump(self._as_dict(), outfile, indent=4)
+        write_atomic(dir / 'route.json', json.dumps(self._as_dict(), indent=4))
+        self.save_progress()
+
+
+    @catch_exceptions
+    def save_route(self) -> None:
+        """ Save the route itself, once per route, and start a fresh progress log for it """
+
+        dir:Path = Path(Context.plugin_dir) / DATA_DIR
+        dir.mkdir(parents=True, exist_ok=True)
+        self._route_id = f"{time_ns():x}"
+        write_snapshot(dir / ROUTE_SNAPSHOT, Context.route, self._route_id)
+        (dir / ROUTE_BODY).unlink(missing_ok=True)
+        self._write_progress(Context.route.offset)
+
+
+    @catch_exceptions
+    def save_progress(self) -> None:
+        """ Append the current offset to the progress log if it's moved """
+
+        if self._route_id == '' or Context.route.offset == self._logged_offset: return
+        file:Path = Path(Context.plugin_dir) / DATA_DIR / PROGRESS_LOG
+        with open(file, 'a') as log:
+            log.write(json.dumps({'offset': Context.route.offset, 'time': int(time())}) + '\n')
+        self._logged_offset = Context.route.offset
+
+
+    def _write_progress(self, offset:int) -> None:
+        """ Replace the progress log with just its header and the given offset """
+
+        file:Path = Path(Context.plugin_dir) / DATA_DIR / PROGRESS_LOG
+        write_atomic(file, json.dumps({'route': self._route_id}) + '\n' +
+                     json.dumps({'offset': offset, 'time': int(time())}) + '\n')
+        self._logged_offset = offset
+
+
+    @catch_exceptions
+    def _load_route(self) -> None:
+        """ Load the route and replay its progress log, then compact the log """
+
+        dir:Path = Path(Context.plugin_dir) / DATA_DIR
+        route:Route = Route([], [], -1)
+        id:str = ''
+        try:
+            id, route = read_snapshot(dir / ROUTE_SNAPSHOT)
+        except SnapshotError as e:
+            # Fall back to (and migrate) a route saved as JSON
+            file:Path = dir / ROUTE_BODY
+            if file.exists():
+                Debug.logger.info(f"Migrating {ROUTE_BODY} to {ROUTE_SNAPSHOT}")
+                with open(file) as json_file:
+                    body:dict = json.load(json_file)
+                id = body.get('id', '')
+                route = Route(body.get('hdrs', []), body.get('route', []))
+                write_snapshot(dir / ROUTE_SNAPSHOT, route, id)
+                file.unlink()
+            elif (dir / ROUTE_SNAPSHOT).exists():
+                Debug.logger.error(f"Unable to load route: {e}")
+
+        offset:int = -1
+        log:Path = dir / PROGRESS_LOG
+        if log.exists():
+            with open(log) as f:
+                lines:list = f.readlines()
+            for i, line in enumerate(lines):
+                try:
+                    entry:dict = json.loads(line)
+                except json.JSONDecodeError: # Cut short by a crash
+                    continue
+                if i == 0 and entry.get('route') != id:
+                    Debug.logger.info("Progress log doesn't match the route, ignoring it")
+                    break
+                offset = entry.get('offset', offset)
+
+        route.offset = offset
+        Context.route = route
+        self._route_id = id
+        if id != '': self._write_progress(offset)
 
 
     def _as_dict(self) -> dict:
@@ -564,18 +792,21 @@ class Router():
 
         save:dict = {k: getattr(self, k, v) for k, v in SAVE_VARS.items()}
         save['ship'] = self.ship.as_dict() if self.ship else {}
-        if Context.route != None:
-            save['route'] = Context.route.to_dict()
         return save
 
     def _from_dict(self, dict:dict) -> None:
         """ Populate our data from a Dictionary that has been deserialized """
 
         [setattr(self, k, dict.get(k, v)) for k, v in SAVE_VARS.items()]
-        r = dict.get('route', ([], [], -1))
-        (hdrs, route, offset) = r[0:3]
-        Context.route = Route(hdrs, route, offset)
         self.ship = Ship(dict.get('ship', {}))
+
+        # Migrate a route stored in the state file to its own file
+        if 'route' in dict:
+            Debug.logger.info(f"Migrating route to {ROUTE_SNAPSHOT}")
+            (hdrs, route, offset) = dict['route'][0:3]
+            Context.route = Route(hdrs, route, offset)
+            self.save_route()
+            self.save()
         ships = {k: Ship(data) for k, data in dict.get('ships', {}).items()}
 
         # Migrate
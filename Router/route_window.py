@@ -8,7 +8,7 @@ from .utils.misc import singleton, hfplus
 from .utils.treeviewplus import TreeviewPlus
 
 from .constants import FONT, BOLD, NAME, HEADER_TYPES, lbls
-from .route import Route
+from .route import Route, RouteProgress
 from .context import Context
 
 
@@ -65,36 +65,36 @@ class RouteWindow:
         self.window.destroy()
         return
 
-    def _jump_summary(self, parent:tk.Frame, route:Route) -> None:
+    def _jump_summary(self, parent:tk.Frame, route:Route, prog:RouteProgress) -> None:
         """ Display a summary of the next jump """
         txt:str = lbls['jumps'] if route.jc != None else lbls['waypoints']
         ttl:ttk.Label = ttk.Label(parent, text=txt.title(), font=BOLD)
         ttl.pack(side=tk.LEFT, padx=5)
 
-        jumps:tuple = tuple([route.total_jumps() - route.jumps_remaining(), 'int', '0'])
-        tjumps:tuple = tuple([route.total_jumps(), 'int'])
+        jumps:tuple = tuple([prog.total_jumps - prog.jumps_remaining, 'int', '0'])
+        tjumps:tuple = tuple([prog.total_jumps, 'int'])
         jstr:str = f"{hfplus(jumps)} / {hfplus(tjumps)}"
         lbl:ttk.Label = ttk.Label(parent, text=jstr, font=FONT)
         lbl.pack(side=tk.LEFT, padx=5)
 
-    def _speed_summary(self, parent:tk.Frame, route:Route) -> None:
+    def _speed_summary(self, parent:tk.Frame, prog:RouteProgress) -> None:
         """ Display a summary of the speed """
         ttl:ttk.Label = ttk.Label(parent, text=f"{lbls['speed'].title()}", font=BOLD)
         ttl.pack(side=tk.LEFT, padx=5)
 
-        jph:tuple = tuple([route.jumps_per_hour(), 'int', '-', lbls['jumps_per_hour']])
-        dph:tuple = tuple([route.dist_per_hour(), 'float', '-', lbls['dist_per_hour']])
+        jph:tuple = tuple([prog.jumps_per_hour, 'int', '-', lbls['jumps_per_hour']])
+        dph:tuple = tuple([prog.dist_per_hour, 'float', '-', lbls['dist_per_hour']])
         dstr:str = f"{hfplus(jph)} / {hfplus(dph)}"
         lbl:ttk.Label = ttk.Label(parent, text=dstr, font=FONT)
         lbl.pack(side=tk.LEFT, padx=5)
 
-    def _distance_summary(self, parent:tk.Frame, route:Route) -> None:
+    def _distance_summary(self, parent:tk.Frame, prog:RouteProgress) -> None:
         """ Display a summary of the distance """
         ttl:ttk.Label = ttk.Label(parent, text=f"{lbls['distance'].title()}", font=BOLD)
         ttl.pack(side=tk.LEFT, padx=5)
 
-        dist:tuple = tuple([route.total_dist() - route.dist_remaining(), 'float', '0', ''])
-        dstr:str = f"{hfplus(dist)} / {hfplus(route.total_dist())} ly"
+        dist:tuple = tuple([prog.total_dist - prog.dist_remaining, 'float', '0', ''])
+        dstr:str = f"{hfplus(dist)} / {hfplus(prog.total_dist)} ly"
         lbl:ttk.Label = ttk.Label(parent, text=dstr, font=FONT)
         lbl.pack(side=tk.LEFT, padx=5)
 
@@ -117,22 +117,23 @@ class RouteWindow:
         """ Display a summary of the route """
         frm:tk.Frame = tk.Frame(parent)
         frm.pack(fill=tk.X, padx=5, pady=5)
+        prog:RouteProgress = route.progress()
 
         # Progress
         ttl:ttk.Label = ttk.Label(frm, text=f"{lbls['progress'].title()}", font=BOLD)
         ttl.pack(side=tk.LEFT, padx=5)
 
-        pfl:float = route.perc_dist_rem() if route.dr != None else route.perc_jumps_rem()
+        pfl:float = prog.perc_dist if route.dr != None else prog.perc_jumps
         lbl:ttk.Label = ttk.Label(frm, text=f"{int(pfl)}%", font=FONT)
         lbl.pack(side=tk.LEFT, padx=5)
 
         # Jumps
-        if route.total_jumps() > 0:
-            self._jump_summary(frm, route)
+        if prog.total_jumps > 0:
+            self._jump_summary(frm, route, prog)
 
         # Distance
-        if route.total_dist() > 0:
-            self._distance_summary(frm, route)
+        if prog.total_dist > 0:
+            self._distance_summary(frm, prog)
 
         # Value (Trade profit, Road to Riches/Exobiology scan/mapping/landmark value) --
         # blank for route types with no earned-value column (Neutron/Galaxy/Tourist/FleetCarrier)
@@ -141,8 +142,8 @@ class RouteWindow:
             self._value_summary(frm, route)
 
         # Speed
-        if route.jumps_per_hour() > -1:
-            self._speed_summary(frm, route)
+        if prog.jumps_per_hour > -1:
+            self._speed_summary(frm, prog)
 
     @catch_exceptions
     def _table(self, parent:tk.Frame, route:Route, scale:float) -> int:
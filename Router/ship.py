@@ -1,7 +1,15 @@
-from .utils.debug import Debug
+from array import array
+
+from .utils.debug import Debug, catch_exceptions
 from .utils.misc import get_by_path
 from .context import Context
 
+
+def index_modules(modules:list) -> dict:
+    """ Key module details by their lowercase symbol so a loadout's modules can be looked up directly """
+    return {m['symbol'].lower(): m for m in modules if 'symbol' in m}
+
+
 class Ship:
     def __init__(self, entry:dict) -> None:
         """ Ship details. Used to store ship loadout and calculate attributes for route plotting. """
@@ -18,6 +26,8 @@ class Ship:
         self.tank_size:float = 0.0
         self.internal_tank_size:float = 0.0
         self.range_boost:int = 0
+        self.cargo_capacity:int = 0
+        self.ranges:array = array('d') # Unrounded range by whole tonnes of cargo plus fuel
         self.range:float = 32.0
         self.supercharge_multiplier:int = 4
         self.injection_multiplier:int = 2
@@ -33,11 +43,8 @@ class Ship:
                 return
             entry = entry['loadout']
 
-        if Context.modules == []:
-            Debug.logger.error(f"Modules not loaded, cannot initialize ship.")
-            return
-
         self.loadout = entry
+        self.cargo_capacity = entry.get('CargoCapacity', 0)
 
         # Create Standard Loadout Exchange Format (SLEF)
         self.slef:list = [{
@@ -46,15 +53,30 @@ class Ship:
             }]
 
         fsd:dict = [m for m in entry.get('Modules', []) if m['Slot'] == 'FrameShiftDrive'][0]
-        fsd_type:str = fsd['Item']
+        self.supercharge_multiplier = 6 if fsd['Item'].lower().endswith('overchargebooster_mkii') else 4
+
+        # The module data may still be downloading, if so work out our attributes when it arrives
+        if Context.modules_ready is None or Context.modules_ready.done():
+            self._calculate()
+        else:
+            Context.modules_ready.add_done_callback(lambda _: self._calculate())
 
-        self.supercharge_multiplier = 6 if fsd_type.lower().endswith('overchargebooster_mkii') else 4
 
-        tmp:list = [f for f in Context.modules if f['symbol'].lower() == fsd_type.lower()]
-        if tmp == []:
-            Debug.logger.error(f"FSD not found in Coriolis data: {fsd_type.lower()} {Context.modules}")
+    @catch_exceptions
+    def _calculate(self) -> None:
+        """ Derive the ship's attributes from its loadout and the module data """
+        if not Context.modules:
+            Debug.logger.error(f"Modules not loaded, cannot initialize ship.")
+            return
+
+        entry:dict = self.loadout
+        fsd:dict = [m for m in entry.get('Modules', []) if m['Slot'] == 'FrameShiftDrive'][0]
+        fsd_type:str = fsd['Item']
+
+        fsd_info:dict|None = Context.modules.get(fsd_type.lower())
+        if fsd_info is None:
+            Debug.logger.error(f"FSD not found in Coriolis data: {fsd_type.lower()} ({len(Context.modules)} modules)")
             return
-        fsd_info:dict = tmp[0]
 
         self.fuel_power:float = fsd_info.get('fuelpower', 1.0) # fuelpower
         self.fuel_multiplier:float = fsd_info.get('fuelmul', 1.0) # fuelmul
@@ -69,7 +91,7 @@ class Ship:
 
         # Main tank
         ft_type:str = [m['Item'] for m in entry.get('Modules', []) if m['Slot'] == 'FuelTank'][0]
-        ft:dict = [f for f in Context.modules if f['symbol'].lower() == ft_type.lower()][0]
+        ft:dict = Context.modules[ft_type.lower()]
         self.tank_size:float = ft.get('fuel', 0)
 
         # Reserve tank
@@ -78,23 +100,42 @@ class Ship:
         # Additional tanks
         fts:list = [m['Item'] for m in entry.get('Modules', []) if m['Slot'] != 'FuelTank' and m['Item'].startswith('int_fueltank')]
         for ft_type in fts:
-            ft:dict = [f for f in Context.modules if f['symbol'].lower() == ft_type.lower()][0]
+            ft:dict = Context.modules[ft_type.lower()]
             self.tank_size += ft.get('fuel', 0)
 
         # Guardian FSD booster
         gfbs:list = [m['Item'] for m in entry.get('Modules', []) if m['Item'].startswith('int_guardianfsdbooster')]
         if gfbs != []:
-            gfb:dict = [f for f in Context.modules if f['symbol'].lower() == gfbs[0].lower()][0]
+            gfb:dict = Context.modules[gfbs[0].lower()]
             self.range_boost = gfb.get('jumpboost', 0.0) # range boost from guardian FSD booster
 
         # Base range calculation
+        self.ranges = self._range_table()
         self.range:float = self.get_range()
 
 
-    def get_range(self, cargo:int = 0) -> float:
-        """ Return the range of this ship with a given quantity of cargo """
+    def _range_table(self) -> array:
+        """
+            Ranges for every whole tonne from empty to a full hold and a full tank. Range only depends on
+            the total mass so one entry covers every mix of cargo and fuel that adds up to it, and it's
+            close enough to a straight line within a tonne that fractions of one are interpolated.
+        """
+        try:
+            factor:float = (self.max_fuel_per_jump / self.fuel_multiplier) ** (1 / self.fuel_power)
+            return array('d', [(self.optimal_mass / (self.base_mass + t)) * factor + self.range_boost
+                               for t in range(int(self.cargo_capacity + self.tank_size) + 1)])
+        except Exception:
+            return array('d')
+
+
+    def get_range(self, cargo:int = 0, fuel:float|None = None) -> float:
+        """ Return the range of this ship with a given quantity of cargo and fuel, a full tank if no fuel is given """
+        mass:float = cargo + (self.tank_size if fuel is None else fuel)
+        if len(self.ranges) > 1 and 0 <= mass <= len(self.ranges) - 1:
+            i:int = min(int(mass), len(self.ranges) - 2)
+            return round(self.ranges[i] + (self.ranges[i + 1] - self.ranges[i]) * (mass - i), 2)
         try:
-            return round((self.optimal_mass / (self.base_mass + self.tank_size + cargo)) * \
+            return round((self.optimal_mass / (self.base_mass + mass)) * \
                                 (self.max_fuel_per_jump / self.fuel_multiplier) ** \
                                 (1 / self.fuel_power) + \
                                 self.range_boost, 2)
@@ -102,6 +143,11 @@ class Ship:
             return 32.0
 
 
+    def laden_range(self) -> float:
+        """ Range with a full hold and a full tank """
+        return self.get_range(self.cargo_capacity)
+
+
     def __repr__(self) -> str:
         return f"ID {self.id}, name {self.name}, type {self.type}, unladen range {self.range:.2f}ly)"
 
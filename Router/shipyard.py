@@ -0,0 +1,109 @@
+import json
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+
+from .utils.debug import Debug, catch_exceptions
+
+from .constants import SHIPYARD_CACHE
+from .ship import Ship
+
+
+def loadout_hash(loadout:dict) -> str:
+    """ Hash of a loadout ignoring when it was sent, so the same fit always gives the same hash """
+    blob:str = json.dumps({k: v for k, v in loadout.items() if k != 'timestamp'}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+class Shipyard:
+    """
+        Every ship's loadout in a single file indexed by ship id. The file is read once, the most
+        recently used ships are kept ready built and it's only rewritten when a loadout changes.
+    """
+    def __init__(self, file:Path, legacy:Path|None = None, size:int = SHIPYARD_CACHE) -> None:
+        self.file:Path = file
+        self.legacy:Path|None = legacy
+        self.size:int = size
+        self.ships:OrderedDict = OrderedDict()
+        self._store:dict|None = None
+
+
+    @property
+    def store(self) -> dict:
+        """ Ship id -> {'hash', 'loadout'}, read on first use """
+        if self._store is None:
+            self._store = self._read()
+        return self._store
+
+
+    def __contains__(self, id:str) -> bool:
+        return id in self.store
+
+
+    def get(self, id:str) -> Ship|None:
+        """ A ship from the shipyard """
+        if id in self.ships:
+            self.ships.move_to_end(id)
+            return self.ships[id]
+        if id not in self.store: return None
+
+        ship:Ship = Ship(self.store[id]['loadout'])
+        self._remember(id, ship)
+        return ship
+
+
+    def put(self, ship:Ship) -> bool:
+        """ Add or update a ship, returns whether the store had to be rewritten """
+        if not ship.id or ship.loadout == {}: return False
+        self._remember(ship.id, ship)
+
+        hash:str = loadout_hash(ship.loadout)
+        if self.store.get(ship.id, {}).get('hash') == hash: return False
+
+        self.store[ship.id] = {'hash': hash, 'loadout': ship.loadout}
+        self._write()
+        return True
+
+
+    def _remember(self, id:str, ship:Ship) -> None:
+        self.ships[id] = ship
+        self.ships.move_to_end(id)
+        while len(self.ships) > self.size:
+            self.ships.popitem(last=False)
+
+
+    @catch_exceptions
+    def _write(self) -> None:
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        tmp:Path = self.file.with_name(self.file.name + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.store, f, separators=(',', ':'))
+        tmp.replace(self.file)
+
+
+    def _read(self) -> dict:
+        """ Read the store, or build it from the per-ship files that came before it """
+        try:
+            if self.file.exists():
+                with open(self.file) as f:
+                    return json.load(f)
+        except Exception as e:
+            Debug.logger.error(f"Failed to read {self.file}, exception info:", exc_info=e)
+            return {}
+
+        if self.legacy is None or not self.legacy.is_dir(): return {}
+
+        store:dict = {}
+        for file in sorted(self.legacy.glob('*.json')):
+            try:
+                with open(file) as f:
+                    loadout:dict = json.load(f)
+                store[file.stem] = {'hash': loadout_hash(loadout), 'loadout': loadout}
+            except Exception as e:
+                Debug.logger.error(f"Failed to read {file}, exception info:", exc_info=e)
+
+        if store != {}:
+            Debug.logger.info(f"Migrating {len(store)} ships to {self.file.name}")
+            self._store = store
+            self._write()
+        return store
@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+from array import array
+from pathlib import Path
+from typing import Any
+
+from .columns import ColumnStore, Flags, Numbers, Strings
+from .route import Route
+
+MAGIC:bytes = b'NDROUTE\0'
+VERSION:int = 1
+
+
+class SnapshotError(Exception):
+    """ A snapshot that's missing, damaged or from a version we can't read """
+
+
+class _Writer:
+    """ Collects the binary blobs that follow the snapshot header """
+    def __init__(self) -> None:
+        self.blobs:list = []
+        self.size:int = 0
+
+
+    def add(self, data:bytes) -> dict:
+        self.blobs.append(data)
+        self.size += len(data)
+        return {'at': self.size - len(data), 'size': len(data)}
+
+
+    def array(self, arr:array) -> dict:
+        return {'typecode': arr.typecode} | self.add(arr.tobytes())
+
+
+def _column(col:Any, out:_Writer) -> dict:
+    """ Describe a column and add its data """
+    if isinstance(col, array):
+        return {'kind': 'array'} | out.array(col)
+    if isinstance(col, Flags):
+        return {'kind': 'flags', 'length': col.size} | out.add(bytes(col.bits))
+    if isinstance(col, Numbers):
+        return {'kind': 'numbers', 'ints': out.add(bytes(col.ints.bits))} | out.array(col.values)
+    if isinstance(col, Strings):
+        return {'kind': 'strings', 'values': col.values} | out.array(col.codes)
+    if all(type(v) is str for v in col) and not any('\0' in v for v in col):
+        return {'kind': 'text', 'length': len(col)} | out.add('\0'.join(col).encode('utf-8'))
+    return {'kind': 'json'} | out.add(json.dumps(list(col), separators=(',', ':')).encode('utf-8'))
+
+
+def write_snapshot(file:Path, route:Route, id:str) -> None:
+    """ Save a route as a snapshot: a JSON header describing the columns followed by their raw data """
+    store:ColumnStore = route.route if isinstance(route.route, ColumnStore) else ColumnStore(route.route)
+    out:_Writer = _Writer()
+    indexes:dict = route.indexes()
+
+    header:dict = {
+        'id': id, 'byteorder': sys.byteorder, 'rows': len(store), 'hdrs': route.hdrs,
+        'columns': [_column(col, out) for col in store.columns],
+        'indexes': {
+            'fuel_stops': out.array(array('q', indexes['fuel_stops'])),
+            'neutrons': out.array(array('q', indexes['neutrons'])),
+            'cum_jumps': out.array(indexes['cum_jumps']),
+            'cum_values': {str(c): out.array(arr) for c, arr in indexes['cum_values'].items()}
+        }
+    }
+    head:bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+
+    tmp:Path = file.with_name(file.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + VERSION.to_bytes(2, 'little') + len(head).to_bytes(4, 'little') + head)
+        for blob in out.blobs:
+            f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(file)
+
+
+def read_snapshot(file:Path, offset:int = -1) -> tuple[str, Route]:
+    """ Load a snapshot with a single read, returns the route's id and the route """
+    try:
+        data:memoryview = memoryview(file.read_bytes())
+    except OSError as e:
+        raise SnapshotError(f"Can't read {file}: {e}")
+
+    if bytes(data[:len(MAGIC)]) != MAGIC: raise SnapshotError(f"{file} isn't a route snapshot")
+    pos:int = len(MAGIC)
+    version:int = int.from_bytes(data[pos:pos+2], 'little')
+    if version != VERSION: raise SnapshotError(f"{file} is version {version}, expected {VERSION}")
+    size:int = int.from_bytes(data[pos+2:pos+6], 'little')
+    pos += 6
+
+    try:
+        header:dict = json.loads(bytes(data[pos:pos+size]))
+        base:int = pos + size
+        swap:bool = header['byteorder'] != sys.byteorder
+
+        def blob(desc:dict) -> memoryview:
+            return data[base + desc['at']:base + desc['at'] + desc['size']]
+
+        def arr(desc:dict) -> array:
+            a:array = array(desc['typecode'])
+            a.frombytes(blob(desc))
+            if swap: a.byteswap()
+            return a
+
+        columns:list = []
+        for desc in header['columns']:
+            match desc['kind']:
+                case 'array':
+                    columns.append(arr(desc))
+                case 'flags':
+                    flags:Flags = Flags([])
+                    flags.size = desc['length']
+                    flags.bits = bytearray(blob(desc))
+                    columns.append(flags)
+                case 'numbers':
+                    numbers:Numbers = Numbers([])
+                    numbers.values = arr(desc)
+                    numbers.ints.size = len(numbers.values)
+                    numbers.ints.bits = bytearray(blob(desc['ints']))
+                    columns.append(numbers)
+                case 'strings':
+                    strings:Strings = Strings(desc['values'])
+                    strings.codes = arr(desc)
+                    columns.append(strings)
+                case 'text':
+                    columns.append(str(blob(desc), 'utf-8').split('\0') if desc['length'] else [])
+                case 'json':
+                    columns.append(json.loads(bytes(blob(desc))))
+                case kind:
+                    raise SnapshotError(f"Unknown column kind {kind}")
+
+        idx:dict = header['indexes']
+        indexes:dict = {'fuel_stops': arr(idx['fuel_stops']), 'neutrons': arr(idx['neutrons']),
+                        'cum_jumps': arr(idx['cum_jumps']),
+                        'cum_values': {int(c): arr(d) for c, d in idx['cum_values'].items()}}
+
+    except (KeyError, TypeError, ValueError) as e:
+        raise SnapshotError(f"{file} is damaged: {e}")
+
+    if any(len(c) != header['rows'] for c in columns): raise SnapshotError(f"{file} is damaged: column lengths differ")
+    store:ColumnStore = ColumnStore(columns=columns)
+    return (header['id'], Route.restore(header['hdrs'], store, offset, indexes))
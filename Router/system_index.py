@@ -0,0 +1,102 @@
+import json
+from bisect import bisect_left
+from itertools import chain
+from pathlib import Path
+from threading import Lock
+from typing import Iterable, Iterator
+
+from .utils.debug import Debug
+
+from .constants import TYPEAHEAD_MIN, TYPEAHEAD_MAX_RESULTS
+
+
+def read_dump(file:Path) -> Iterator[str]:
+    """
+        System names from a dump, either one name per line or Spansh's systems dump format: a JSON
+        array with one system object per line
+    """
+    with open(file, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip().rstrip(',')
+            if line in ('', '[', ']'): continue
+            if not line.startswith('{'):
+                yield line
+                continue
+            try:
+                name:str|None = json.loads(line).get('name')
+            except ValueError:
+                continue
+            if name: yield name
+
+
+class SystemIndex:
+    """
+        The system names we already know about, kept sorted by their lowercase form so the names
+        starting with some input are found with a binary search, without asking Spansh.
+    """
+    def __init__(self) -> None:
+        self.keys:list = []  # Lowercase names, sorted
+        self.names:list = [] # The names as written, in the same order
+        self._lock:Lock = Lock()
+
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+    def add(self, names:Iterable) -> int:
+        """ Add some names, returns how many were new """
+        new:dict = {}
+        for name in names:
+            if not isinstance(name, str) or name.strip() == '': continue
+            name = name.strip()
+            new.setdefault(name.lower(), name)
+
+        with self._lock:
+            new = {k: v for k, v in new.items() if not self._has(k)}
+            if len(new) < 64:
+                for key, name in sorted(new.items()):
+                    i:int = bisect_left(self.keys, key)
+                    self.keys.insert(i, key)
+                    self.names.insert(i, name)
+            elif new != {}:
+                merged:list = sorted(chain(zip(self.keys, self.names), new.items()))
+                self.keys = [k for k, _ in merged]
+                self.names = [n for _, n in merged]
+        return len(new)
+
+
+    def search(self, inp:str, limit:int = TYPEAHEAD_MAX_RESULTS) -> list:
+        """ Known names starting with some input """
+        key:str = inp.strip().lower()
+        if len(key) < TYPEAHEAD_MIN: return []
+
+        with self._lock:
+            i:int = bisect_left(self.keys, key)
+            found:list = []
+            while i < len(self.keys) and len(found) < limit and self.keys[i].startswith(key):
+                found.append(self.names[i])
+                i += 1
+        return found
+
+
+    def find(self, name:str) -> str|None:
+        """ A known name as it's written, whatever the case of the input """
+        key:str = name.strip().lower()
+        with self._lock:
+            i:int = bisect_left(self.keys, key)
+            return self.names[i] if self._has(key, i) else None
+
+
+    def load(self, file:Path) -> None:
+        """ Add the names from a systems dump """
+        try:
+            added:int = self.add(read_dump(file))
+            Debug.logger.info(f"Indexed {added} systems from {file.name}")
+        except Exception as e:
+            Debug.logger.error(f"Failed to read {file}, exception info:", exc_info=e)
+
+
+    def _has(self, key:str, i:int|None = None) -> bool:
+        if i is None: i = bisect_left(self.keys, key)
+        return i < len(self.keys) and self.keys[i] == key
@@ -0,0 +1,97 @@
+import json
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Callable
+
+from .utils.debug import Debug, catch_exceptions
+
+from .constants import TYPEAHEAD_CACHE_SIZE, TYPEAHEAD_TTL, TYPEAHEAD_MIN, TYPEAHEAD_MAX_RESULTS, TYPEAHEAD_SAVE_EVERY
+
+
+class TypeaheadCache:
+    """
+        Recent autocomplete suggestions by kind (systems, stations) and input, kept in least recently
+        used order and saved to disk every so many new inputs and between sessions. A reply with fewer than TYPEAHEAD_MAX_RESULTS
+        suggestions holds every match, so longer input starting the same way is answered by filtering it.
+    """
+    def __init__(self, file:Path, size:int = TYPEAHEAD_CACHE_SIZE, ttl:int = TYPEAHEAD_TTL) -> None:
+        self.file:Path = file
+        self.size:int = size
+        self.ttl:int = ttl
+        self.dirty:bool = False
+        self.unsaved:int = 0
+        self._entries:OrderedDict|None = None
+        self._lock:Lock = Lock()
+
+
+    @property
+    def entries(self) -> OrderedDict:
+        """ "kind:input" -> [time, complete, suggestions], read on first use """
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+
+    def get(self, kind:str, inp:str, match:Callable[[str], str] = str) -> list|None:
+        """ Suggestions for some input, if we have them. match gives the part of a suggestion the input is matched against """
+        inp = inp.strip().lower()
+        with self._lock:
+            entry:list|None = self._fresh(f"{kind}:{inp}")
+            if entry is not None: return list(entry[2])
+
+            for n in range(len(inp) - 1, TYPEAHEAD_MIN - 1, -1):
+                entry = self._fresh(f"{kind}:{inp[:n]}")
+                if entry is not None and entry[1]:
+                    return [s for s in entry[2] if match(s).lower().startswith(inp)]
+        return None
+
+
+    def put(self, kind:str, inp:str, suggestions:list) -> None:
+        """ Remember the suggestions for some input, saving the cache once enough have been added """
+        key:str = f"{kind}:{inp.strip().lower()}"
+        with self._lock:
+            self.entries[key] = [time(), len(suggestions) < TYPEAHEAD_MAX_RESULTS, suggestions]
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+            self.dirty = True
+            self.unsaved += 1
+            due:bool = self.unsaved >= TYPEAHEAD_SAVE_EVERY
+        if due: self.save()
+
+
+    def _fresh(self, key:str) -> list|None:
+        entry:list|None = self.entries.get(key)
+        if entry is None: return None
+        if time() - entry[0] > self.ttl:
+            del self.entries[key]
+            self.dirty = True
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+
+    @catch_exceptions
+    def save(self) -> None:
+        """ Write the cache out if it's changed """
+        with self._lock:
+            if not self.dirty: return
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            tmp:Path = self.file.with_name(self.file.name + '.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(list(self.entries.items()), f, separators=(',', ':'))
+            tmp.replace(self.file)
+            self.dirty = False
+            self.unsaved = 0
+
+
+    def _read(self) -> OrderedDict:
+        try:
+            if self.file.exists():
+                with open(self.file) as f:
+                    return OrderedDict((k, v) for k, v in json.load(f) if time() - v[0] <= self.ttl)
+        except Exception as e:
+            Debug.logger.error(f"Failed to read {self.file}, exception info:", exc_info=e)
+        return OrderedDict()
@@ -17,10 +17,13 @@ from .utils.debug import Debug, catch_exceptions
 from .utils.misc import singleton, hfplus, str_truncate, PopupNotice, copy_to_clipboard
 from .utils.tkrichtext import RichScrolledText
 
-from .constants import NAME, SPANSH_SYSTEMS, SPANSH_STATIONS_NAME, SPANSH_SEARCH_SYSTEMS, ASSET_DIR, FONT, BOLD, lbls, btns, tts, errs
+from .constants import NAME, SPANSH_SYSTEMS, SPANSH_STATIONS_NAME, SPANSH_SEARCH_SYSTEMS, DATA_DIR, TYPEAHEAD_CACHE, ASSET_DIR, FONT, BOLD, lbls, btns, tts, errs
 from .ship import Ship
-from .route import Route
+from .route import Route, RouteProgress
+from .fuel import FuelPlan
 from .context import Context
+from .client import HTTP
+from .typeahead import TypeaheadCache
 from .route_window import RouteWindow
 from .plotters import PLOTTER_SPECS
 
@@ -48,6 +51,8 @@ class UI():
         self.frwidth:int = int(375 * (config.get_int('ui_scale') / 100))
         self.parent:tk.Widget|None = parent
         self.window_route:RouteWindow = RouteWindow(self.parent.winfo_toplevel())
+        th.dispatcher.attach(parent)
+        self.typeahead:TypeaheadCache = TypeaheadCache(Path(Context.plugin_dir) / DATA_DIR / TYPEAHEAD_CACHE)
 
         self.frame:th.Frame = th.Frame(parent, borderwidth=2)
         self.frame.grid(sticky=tk.NSEW)
@@ -205,8 +210,10 @@ class UI():
         self.route_lbl.grid(row=0, column=0, pady=5)
         self.busyimg:th.Label = th.Label(busy_fr, image=self.frames[0], justify=tk.CENTER)
         self.busyimg.grid(row=1, column=0, pady=10)
+        self.eta_lbl:th.Label = th.Label(busy_fr, text="", justify=tk.CENTER, font=FONT)
+        self.eta_lbl.grid(row=2, column=0)
         cancel:th.Button = th.Button(busy_fr, text=btns["cancel"], command=lambda: self.show_frame(Context.router.last_plot))
-        cancel.grid(row=2, column=0, pady=5)
+        cancel.grid(row=3, column=0, pady=5)
         return busy_fr
 
 
@@ -257,12 +264,7 @@ class UI():
     def _progress(self) -> int:
         """ Return progress as a percentage """
         if Context.route.route == []: return 0
-
-        if Context.route.jumps_remaining() == 0: return 100
-
-        if Context.route.total_dist() > 0:
-            return round(Context.route.perc_dist_rem())
-        return round(Context.route.perc_jumps_rem())
+        return Context.route.progress().percent
 
 
     @catch_exceptions
@@ -270,26 +272,27 @@ class UI():
         """ Update our progress tooltips and progress bar """
         if Context.route.route == [] or not hasattr(self, "route_fr"):
             return
+        prog:RouteProgress = Context.route.progress()
 
         # Create the tooltip with jumps/waypoints, distance, and speed depending on what we have
         tt:str = tts["jump"] if Context.route.jc != None else tts["waypoints"]
         j:str = ""; d:str = ""
-        if Context.route.jumps_remaining() > 0:
-            j = str(Context.route.jumps_remaining())
-        if Context.route.dist_remaining() > 0:
-            tmp:tuple = tuple([Context.route.dist_remaining(), 'float', '', ' Ly'])
+        if prog.jumps_remaining > 0:
+            j = str(prog.jumps_remaining)
+        if prog.dist_remaining > 0:
+            tmp:tuple = tuple([prog.dist_remaining, 'float', '', ' Ly'])
             d = f"({hfplus(tmp)}) "
         tt = tt.format(j=j, d=d)
 
-        if Context.route.jumps_per_hour() > 0:
-            jr:tuple = tuple([Context.route.jumps_per_hour(), 'float'])
-            dr:tuple = tuple([Context.route.dist_per_hour(), 'float'])
+        if prog.jumps_per_hour > 0:
+            jr:tuple = tuple([prog.jumps_per_hour, 'float'])
+            dr:tuple = tuple([prog.dist_per_hour, 'float'])
             if tt != "": tt += "\n"
             tt += tts['speed'].format(j=hfplus(jr), d=hfplus(dr))
 
         self.progtt.set_text(tt)
 
-        self.progbar.configure(length=self.frwidth-3, value=self._progress())
+        self.progbar.configure(length=self.frwidth-3, value=prog.percent)
 
 
     @catch_exceptions
@@ -297,11 +300,12 @@ class UI():
         if Context.route.route == [] or not hasattr(self, 'waypoint_btn'):
             return
         route:Route = Context.route
+        prog:RouteProgress = route.progress()
         self.waypoint_prev_btn.config(state=tk.DISABLED if route.offset <= -1 else tk.NORMAL)
         self.waypoint_prev_tt.set_text(route.get_waypoint(-1))
         self.waypoint_next_btn.config(state=tk.DISABLED if route.offset >= len(route.route) -1 else tk.NORMAL)
-        dn:str = hfplus(tuple([Context.route.dist_to_next(), 'float', '0']))
-        nstr:str = route.get_waypoint(1) if route.dist_to_next() == 0 else f"{route.get_waypoint(1)} ({dn} ly)"
+        dn:str = hfplus(tuple([prog.dist_to_next, 'float', '0']))
+        nstr:str = route.get_waypoint(1) if prog.dist_to_next == 0 else f"{route.get_waypoint(1)} ({dn} ly)"
         self.waypoint_next_tt.set_text(nstr)
 
         primary:str = route.next_stop()
@@ -309,10 +313,10 @@ class UI():
         wp:str = f"{primary} · {detail}" if detail else primary
         self._update_progbar()
 
-        if route.jumps_remaining() > 0:
+        if prog.jumps_remaining > 0:
             # Show progress through route
-            jumps:tuple = tuple([route.total_jumps() - route.jumps_remaining(), 'int', '-' if route.offset < 0 else '0'])
-            tjumps:tuple = tuple([route.total_jumps(), 'int'])
+            jumps:tuple = tuple([prog.total_jumps - prog.jumps_remaining, 'int', '-' if route.offset < 0 else '0'])
+            tjumps:tuple = tuple([prog.total_jumps, 'int'])
             suffix:str = f" ({hfplus(jumps)}/{hfplus(tjumps)})"
             #wp = str_truncate(wp, length=int(self.waypoint_btn.cget('width')) - len(suffix), loc='middle') + suffix
             wp = str_truncate(wp, length=40 - len(suffix)) + suffix
@@ -321,7 +325,7 @@ class UI():
 
         # Set an icon if appropriate
         image:tk.PhotoImage = self.blank_img
-        if route.is_neutron() == True:
+        if prog.is_neutron == True:
             image = self.neutron_img
 
         if route.refuel() == True and not Context.route.fuel_full:
@@ -334,6 +338,10 @@ class UI():
     def _waypoint_tooltip(self, route:Route) -> str:
         """ Full next-waypoint detail for the waypoint button's tooltip """
         lines:list = route.next_stop_details()
+        plan:FuelPlan|None = Context.router.fuel_plan()
+        if plan is not None and plan.stranded != []:
+            row:int = plan.stranded[0]
+            lines.append(lbls['fuel_short'].format(s=route.route[row][route.nc], j=route.jumps_to(row)))
         lines.append(tts['copy_to_clipboard'])
 
         return "\n".join(lines)
@@ -407,14 +415,43 @@ class UI():
             shipmenu[name] = [self.menu_callback, 'ship']
         return shipmenu
 
+
+    def _range_dict(self) -> dict:
+        """ The current ship's ranges at its current cargo and fuel, empty and full, followed by the ships """
+        ship:Ship|None = Context.router.ship
+        if not ship or len(ship.ranges) == 0: return self._ship_dict()
+
+        ranges:dict = {}
+        if Context.router.fuel is not None:
+            ranges[lbls['range_current'].format(r=ship.get_range(Context.router.cargo, Context.router.fuel))] = \
+                [self.menu_callback, 'range', str(ship.get_range(Context.router.cargo, Context.router.fuel))]
+        ranges[lbls['range_unladen'].format(r=ship.range)] = [self.menu_callback, 'range', str(ship.range)]
+        ranges[lbls['range_laden'].format(r=ship.laden_range())] = [self.menu_callback, 'range', str(ship.laden_range())]
+        return ranges | self._ship_dict()
+
+
+    def update_ranges(self) -> None:
+        """ Refresh the range suggestions in the range entry menus """
+        menu:dict = self._range_dict()
+        for frame in self.plot_frames.values():
+            try:
+                range_entry = frame.nametowidget("range_entry")
+                if range_entry == None:
+                    continue
+                range_entry.set_menu(menu)
+            except Exception as e:
+                pass
+
     @catch_exceptions
-    def menu_callback(self, field:str = "src", param:str = "None") -> None:
+    def menu_callback(self, field:str = "src", param:str = "None", *args) -> None:
         """ Function called when a custom menu item is selected """
         match field:
             case 'src':
                 self._update_item("all", "source_ac", param)
             case 'dest':
                 self._update_item("all", "dest_ac", param)
+            case 'range':
+                self._update_item("all", "range_entry", param)
             case _:
                 # Ship selection
                 galaxy_plotter = self.plotters.get('Galaxy')
@@ -467,14 +504,7 @@ class UI():
         Context.router.route_params['Neutron']['range'] = ship.range
 
         # Update range entry menus in all plot frames
-        for dest in self.plot_frames.values():
-            try:
-                range_entry = dest.nametowidget("range_entry")
-                if range_entry == None:
-                    continue
-                range_entry.set_menu(self._ship_dict())
-            except Exception as e:
-                pass
+        self.update_ranges()
 
         # Update galaxy plotter ship dropdown if it exists
         galaxy_plotter = self.plotters.get('Galaxy')
@@ -484,6 +514,7 @@ class UI():
 
     def update_cargo(self, cargo:int) -> None:
         """ Update the cargo entry when the cargo changes """
+        self.update_progress() # Rechecks our fuel along the route
 
         galaxy_plotter = self.plotters.get('Galaxy')
         if not galaxy_plotter or not hasattr(galaxy_plotter, 'shipvar'):
@@ -494,6 +525,7 @@ class UI():
 
         self._update_item("all", "cargo_entry", str(cargo))
         self._update_item("all", "range_entry", str(Context.router.ship.get_range(cargo)))
+        self.update_ranges()
 
     @catch_exceptions
     def _export_route(self) -> None:
@@ -577,34 +609,54 @@ class UI():
 
             self.sub_fr.grid_remove()
             self.route_lbl['text'] = lbls["plotting"].format(s=Context.router.src, d=Context.router.dest)
+            self.eta_lbl['text'] = ""
             self.busy_fr.grid(row=2, column=0, padx=10, pady=10, sticky=tk.NSEW)
-            self.busy_fr.after(0, update, 0)
+            th.dispatcher.post(update, 0)
             return
 
         self.busy_fr.grid_remove()
         self.sub_fr.grid()
 
 
+    def plot_progress(self, elapsed:float, remaining:float|None) -> None:
+        """ Show how long a plot has been running and how long it should take, called from the plotting thread """
+        txt:str = lbls["plot_elapsed"].format(e=int(elapsed)) if remaining is None else \
+            lbls["plot_remaining"].format(e=int(elapsed), r=int(remaining + 0.5))
+
+        @catch_exceptions
+        def update() -> None:
+            if getattr(self, 'show_spinner', False): self.eta_lbl['text'] = txt
+        th.dispatcher.post(update)
+
+
     @catch_exceptions
     def query_systems(self, inp:str) -> list:
         """ Function called by Autocompleter """
+        cached:list|None = self.typeahead.get('systems', inp)
+        if cached is not None: return cached
         try:
-            results:requests.Response = requests.get(SPANSH_SYSTEMS, params={'q': inp.strip()},
-                                                     headers={'User-Agent': Context.plugin_useragent}, timeout=3)
+            results:requests.Response = HTTP.get('typeahead', SPANSH_SYSTEMS, params={'q': inp.strip()},
+                                                 headers={'User-Agent': Context.plugin_useragent})
         except:
             return [inp]
-        return json.loads(results.content)
+        systems:list = json.loads(results.content)
+        if results.status_code == 200: self.typeahead.put('systems', inp, systems)
+        return systems
 
 
     @catch_exceptions
     def query_station_names(self, inp:str) -> list:
         """ Function called by the Trade Planner's Autocompleter """
+        cached:list|None = self.typeahead.get('stations', inp, match=lambda s: s.split(' / ', 1)[-1])
+        if cached is not None: return cached
         try:
-            results:requests.Response = requests.get(SPANSH_STATIONS_NAME, params={'q': inp.strip()},
-                                                      headers={'User-Agent': Context.plugin_useragent}, timeout=3)
-            return [f"{s['system']} / {s['name']}" for s in json.loads(results.content)]
+            results:requests.Response = HTTP.get('typeahead', SPANSH_STATIONS_NAME, params={'q': inp.strip()},
+                                                 headers={'User-Agent': Context.plugin_useragent})
+            stations:list = [f"{s['system']} / {s['name']}" for s in json.loads(results.content)]
         except:
             return [inp]
+        if results.status_code == 200: self.typeahead.put('stations', inp, stations)
+        return stations
 
 
     @catch_exceptions
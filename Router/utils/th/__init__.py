@@ -9,11 +9,12 @@ from theme import theme # type: ignore
 from config import config # type: ignore
 
 from .autocompleter import Autocompleter
+from .dispatcher import Dispatcher, dispatcher
 from .placeholder import Placeholder, PlaceholderMixin
 from .tooltip import Tooltip
 
 __all__ = ["TopLevel", "Frame", "LabelFrame", "Label", "Button", "Radiobutton", "ComboBox", "Listbox", "Checkbutton", "Scale", "Spinbox",
-           "Progressbar", "ScrollableFrame", "Tooltip", "Autocompleter", "Placeholder", "resolve"]
+           "Progressbar", "ScrollableFrame", "Tooltip", "Autocompleter", "Placeholder", "Dispatcher", "dispatcher", "resolve"]
 
 DEBUG_FRAMES:bool = False # Turn this on to color each frame for debugging
 index:int = 0
@@ -1,6 +1,8 @@
-import queue
 import threading
 import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import monotonic
+from typing import Callable
 from tkinter import font as tkfont
 
 from theme import theme # type: ignore
@@ -8,6 +10,26 @@ from config import config # type: ignore
 
 from ..debug import Debug, catch_exceptions
 from .placeholder import Placeholder
+from .dispatcher import dispatcher
+
+_lookups:ThreadPoolExecutor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='Autocompleter')
+_inflight:dict = {} # (func, input) -> Future, so identical lookups from different entries share a request
+_inflight_lock:threading.Lock = threading.Lock()
+
+def lookup(func:Callable, inp:str) -> Future:
+    """ Look up suggestions in the background, joining any identical lookup that's still running """
+    key:tuple = (func, inp)
+    with _inflight_lock:
+        fut:Future|None = _inflight.get(key)
+        if fut is not None: return fut
+        fut = _lookups.submit(func, inp)
+        _inflight[key] = fut
+
+    def done(_:Future) -> None:
+        with _inflight_lock:
+            if _inflight.get(key) is fut: del _inflight[key]
+    fut.add_done_callback(done)
+    return fut
 
 class Autocompleter(Placeholder):
     """
@@ -18,8 +40,17 @@ class Autocompleter(Placeholder):
         It takes the same parameters as a tk.Entry object plus:
             :param func: The function to call to get a list of suggestions which should
                             take a single string argument (the current input) and return a list of suggestions.
+            :param local: Optionally, a quick function taking the same argument whose suggestions are shown
+                            straight away. func is only called if it gives fewer than LOCAL_ENOUGH, and its
+                            suggestions are added after local's.
+
+        Lookups wait until typing pauses for DEBOUNCE ms and each is numbered, only the results of the
+        newest are shown so slow or out of order replies to earlier input are dropped. Results are handed
+        back to the main thread by the dispatcher rather than each entry polling for them.
     """
     LOOKUP_TIMEOUT:float = 3
+    DEBOUNCE:int = 250 # ms
+    LOCAL_ENOUGH:int = 10
 
     def __init__(self, parent:tk.Frame, placeholder:str, **kw) -> None:
         self.parent:tk.Frame = parent
@@ -27,6 +58,9 @@ class Autocompleter(Placeholder):
         if 'func' in kw:
             self.func = kw['func']
             del kw['func']
+        self.local = kw.pop('local', None)
+        self.seq:int = 0               # Number of the newest lookup
+        self.pending:str|None = None   # after() id of the debounced lookup
 
         Placeholder.__init__(self, parent, placeholder, **kw)
         self.traceid:str = self.var.trace_add('write', self.changed)
@@ -44,7 +78,7 @@ class Autocompleter(Placeholder):
         self.popup.withdraw()
         self.lb_up = False
         self.has_selected = False
-        self.queue:queue.Queue = queue.Queue()
+        dispatcher.attach(self)
 
         self.bind("<Any-Key>", self.keypressed)
         self.lb.bind("<Any-Key>", self.keypressed)
@@ -58,7 +92,6 @@ class Autocompleter(Placeholder):
         self.bind("<Leave>", self.mouse_leave)
 
         self.last_value:str|None = None
-        self.update_me()
 
     def mouse_move(self, event):
         # Identify the listbox item index nearest to the cursor's Y coordinate
@@ -108,16 +141,24 @@ class Autocompleter(Placeholder):
             return
         self.last_value = value
 
+        self.cancel_lookup()
         if value.__len__() < 3 and self.lb_up or self.has_selected:
             self.hide_list()
             self.has_selected = False
         else:
-            t = threading.Thread(target=self.get_list, args=[value])
-            t.start()
+            self.pending = self.after(self.DEBOUNCE, self.get_list, value)
+
+    def cancel_lookup(self) -> None:
+        """ Drop the debounced lookup and any results still to come """
+        self.seq += 1
+        if self.pending is not None:
+            self.after_cancel(self.pending)
+            self.pending = None
 
     def selection(self, event=None) -> None:
         if not self.lb_up: return
         self.has_selected = True
+        self.cancel_lookup()
         index = self.lb.curselection()
         self.var.trace_remove("write", self.traceid)
 
@@ -187,33 +228,38 @@ class Autocompleter(Placeholder):
             self.lb_up = False
 
     def get_list(self, inp:str) -> None:
+        """ Start a lookup, its results are shown by deliver() """
+        self.pending = None
         inp = inp.strip()
         func = self.func
         if inp == self.placeholder or inp.__len__() < 3 or func == None:
             return
 
-        result:list = []
-        def call() -> None:
-            result.extend(func(inp) or [])
-        t = threading.Thread(target=call, daemon=True)
-        t.start()
-        t.join(self.LOOKUP_TIMEOUT)
-        if t.is_alive():
-            Debug.logger.error(f"Autocompleter lookup timed out after {self.LOOKUP_TIMEOUT}s for {inp!r}")
-            return
-
-        if result:
-            self.queue.put(result)
-
-    def update_me(self) -> None:
-        try:
-            while 1:
-                lista = self.queue.get_nowait()
-                self.show_results(lista)
-                self.update_idletasks()
-        except queue.Empty:
-            pass
-        self.after(100, self.update_me)
+        self.seq += 1
+        seq:int = self.seq
+        known:list = self.local(inp) if self.local else []
+        if known: self.show_results(known)
+        if len(known) >= self.LOCAL_ENOUGH: return
+
+        start:float = monotonic()
+        def done(fut:Future) -> None:
+            if seq != self.seq: return # Superseded
+            if monotonic() - start > self.LOOKUP_TIMEOUT:
+                Debug.logger.error(f"Autocompleter lookup timed out after {self.LOOKUP_TIMEOUT}s for {inp!r}")
+                return
+            if fut.exception() is not None:
+                Debug.logger.error(f"Autocompleter lookup failed for {inp!r}", exc_info=fut.exception())
+                return
+            seen:set = {k.casefold() for k in known}
+            result:list = known + [r for r in fut.result() or [] if r.casefold() not in seen]
+            if result:
+                dispatcher.post(self.deliver, seq, result)
+        lookup(func, inp).add_done_callback(done)
+
+    def deliver(self, seq:int, results:list) -> None:
+        """ Show a lookup's results, on the main thread, if it's still the newest """
+        if seq != self.seq or not self.winfo_exists(): return
+        self.show_results(results)
 
     def set_text(self, text, placeholder_style=True) -> None:
         try:
@@ -221,5 +267,6 @@ class Autocompleter(Placeholder):
         except:
             pass
         finally:
+            self.cancel_lookup()
             super().set_text(text, placeholder_style)
             self.traceid = self.var.trace_add('write', self.changed)
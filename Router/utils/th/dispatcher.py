@@ -0,0 +1,75 @@
+import threading
+import tkinter as tk
+from typing import Callable
+
+from ..debug import Debug
+
+
+class Dispatcher:
+    """
+        Runs callbacks handed over from worker threads on Tk's main thread. Nothing polls for them:
+        the first callback posted while no run is due schedules a single after_idle() that runs
+        everything posted by then, so an idle plugin has no timers running at all. Callbacks posted
+        before there's a window to run them on wait until one's attached, and if Tk won't schedule
+        a run only the callback being posted is dropped.
+    """
+    def __init__(self) -> None:
+        self.root:tk.Misc|None = None
+        self.waiting:list = []
+        self.scheduled:bool = False # Whether a run's been asked for
+        self.runs:int = 0 # Times we've woken the main thread
+        self._lock:threading.Lock = threading.Lock()
+
+
+    def attach(self, widget:tk.Misc) -> None:
+        """ Deliver to the main loop of this widget's window """
+        root:tk.Misc = widget.winfo_toplevel()
+        with self._lock:
+            if self.root is root: return
+            if self.root is not None: # Anything left was for a window that's gone
+                self.waiting = []
+                self.scheduled = False
+            self.root = root
+        self._schedule()
+
+
+    def post(self, func:Callable, *args) -> None:
+        """ Run func(*args) on the main thread """
+        entry:tuple = (func, args)
+        with self._lock:
+            self.waiting.append(entry)
+        if not self._schedule():
+            with self._lock: # Only this one's dropped, anything else waiting goes with the next post
+                self.waiting = [w for w in self.waiting if w is not entry]
+
+
+    def _schedule(self) -> bool:
+        """ Ask for a run if there's something waiting and one isn't already due. False if Tk refused """
+        with self._lock:
+            if self.root is None or self.scheduled or self.waiting == []: return True
+            self.scheduled = True
+            root:tk.Misc = self.root
+        try:
+            root.after_idle(self._run)
+            return True
+        except (RuntimeError, tk.TclError) as e: # Starting up or shutting down
+            Debug.logger.debug(f"Unable to dispatch to the main thread: {e}")
+            with self._lock:
+                self.scheduled = False
+            return False
+
+
+    def _run(self) -> None:
+        with self._lock:
+            waiting:list = self.waiting
+            self.waiting = []
+            self.scheduled = False
+        self.runs += 1
+        for func, args in waiting:
+            try:
+                func(*args)
+            except Exception as e:
+                Debug.logger.error(f"Dispatched callback {func} failed, exception info:", exc_info=e)
+
+
+dispatcher:Dispatcher = Dispatcher()
@@ -4,6 +4,7 @@ import requests
 import zipfile
 import time
 from threading import Thread
+from typing import Any
 from semantic_version import Version # type: ignore
 
 from config import config, user_agent # type: ignore
@@ -38,10 +39,11 @@ class Updater():
     Install the update when you choose (commonly on shutdown).
     """
 
-    def __init__(self, plugin_dir:str, gh_project:str, gh_release_info:str) -> None:
+    def __init__(self, plugin_dir:str, gh_project:str, gh_release_info:str, session:Any = None) -> None:
         self.plugin_dir:str = plugin_dir
         self.gh_project:str = gh_project
         self.gh_release_info:str = gh_release_info
+        self.session:Any = session or new_session(timeout=TIMEOUT) # Anything with a requests style get()
 
         self.update_available:bool = False # Is there an update available?
         self.install_update:bool = False # Should it be installed?
@@ -66,9 +68,11 @@ class Updater():
 
         r:requests.Response|None = None
         try:
-            session:requests.Session = new_session(timeout=TIMEOUT)
-            r = session.get(self.download_url, headers=_headers(self.gh_project), timeout=TIMEOUT)
+            r = self.session.get(self.download_url, headers=_headers(self.gh_project), timeout=TIMEOUT)
             Debug.logger.debug(f"{r}")
+            if r is None:
+                Debug.logger.error(f"Failed to download {self.gh_project} update (no response).")
+                return
             r.raise_for_status()
         except Exception:
             Debug.logger.error(f"Failed to download {self.gh_project} update (status code {r.status_code if r else 'no response'}).")
@@ -99,8 +103,7 @@ class Updater():
         """ Get info about the latest release from github, version, changelog, and download url """
         try:
             Debug.logger.debug(f"Requesting {self.gh_release_info}")
-            session:requests.Session = new_session(timeout=TIMEOUT)
-            r:requests.Response = session.get(self.gh_release_info, headers=_headers(self.gh_project), timeout=TIMEOUT)
+            r:requests.Response = self.session.get(self.gh_release_info, headers=_headers(self.gh_project), timeout=TIMEOUT)
             r.raise_for_status()
         except requests.RequestException as e:
             Debug.logger.error("Failed to get changelog, exception info:", exc_info=e)
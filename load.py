@@ -14,6 +14,7 @@ from Router.utils.misc import copy_to_clipboard
 
 from Router.context import Context
 from Router.route_manager import Router
+from Router.client import HTTP
 from Router.csv import CSV
 from Router.ui import UI
 from Router.overlay import Overlay
@@ -31,7 +32,7 @@ def plugin_start3(plugin_dir: str) -> str:
     Context.plugin_version = version
     VERSION:str = version.__str__() # For the plugin browser
     Context.plugin_useragent = f'{user_agent} {NAME}-{VERSION}'
-    Context.updater = Updater(str(Context.plugin_dir), GH_PROJECT, GH_RELEASE_INFO)
+    Context.updater = Updater(str(Context.plugin_dir), GH_PROJECT, GH_RELEASE_INFO, HTTP.endpoint('updater'))
     Context.updater.check_for_update(Context.plugin_version, Context.plugin_name)
 
     return NAME
@@ -44,8 +45,11 @@ def plugin_start(plugin_dir: str) -> None:
 
 @catch_exceptions
 def plugin_stop() -> None:
+    Context.router.cancel_plot = True
     Context.router.save()
     Context.overlay.stop_countdowns()
+    Context.ui.typeahead.save()
+    HTTP.report()
     if Context.updater.install_update:
         Context.updater.install()
 
@@ -71,7 +75,8 @@ def journal_entry(cmdr:str, is_beta:bool, system:str, station:str, entry:dict, s
             Context.router.carrier_state = CarrierStates.Idle
             if Context.route.route != [] and not Context.route.fleetcarrier:
                 Context.route.update_route(0, system)
-                Context.route.jumps = []
+                Context.route.clear_jumps()
+                Context.router.save_progress()
         case 'FSDJump' | 'Location' | 'SupercruiseExit' if entry.get('StarSystem', system) != Context.router.system:
             Context.router.jumped(system, entry)
         case 'CarrierJumpRequest' | 'CarrierLocation' | 'CarrierJumpCancelled' | 'CarrierStats':
@@ -92,7 +97,7 @@ def journal_entry(cmdr:str, is_beta:bool, system:str, station:str, entry:dict, s
         case 'Refueling': # Read fuel from Status.json
             Context.router.fuel_event(state)
         case 'Shutdown':
-            if Context.route.route != []: Context.route.jumps = []
+            if Context.route.route != []: Context.route.clear_jumps()
             Context.router.save()
 
     Context.router.system = system
@@ -107,6 +112,9 @@ def dashboard_entry(cmdr:str, is_beta:bool, entry:dict) -> None:
     if Context.ui.parent and Context.route.jumps_remaining() and entry.get("GuiFocus") == edmc_data.GuiFocusGalaxyMap:
         copy_to_clipboard(Context.ui.parent, Context.route.next_system())
 
+    if Context.router and isinstance(entry.get('Fuel'), dict) and 'FuelMain' in entry['Fuel']:
+        Context.router.update_fuel(entry['Fuel']['FuelMain'])
+
     if Context.overlay:
         Context.overlay.dashboard_entry(cmdr, is_beta, entry)
 
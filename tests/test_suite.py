@@ -15,6 +15,9 @@ import logging
 import tkinter as tk
 from tkinter import ttk
 import threading
+import hashlib
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from tests.edmc import edmc_data
 from Router.utils.treeviewplus import TreeviewPlus
@@ -44,7 +47,7 @@ def capture_thread(*args, **kwargs):
 
 
 def fake_systems_get(url, *args, **kwargs):
-    """ Stand-in for requests.get against the Spansh systems autocomplete endpoint.
+    """ Stand-in for the HTTP client's session.get against the Spansh systems autocomplete endpoint.
     Echoes back whatever was queried so system-name validation always succeeds without a real network call. """
     q = kwargs.get('params', {}).get('q', '')
     resp = Mock()
@@ -52,15 +55,144 @@ def fake_systems_get(url, *args, **kwargs):
     resp.content = json.dumps([q]).encode()
     return resp
 
+def modules_loaded(harness:'TestHarness', timeout:float) -> None:
+    """ Run Tk callbacks until the module data has been handed to the main thread """
+    from time import monotonic, sleep
+    end:float = monotonic() + timeout
+    while not harness.plugin.modules_ready.done() and monotonic() < end:
+        harness._pump_ui(0.05)
+        sleep(0.02)
+    assert harness.plugin.modules_ready.done()
+
+@contextmanager
+def module_data_aside() -> Generator:
+    """ Set the downloaded module data aside for the duration of a test """
+    data_dir:Path = Path(__file__).parent / "data"
+    files:list = [data_dir / "module_data.json", data_dir / "module_meta.json"]
+    for f in files:
+        if f.exists(): f.replace(f.with_name(f.name + '.bak'))
+    try:
+        yield data_dir
+    finally:
+        for f in files:
+            f.unlink(missing_ok=True)
+            if f.with_name(f.name + '.bak').exists(): f.with_name(f.name + '.bak').replace(f)
+
+
+class ModuleServer(ThreadingHTTPServer):
+    """ Stands in for Coriolis' GitHub repo, counting the bytes it sends """
+    def __init__(self, files:dict) -> None:
+        self.files:dict = files
+        self.sent:int = 0
+        self.requests:list = []
+        self.clients:set = set() # Client ports, one per connection
+        self.busy:int = 0        # Answer this many requests with a 503 first
+        super().__init__(('127.0.0.1', 0), ModuleHandler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/modules"
+
+
+class ModuleHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        self.server.requests.append(self.path)
+        self.server.clients.add(self.client_address[1])
+        if self.server.busy > 0:
+            self.server.busy -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body:bytes|None = self.server.files.get(self.path.removeprefix('/modules/'))
+        if body is None:
+            self.send_error(404)
+            return
+        etag:str = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.sent += len(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class ResultsServer(ThreadingHTTPServer):
+    """ Stands in for Spansh's results endpoint, answering each poll as the next of its replies says """
+    def __init__(self, replies:list) -> None:
+        self.replies:list = replies # (status, seconds before answering, headers, body, seconds the body stalls halfway)
+        self.requests:int = 0
+        super().__init__(('127.0.0.1', 0), ResultsHandler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/results"
+
+
+class ResultsHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        from time import sleep
+        self.server.requests += 1
+        status, delay, headers, body, stall = self.server.replies.pop(0) if len(self.server.replies) > 1 else self.server.replies[0]
+        try:
+            sleep(delay)
+            self.send_response(status)
+            for k, v in (headers | {'Content-Length': str(len(body))}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            sleep(stall)
+            self.wfile.write(body[len(body) // 2:])
+        except OSError:
+            pass # The poll was given up on
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@contextmanager
+def results_client(server:ResultsServer) -> Generator:
+    """ A live HTTP client set up for the results server the way the plugin's is for Spansh's """
+    import tests.edmc.requests
+    from Router.client import HttpClient
+    live:bool = tests.edmc.requests.live_requests()
+    tests.edmc.requests.live_requests(True)
+    try:
+        with patch('Router.client.SPANSH_RESULTS', server.url()):
+            yield HttpClient()
+    finally:
+        tests.edmc.requests.live_requests(live)
+        server.shutdown()
+
+
 @pytest.fixture
 def harness(request) -> Generator:
     """Provide a fresh test harness for each test."""
 
-    # Clean route/ships each test, but keep module_data.json --
+    # Clean route/progress/ships each test, but keep module_data.json --
     # else every test forces a live Coriolis download, not one.
     data_dir:Path = Path(__file__).parent / "data"
     (data_dir / "route.json").unlink(missing_ok=True)
+    (data_dir / "route_body.json").unlink(missing_ok=True)
+    (data_dir / "route.snap").unlink(missing_ok=True)
+    (data_dir / "progress.jsonl").unlink(missing_ok=True)
+    (data_dir / "shipyard.json").unlink(missing_ok=True)
     shutil.rmtree(data_dir / "ships", ignore_errors=True)
+    shutil.rmtree(data_dir / "plot_cache", ignore_errors=True)
+    (data_dir / "typeahead.json").unlink(missing_ok=True)
 
     param = getattr(request, 'param', ('route_init.json', 'ships'))
     init_file, ships_dir = param if isinstance(param, tuple) else (param, None)
@@ -96,6 +228,7 @@ def harness(request) -> Generator:
     # ND-specific, this is our plugin object
     import Router.context
     test_harness.plugin = Router.context.Context
+    modules_loaded(test_harness, 60) # Module data loads in the background
 
     # ND-specific, this is the journal handling function and the default journal params
     test_harness.load_events("journal_events.json")
@@ -125,13 +258,15 @@ class TestStartup:
 
     @pytest.mark.parametrize('harness', [('route_init.json', 'ships')], indirect=True)
     def test_harness_initialization_loads_ships_directory(self, harness:TestHarness) -> None:
-        """ v2.0 ships/ load without a migration rewrite. """
+        """ v2.0 ships/ load and move into the shipyard. """
         assert harness.plugin.router.shiplist == {"1": "Shipping Delay", "2": "Perviy"}
         assert harness.plugin.router.load_ship("1").name == "Shipping Delay"
+        shipyard:dict = json.loads((Path(__file__).parent / "data" / "shipyard.json").read_text())
+        assert set(shipyard) == {"1", "2"}
 
     @pytest.mark.parametrize('harness', ['None'], indirect=True)
     def test_migration(self, harness:TestHarness) -> None:
-        """ Test v1.10.0's route.json migrates to v2.0's separate ships files. """
+        """ Test v1.10.0's route.json migrates to the shipyard. """
         shutil.copy(Path(__file__).parent / "config" / "route_1.10.0.json", Path(__file__).parent / "data" / "route.json")
         harness.plugin.router._load()
 
@@ -139,9 +274,9 @@ class TestStartup:
         assert isinstance(harness.plugin.router.shiplist, dict)
         assert harness.plugin.router.shiplist["1"] == "Shipping Delay"
 
-        ships_dir = Path(__file__).parent / "data" / "ships"
-        assert (ships_dir / "1.json").exists()
-        assert (ships_dir / "2.json").exists()
+        shipyard:dict = json.loads((Path(__file__).parent / "data" / "shipyard.json").read_text())
+        assert set(shipyard) == {"1", "2"}
+        assert shipyard["1"]["loadout"]["ShipName"] == "Shipping Delay"
 
     def test_startup_event(self, harness:TestHarness) -> None:
         """Test that startup event sets system correctly."""
@@ -150,11 +285,82 @@ class TestStartup:
         harness.play_sequence('startup')
         assert harness.plugin.router.system == "Sol"
 
+    def test_background_module_load(self, harness:TestHarness) -> None:
+        """Startup doesn't wait for the module data, ships work out their range once it arrives."""
+        import Router.route_manager
+        modules:list = [
+            {'symbol': 'Int_Hyperdrive_Overcharge_Size8_Class5_OverchargeBooster_MkII', 'fuelmul': 0.011,
+             'fuelpower': 2.45, 'maxfuel': 13.1, 'optmass': 4670},
+            {'symbol': 'Int_GuardianFSDBooster_Size5', 'jumpboost': 10.5},
+            {'symbol': 'Int_FuelTank_Size7_Class3', 'fuel': 128}]
+        release:threading.Event = threading.Event()
+
+        files:dict = {'frame_shift_drive': ('fsd', 'hyperdrive'), 'guardian_fsd_booster': ('gfsb', 'guardianfsdbooster'),
+                      'fuel_tank': ('ft', 'fueltank')}
+
+        def slow_get(url, *args, **kwargs):
+            release.wait(10)
+            key, symbol = next(v for k, v in files.items() if f"/{k}.json" in url)
+            resp = Mock()
+            resp.status_code = 200
+            resp.content = json.dumps({key: [m for m in modules if symbol in m['symbol'].lower()]}).encode()
+            resp.headers = {}
+            return resp
+
+        with module_data_aside(), patch.object(Router.route_manager.SESSION, 'get', side_effect=slow_get):
+            harness.plugin.router._load()
+            assert not harness.plugin.modules_ready.done()
+            assert harness.plugin.router.ship.range == 32.0
+
+            release.set()
+            modules_loaded(harness, 10)
+            assert harness.plugin.router.ship.range != 32.0
+            assert harness.plugin.router.ship.range_boost == 10.5
+            assert Ship(harness.plugin.router.ship.as_dict()).range == harness.plugin.router.ship.range
+
+    def test_module_revalidation(self, harness:TestHarness) -> None:
+        """The module files are fetched together and only transferred again when they change."""
+        import Router.route_manager
+        parts:dict = {'fsd': [{'symbol': 'Int_Hyperdrive_Size5_Class5', 'optmass': 1050}],
+                      'gfsb': [{'symbol': 'Int_GuardianFSDBooster_Size5', 'jumpboost': 10.5}],
+                      'ft': [{'symbol': 'Int_FuelTank_Size5_Class3', 'fuel': 32}]}
+        server:ModuleServer = ModuleServer({path: json.dumps({k: parts[k]}).encode()
+                                            for k, path in Router.route_manager.MODULE_SOURCES.items()})
+        total:int = sum(len(b) for b in server.files.values())
+        router = harness.plugin.router
+
+        with module_data_aside() as data_dir, patch.object(Router.route_manager, 'GH_MODULES', server.url()):
+            harness.plugin.modules = {}
+            router._get_module_data()
+            assert server.sent == total
+            assert set(harness.plugin.modules) == {'int_hyperdrive_size5_class5', 'int_guardianfsdbooster_size5', 'int_fueltank_size5_class3'}
+            assert json.loads((data_dir / "module_data.json").read_text()) == harness.plugin.modules
+
+            # Nothing's changed so nothing's transferred
+            router._get_module_data()
+            assert server.sent == total
+            assert len(server.requests) == 6
+
+            # Only the changed file is transferred, and merged with the rest
+            server.files['standard/fuel_tank.json'] = json.dumps({'ft': [{'symbol': 'Int_FuelTank_Size5_Class3', 'fuel': 64}]}).encode()
+            router._get_module_data()
+            assert server.sent == total + len(server.files['standard/fuel_tank.json'])
+            assert harness.plugin.modules['int_fueltank_size5_class3']['fuel'] == 64
+            assert harness.plugin.modules['int_guardianfsdbooster_size5']['jumpboost'] == 10.5
+
+            # A failed file leaves the catalogue as it was
+            del server.files['standard/fuel_tank.json']
+            before:dict = harness.plugin.modules
+            router._get_module_data()
+            assert harness.plugin.modules is before
+        server.shutdown()
+
     def test_module_import(self, harness:TestHarness) -> None:
         """Test retrieving module data from Coriolis """
-        harness.plugin.modules = []
+        harness.plugin.modules = {}
         harness.plugin.router._get_module_data()
         assert len(harness.plugin.modules) == 88
+        assert harness.plugin.modules['int_fueltank_size7_class3']['fuel'] == 128
 
 class TestStateManagement:
     """Test router state management."""
@@ -167,6 +373,42 @@ class TestStateManagement:
         """Call save"""
         harness.plugin.router.save()
 
+    def test_progress_log(self, harness:TestHarness) -> None:
+        """Moving along the route is logged without rewriting the route, and survives a restart without a save."""
+        data_dir:Path = Path(__file__).parent / "data"
+        router = harness.plugin.router
+
+        harness.plugin.route = Route(['System Name', 'Jumps'], [['Sol', 1], ['Alpha Centauri', 1], ['Barnards Star', 0]], 0)
+        router.save_route()
+        body:float = (data_dir / "route.snap").stat().st_mtime_ns
+        assert "route" not in json.loads((data_dir / "route.json").read_text())
+
+        router.update_route(1)
+        router.update_route(1)
+        assert (data_dir / "route.snap").stat().st_mtime_ns == body
+        log:list = (data_dir / "progress.jsonl").read_text().splitlines()
+        assert [json.loads(l).get('offset') for l in log[1:]] == [0, 1, 2]
+
+        # A crash part way through a write doesn't lose what came before
+        with open(data_dir / "progress.jsonl", "a") as f:
+            f.write('{"offset": 0, "ti')
+        router._load()
+        assert harness.plugin.route.offset == 2
+        assert harness.plugin.route.route[2][0] == 'Barnards Star'
+        assert len((data_dir / "progress.jsonl").read_text().splitlines()) == 2
+
+    def test_route_migration(self, harness:TestHarness) -> None:
+        """A route stored in route.json moves to its own file."""
+        data_dir:Path = Path(__file__).parent / "data"
+        state:dict = json.loads((data_dir / "route.json").read_text())
+        state['route'] = [['System Name', 'Jumps'], [['Sol', 1], ['Alpha Centauri', 0]], 1]
+        (data_dir / "route.json").write_text(json.dumps(state))
+
+        harness.plugin.router._load()
+        assert harness.plugin.route.route[1][0] == 'Alpha Centauri'
+        assert "route" not in json.loads((data_dir / "route.json").read_text())
+        assert (data_dir / "route.snap").exists()
+
 
 class TestRouteMethods:
     """ Test the route object's methods"""
@@ -396,6 +638,32 @@ class TestRouteMethods:
         route = Route(hdrs, route_data, 0)
         assert route.perc_jumps_rem(2) == 100.0
 
+    def test_derived_columns(self, harness:TestHarness) -> None:
+        """Jumps Rem and Distance Remaining are inserted after their source columns with the right values."""
+        route = Route(['System Name', 'Jumps', 'Distance'], [['A', 0, 0], ['B', 3, 10.5], ['C', 2, 5.0]], 0)
+
+        assert route.hdrs == ['System Name', 'Jumps', 'Jumps Rem', 'Distance', 'Distance Remaining']
+        assert [r[2] for r in route.route] == [5, 2, 0]
+        assert [r[4] for r in route.route] == [15.5, 5.0, 0]
+        assert route.total_dist() == 15.5
+        assert route.dist_to_next() == 10.5
+
+    def test_prefix_sums_match_scan(self, harness:TestHarness) -> None:
+        """Running-total lookups agree with a straight scan of the route at every offset."""
+        hdrs = ['System Name', 'Jumps', 'Profit']
+        route_data = [['Sol', 0, 0], ['Apurui', 10, 'n/a'], ['Bleae Thua', 5, 2500.5], ['Colonia', 7, 100]]
+        route = Route(hdrs, route_data, 0)
+        jc:int = route.colind('Jumps')
+        pc:int = route.colind('Profit')
+
+        for offset in range(len(route.route)):
+            assert route.jumps_remaining(offset) == sum(r[jc] for r in route.route[offset+1:])
+            assert route.sum_value('Profit', through=offset) == \
+                sum(r[pc] for r in route.route[:offset] if isinstance(r[pc], (int, float)))
+        assert route.total_jumps() == 22
+        assert route.sum_value('Profit', through=100) == 2600.5
+        assert route.sum_value('Missing') == 0
+
 
     def test_dist_remaining_at_start(self, harness:TestHarness) -> None:
         route_data = [
@@ -433,6 +701,24 @@ class TestRouteMethods:
         route.update_route(1)  # Now at Apurui
         assert route.refuel() == False  # Apurui doesn't refuel
 
+    def test_refuel_distance(self, harness:TestHarness) -> None:
+        """jumps_to_refuel()/dist_to_refuel() find the next fuel stop at or after the current waypoint."""
+        route_data = [
+            ['Sol', 0, 'No'],
+            ['Apurui', 10.0, 'No'],
+            ['Deciat', 20.0, 'Yes'],
+            ['Bleae Thua', 5.0, 'No']
+        ]
+        hdrs = ['System Name', 'Distance', 'Refuel']
+        route = Route(hdrs, route_data, 0)
+
+        assert (route.jumps_to_refuel(), route.dist_to_refuel()) == (2, 30.0)
+        route.update_route(2)
+        assert (route.jumps_to_refuel(), route.dist_to_refuel()) == (0, 0)
+        assert route.refuel() == True
+        route.update_route(1)
+        assert (route.jumps_to_refuel(), route.dist_to_refuel()) == (None, None)
+
     def test_neutron_check(self, harness:TestHarness) -> None:
         route_data = [
             ['Sol', 0, 'False'],
@@ -467,6 +753,62 @@ class TestRouteMethods:
 
         assert route.get_waypoint(0) == 'None'  # tbls['none']
 
+    def test_colind_schema(self, harness:TestHarness) -> None:
+        """colind() resolves headers, lower-case headers and HEADER_MAP aliases, first match wins."""
+        hdrs = ['System Name', 'Body Name', 'jumps', 'Distance']
+        route = Route(hdrs, [['Sol', 'Earth', 0, 0], ['Deciat', 'Deciat 6', 3, 10.5]], 0)
+
+        assert route.colind() == route.hdrs.index('Body Name')
+        assert route.colind('Jumps') == route.hdrs.index('jumps')
+        assert route.colind('distance') == route.hdrs.index('Distance')
+        assert route.colind(['Neutron', 'system']) == 0
+        assert route.colind('Refuel') is None
+
+    def test_compact_route(self, harness:TestHarness) -> None:
+        """A column-backed route answers exactly like a row-backed one and converts back to rows."""
+        hdrs = ['System Name', 'Distance', 'Jumps', 'Refuel', 'Body Type']
+        rows = lambda: [[f"Sys {i}", 30.5 + i % 3, 1, i % 5 == 0, ['Icy body', 'Rocky body'][i % 2]] for i in range(20)]
+        plain = Route(list(hdrs), rows(), 0, compact=False)
+        compact = Route(list(hdrs), rows(), 0, compact=True)
+
+        for method in ['total_jumps', 'total_dist', 'jumps_to_refuel', 'dist_to_refuel', 'next_stop', 'destination']:
+            assert getattr(plain, method)() == getattr(compact, method)()
+        assert compact.update_route(0, 'Sys 7') == plain.update_route(0, 'Sys 7') == 7
+        assert compact.route == plain.route
+        assert compact.to_dict() == plain.to_dict()
+
+        compact.route[3][4] = 'Water world'
+        assert compact.route[3][4] == 'Water world'
+
+    def test_update_route_loop(self, harness:TestHarness) -> None:
+        """On a loop route a repeated system resolves to the occurrence nearest the current offset."""
+        hdrs = ['System Name', 'Jumps']
+        route_data = [['Colonia', 0], ['Eol Prou', 3], ['Deciat', 4], ['Colonia', 5]]
+        route = Route(hdrs, route_data, -1)
+
+        assert route.update_route(0, 'Colonia') == 0
+        route.offset = 2
+        assert route.update_route(0, 'Colonia') == 3
+        assert route.update_route(0, 'Eol Prou') == 1
+        assert route.update_route(0, 'Sol') == -1
+
+    def test_progress_snapshot(self, harness:TestHarness) -> None:
+        """progress() is cached until the route moves on or a jump is recorded."""
+        route_data = [['Sol', 0, 'No'], ['Apurui', 10, 'Yes'], ['Bleae Thua', 5, 'No']]
+        route = Route(['System Name', 'Jumps', 'Refuel'], route_data, 0)
+
+        prog = route.progress()
+        assert route.progress() is prog
+        assert (prog.total_jumps, prog.jumps_remaining, prog.jumps_to_wp, prog.jumps_to_refuel) == (15, 15, 10, 1)
+
+        route.update_route(1)
+        assert route.progress() is not prog
+        assert (route.progress().jumps_remaining, route.progress().percent) == (5, 67)
+
+        prog = route.progress()
+        route.record_jump('Bleae Thua', 20.0)
+        assert route.progress() is not prog
+
     def test_record_jump(self, harness:TestHarness) -> None:
         route_data = [
             ['Sol', 0]
@@ -483,6 +825,144 @@ class TestRouteMethods:
         assert route.jumps[0][1] == dest
         assert abs(route.jumps[0][2] - dist) < 0.01  # Allow for rounding
 
+    def test_speed_windows(self, harness:TestHarness) -> None:
+        """Speeds cover the selected window, and the jump log stays bounded."""
+        route = Route(['System Name', 'Jumps'], [['Sol', 0], ['Apurui', 10]], 0)
+
+        # One 10 ly jump a minute for two hours
+        for i in range(121):
+            route.jumps.append([1_000_000 + i * 60, f"Sys {i}", 10.0])
+
+        assert route.jumps_per_hour(0) == 121 / 2
+        assert route.dist_per_hour(0) == 1210 / 2
+        assert route.jumps_per_hour(3600) == 61
+        assert route.jumps_per_hour(900) == 16 / 0.25
+
+        route.jumps.size = 50
+        route.clear_jumps()
+        for i in range(200):
+            route.jumps.append([1_000_000 + i * 60, f"Sys {i}", 10.0])
+        assert len(route.jumps) == 50
+        assert route.jumps.count == 200
+        assert route.jumps_per_hour(3600) == 50 / (49 / 60)
+
+    def test_fuel_simulation(self, harness:TestHarness) -> None:
+        """Fuel is simulated along the route, strandings are flagged and fuel changes only rerun jumps to the next refuel."""
+        from Router.fuel import FuelSimulator, jump_fuel
+        ship:Ship = harness.plugin.router.ship
+        rows:list = [[f"S{i}", 0 if i == 0 else ship.range * 0.6, 'Yes' if i % 10 == 0 and i > 0 else 'No'] for i in range(40)]
+        rows[25][1] = ship.range * 1.1 # Too far
+        route:Route = Route(['System Name', 'Distance', 'Refuel'], rows, 0)
+
+        sim:FuelSimulator = FuelSimulator(route, ship)
+        plan = sim.run(0, 0, ship.tank_size)
+        assert plan.at(1)[0] == jump_fuel(ship, ship.range * 0.6, ship.base_mass + ship.tank_size)
+        assert plan.at(1)[1] == ship.tank_size - plan.at(1)[0]
+        assert plan.at(11)[1] > plan.at(9)[1] # Refuelled at row 10
+        assert 25 in plan.stranded
+        assert sim.simulated == 39
+
+        # Less fuel only changes the jumps before the first refuel
+        plan = sim.run(0, 0, 5)
+        fresh = FuelSimulator(route, ship).run(0, 0, 5)
+        assert sim.simulated == 10
+        assert list(plan.left) == list(fresh.left) and plan.stranded == fresh.stranded
+        assert plan.stranded[0] < 10
+
+        # More cargo changes everything
+        plan = sim.run(3, 50, ship.tank_size)
+        assert sim.simulated == 36
+        assert plan.at(4)[0] > jump_fuel(ship, ship.range * 0.6, ship.base_mass + ship.tank_size)
+
+    def test_fuel_neutron_boost(self) -> None:
+        """The jump leaving a neutron star is the one that's supercharged, not the jump to it."""
+        from Router.fuel import FuelSimulator, jump_fuel
+        ship = Mock(range_boost=0, optimal_mass=1000, max_fuel_per_jump=8, fuel_multiplier=0.012, fuel_power=2.45,
+                    base_mass=400, tank_size=32, supercharge_multiplier=4)
+        rows:list = [['A', 0, 1, False], ['B', 30, 1, True], ['C', 100, 1, False], ['D', 30, 1, False]]
+        route:Route = Route(['System Name', 'Distance', 'Jumps', 'Neutron'], rows, 0)
+
+        plan = FuelSimulator(route, ship).run(0, 0, 32)
+        mass:float = ship.base_mass + ship.tank_size
+        assert plan.at(1)[0] == jump_fuel(ship, 30, mass)
+        assert plan.at(2)[0] == jump_fuel(ship, 100, mass, 4)
+        assert plan.at(3)[0] == jump_fuel(ship, 30, mass)
+        assert plan.stranded == []
+
+    def test_jumps_to(self) -> None:
+        """Jumps to a row count the jumps each row covers, not the rows."""
+        route = Route(['System Name', 'Distance', 'Jumps'], [['A', 0, 0], ['B', 300, 4], ['C', 250, 3], ['D', 90, 1]], 0)
+        assert route.jumps_to(2) == 7 and route.jumps_to(3) == 8 and route.jumps_to(0) == 0
+        assert route.jumps_to(3, offset=1) == 4
+        assert Route(['System Name', 'Distance'], [['A', 0], ['B', 30], ['C', 25]], 0).jumps_to(2) == 2
+
+    def test_route_snapshot(self, tmp_path:Path) -> None:
+        """A route saved as a snapshot comes back the same, indexes and all, without being rebuilt."""
+        from Router.route import Route
+        from Router.snapshot import write_snapshot, read_snapshot, SnapshotError
+
+        hdrs:list = ['System Name', 'Bodies', 'Distance', 'Jumps', 'Refuel', 'Neutron', 'Note']
+        for n in [0, 5, 6000]:
+            rows:list = [[f"Sys {i % 4000}", [f"Sys {i} A"] if i % 2 else [], round(20 + i % 13 * 1.5, 2) if i % 4 else 15, i % 3,
+                          'Yes' if i % 40 == 0 else 'No', i % 6 == 0, None if i % 5 else 'x'] for i in range(n)]
+            route = Route(list(hdrs) if n else [], rows, 3)
+            write_snapshot(tmp_path / "route.snap", route, 'abc')
+
+            with patch.object(Route, '_remaining_columns') as derive:
+                id, loaded = read_snapshot(tmp_path / "route.snap")
+            derive.assert_not_called()
+            loaded.offset = 3
+
+            assert id == 'abc'
+            assert loaded.hdrs == route.hdrs
+            assert loaded.route == route.route
+            assert repr([list(r) for r in loaded.route]) == repr([list(r) for r in route.route]) # 15 is still 15, not 15.0
+            assert loaded.progress() == route.progress()
+            assert loaded.update_route(0, 'Sys 2') == route.update_route(0, 'Sys 2')
+
+        (tmp_path / "route.snap").write_bytes(b'NDROUTE\0\x09\x00')
+        with pytest.raises(SnapshotError):
+            read_snapshot(tmp_path / "route.snap")
+
+    def test_column_types(self) -> None:
+        """Every cell comes back from the column store as the type it went in as, not just an equal value."""
+        from Router.columns import ColumnStore, Numbers, Strings
+
+        rows:list = [['A', 15, 3, 12.5, True, None], ['B', 12.5, 1, 0.0, False, 'x'], ['A', 2**40, 0, 1.25, True, None]]
+        store = ColumnStore(rows)
+        assert isinstance(store.columns[1], Numbers)
+        assert [[type(v) for v in r] for r in store.tolist()] == [[type(v) for v in r] for r in rows]
+        assert repr(store.tolist()) == repr(rows)
+
+        store[0][1] = 7.5
+        store[1][1] = 8
+        assert repr(store.column(1)) == repr([7.5, 8, 2**40])
+        store[2][1] = 2**60 # Too big for a float to hold exactly
+        assert store.column(1)[2] == 2**60 and type(store.columns[1]) is list
+
+        names:list = [f"Sys {i}" for i in range(100)]
+        distinct = ColumnStore([[n] for n in names]).columns[0]
+        assert type(distinct) is list and all(v is __import__('sys').intern(v) for v in distinct)
+        assert isinstance(ColumnStore([[n[:5]] for n in names]).columns[0], Strings)
+
+    def test_normalize_column(self) -> None:
+        """Whole column normalization gives exactly what the per-cell number regexes did, whatever the column's kind."""
+        import re
+        from Router.columns import normalize_column
+
+        def per_cell(v):
+            if re.match(r"^(\d+)$", str(v)): return round(int(v), 2)
+            if re.match(r"^\d+\.(\d+)?$", str(v)): return round(float(v), 2)
+            return v
+
+        cells:list = ['', 'Sol', '12', '12.', '12.345', '-5', '1e5', '12\n', '12.5\n', ' 12', '1.2.3', '.5',
+                      'Col 285 Sector', 0, 5, -3, True, False, None, 0.0, -0.0, 1e-5, 1e-4, 3.14159, 1e16, 9.9e15,
+                      float('inf'), -2.5, [1], 2**70]
+        for kind in [None, 'int', 'float', 'str', 'bool']:
+            assert repr(normalize_column(list(cells), kind)) == repr([per_cell(v) for v in cells])
+            for v in cells:
+                assert repr(normalize_column([v], kind)) == repr([per_cell(v)])
+
 
 class TestRouteNavigation:
     """Test moving along a route via real navigation events (FSDJump, !nd chat commands)
@@ -840,6 +1320,20 @@ class TestShipyardSwap:
 
         assert ship.loadout == {}
 
+    def test_module_catalogue(self, harness:TestHarness):
+        """Module data saved as a plain list is indexed by lowercase symbol when loaded."""
+        file:Path = Path(__file__).parent / "data" / "module_data.json"
+        saved:str = file.read_text()
+        catalogue:dict = json.loads(saved)
+        try:
+            file.write_text(json.dumps(list(catalogue.values())))
+            harness.plugin.router._load()
+            assert harness.plugin.modules == catalogue
+            assert all(k == m['symbol'].lower() for k, m in harness.plugin.modules.items())
+            assert harness.plugin.router.ship.range != 32.0
+        finally:
+            file.write_text(saved)
+
     @pytest.mark.parametrize('harness', ['None', 'route_init.json'], indirect=True)
     def test_ship_repr(self, harness:TestHarness):
         """Test ship repr."""
@@ -859,6 +1353,79 @@ class TestShipyardSwap:
         harness.play_sequence('shipyard_swap_unknown')
         assert harness.plugin.router.ship_id == ''
 
+    def test_range_table(self, harness:TestHarness):
+        """Ranges across cargo and fuel levels come from the ship's table and match the formula."""
+        ship:Ship = harness.plugin.router.ship
+        factor:float = (ship.max_fuel_per_jump / ship.fuel_multiplier) ** (1 / ship.fuel_power)
+
+        def formula(mass:float) -> float:
+            return round((ship.optimal_mass / (ship.base_mass + mass)) * factor + ship.range_boost, 2)
+
+        assert len(ship.ranges) == int(ship.cargo_capacity + ship.tank_size) + 1
+        for cargo in (0, 1, ship.cargo_capacity):
+            assert ship.get_range(cargo) == formula(cargo + ship.tank_size)
+            assert ship.get_range(cargo, 0) == formula(cargo)
+        for fuel in (0.37, 10.5, ship.tank_size - 0.01, 7.123): # Dashboard fuel levels, interpolated from the table
+            assert abs(ship.get_range(0, fuel) - formula(fuel)) < 0.011
+            assert abs(ship.get_range(ship.cargo_capacity, fuel) - formula(ship.cargo_capacity + fuel)) < 0.011
+        assert ship.get_range(0, 1) > ship.range > ship.laden_range()
+
+        harness.plugin.router.update_fuel(10.5)
+        menu:dict = harness.plugin.ui._range_dict()
+        assert lbls['range_current'].format(r=ship.get_range(harness.plugin.router.cargo, 10.5)) in menu
+        assert lbls['range_laden'].format(r=ship.laden_range()) in menu
+
+    def test_shipyard_cache(self, harness:TestHarness):
+        """Swapping and picking ships doesn't touch the disk, and an unchanged loadout isn't rewritten."""
+        router = harness.plugin.router
+        store:Path = Path(__file__).parent / "data" / "shipyard.json"
+        assert router.load_ship("1") is not None
+        written:int = store.stat().st_mtime_ns
+
+        with patch('builtins.open', side_effect=AssertionError("disk access")), \
+             patch.object(Path, 'mkdir', side_effect=AssertionError("disk access")):
+            assert router.load_ship("2").name == "Perviy"
+            assert router.load_ship("Shipping Delay") is router.load_ship("1")
+            router.swap_ship("2")
+        assert router.ship_id == "2"
+
+        loadout:dict = dict(router.load_ship("1").as_dict(), timestamp="2030-01-01T00:00:00Z")
+        assert router.shipyard.put(Ship(loadout)) == False
+        assert store.stat().st_mtime_ns == written
+
+        loadout['ShipName'] = "Renamed"
+        assert router.shipyard.put(Ship(loadout)) == True
+        assert json.loads(store.read_text())["1"]["loadout"]["ShipName"] == "Renamed"
+
+
+class TestHttpClient:
+    """Test the shared HTTP client."""
+
+    def test_http_client(self, harness:TestHarness) -> None:
+        """Requests reuse one connection, retry a busy server, use their endpoint's timeout and are timed."""
+        from Router.client import HttpClient, percentile
+        from Router.constants import HTTP_TIMEOUTS
+        server:ModuleServer = ModuleServer({'a.json': b'[1]'})
+        client:HttpClient = HttpClient()
+
+        for _ in range(5):
+            assert client.get('modules', f"{server.url()}/a.json").content == b'[1]'
+        assert len(server.clients) == 1
+
+        server.busy = 1
+        assert client.get('modules', f"{server.url()}/a.json").status_code == 200
+        assert len(server.requests) == 7
+
+        method = Mock(return_value='ok')
+        client.request('typeahead', method, 'url')
+        assert method.call_args.kwargs['timeout'] == HTTP_TIMEOUTS['typeahead']
+
+        stats:dict = client.stats()
+        assert stats['modules']['count'] == 6 and stats['modules']['errors'] == 0
+        assert 0 < stats['modules']['p50'] <= stats['modules']['p90'] <= stats['modules']['p99']
+        assert percentile([1, 2, 3, 4], 50) == 2 and percentile([1, 2, 3, 4], 99) == 4
+        server.shutdown()
+
 
 class TestOverlay:
     """Test overlay functionality."""
@@ -1556,7 +2123,7 @@ class TestPlotMethods:
         neutron_fr.nametowidget("dest_ac").set_text("Colonia", False)
         neutron_fr.nametowidget("range_entry").set_text("50", False)
 
-        with patch('requests.get', side_effect=fake_systems_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_systems_get):
             with patch.object(harness.plugin.router, 'plot_route') as mock_plot_route:
                 ui.plotters['Neutron'].plot()
 
@@ -1582,7 +2149,7 @@ class TestPlotMethods:
         plotter._add_hop_row(-1)
         plotter.hop_rows[0]['ac'].set_text("Deciat", False)
 
-        with patch('requests.get', side_effect=fake_systems_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_systems_get):
             with patch.object(harness.plugin.router, 'plot_route') as mock_plot_route:
                 plotter.plot()
 
@@ -1598,7 +2165,7 @@ class TestPlotMethods:
         galaxy_fr.nametowidget("source_ac").set_text("Sol", False)
         galaxy_fr.nametowidget("dest_ac").set_text("Colonia", False)
 
-        with patch('requests.get', side_effect=fake_systems_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_systems_get):
             with patch.object(harness.plugin.router, 'plot_route') as mock_plot_route:
                 ui.plotters['Galaxy'].plot()
 
@@ -1619,7 +2186,7 @@ class TestPlotMethods:
         rtor_fr.nametowidget("radius_entry").set_text("40", False)
         rtor_fr.nametowidget("max_results_entry").set_text("20", False)
 
-        with patch('requests.get', side_effect=fake_systems_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_systems_get):
             with patch.object(harness.plugin.router, 'plot_route') as mock_plot_route:
                 ui.plotters['RtoR'].plot()
 
@@ -1644,7 +2211,7 @@ class TestPlotMethods:
         rtor_fr.nametowidget("max_results_entry").set_text("20", False)
         rtor_fr.nametowidget("dest_ac").put_placeholder()  # force the placeholder-shown state
 
-        with patch('requests.get', side_effect=fake_systems_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_systems_get):
             with patch.object(harness.plugin.router, 'plot_route') as mock_plot_route:
                 ui.plotters['RtoR'].plot()
 
@@ -1672,7 +2239,7 @@ class TestPlotMethods:
         fr.nametowidget("radius_entry").set_text("40", False)
         fr.nametowidget("max_results_entry").set_text("20", False)
 
-        with patch('requests.get', side_effect=fake_systems_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_systems_get):
             with patch.object(harness.plugin.router, 'plot_route') as mock_plot_route:
                 ui.plotters[route_type].plot()
 
@@ -1698,7 +2265,7 @@ class TestPlotMethods:
         fr.nametowidget("max_results_entry").set_text("10", False)
         fr.nametowidget("min_value_entry").set(5)  # 5 million credits
 
-        with patch('requests.get', side_effect=fake_systems_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_systems_get):
             with patch.object(harness.plugin.router, 'plot_route') as mock_plot_route:
                 ui.plotters['Exobiology'].plot()
 
@@ -1786,7 +2353,7 @@ class TestPlotMethods:
         plotter._add_hop_row(0)
         plotter.hop_rows[1]['ac'].set_text("Colonia", False)
 
-        with patch('requests.get', side_effect=fake_systems_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_systems_get):
             with patch.object(harness.plugin.router, 'plot_route') as mock_plot_route:
                 plotter.plot()
 
@@ -1810,7 +2377,7 @@ class TestPlotMethods:
         plotter._add_hop_row(-1)
         plotter.hop_rows[0]['ac'].set_text("Deciat", False)
 
-        with patch('requests.get', side_effect=fake_systems_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_systems_get):
             with patch.object(harness.plugin.router, 'plot_route') as mock_plot_route:
                 plotter.plot()
 
@@ -1831,7 +2398,7 @@ class TestPlotMethods:
         fr.nametowidget("dest_ac").set_text("Colonia", False)
         fr.nametowidget("range_entry").set_text("50", False)
 
-        with patch('requests.get', side_effect=fake_systems_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_systems_get):
             with patch.object(harness.plugin.router, 'plot_route') as mock_plot_route:
                 plotter.plot()
 
@@ -1856,7 +2423,7 @@ class TestPlotMethods:
         plotter.hop_rows[0]['ac'].set_text("Deciat", False)
         fr.nametowidget("capacity_used_entry").set_text("500", False)
 
-        with patch('requests.get', side_effect=fake_systems_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_systems_get):
             with patch.object(harness.plugin.router, 'plot_route') as mock_plot_route:
                 plotter.plot()
 
@@ -1872,6 +2439,189 @@ class TestPlotMethods:
         assert params['capacity_used'] == 500
         assert params['calculate_starting_fuel'] == "1"
 
+    def test_job_poller_backs_off(self) -> None:
+        """Polls until the job is done, waiting longer each time and at least as long as Retry-After asks."""
+        from Router.poller import JobPoller, retry_after
+        from time import monotonic
+
+        server:ResultsServer = ResultsServer([(202, 0, {}, b'', 0), (202, 0, {'Retry-After': '1'}, b'', 0), (200, 0, {}, b'[1]', 0)])
+        times:list = []
+        with results_client(server) as client:
+            def get(url, **kwargs):
+                times.append(monotonic())
+                return client.endpoint('results').get(url, **kwargs)
+
+            poller = JobPoller(get, f"{server.url()}/job", {}, threading.Event(), 30)
+            response = poller.run()
+            assert response.status_code == 200 and response.content == b'[1]'
+        assert poller.polls == 3 and server.requests == 3
+        assert times[1] - times[0] >= 0.5
+        assert times[2] - times[1] >= 1.0
+        assert retry_after(Mock(headers={'Retry-After': 'soon'})) is None
+
+    def test_job_poller_slow_reply(self) -> None:
+        """A poll that's slow to answer is sent again rather than retried or failed, and a result that stalls part way still downloads."""
+        from Router.poller import JobPoller
+        from Router.constants import POLL_READ
+
+        body:bytes = json.dumps({'status': 'ok', 'result': list(range(50_000))}).encode()
+        server:ResultsServer = ResultsServer([(202, POLL_READ * 2.5, {}, b'', 0), (202, 0, {}, b'', 0),
+                                              (200, POLL_READ * 0.5, {}, body, POLL_READ * 1.5)])
+        with results_client(server) as client:
+            poller = JobPoller(client.endpoint('results').get, f"{server.url()}/job", {}, threading.Event(), 30)
+            response = poller.run()
+            assert response.status_code == 200
+            assert b''.join(response.iter_content(65536)) == body
+        assert poller.polls == 3 and server.requests == 3
+
+    def test_job_poller_budget(self) -> None:
+        """A job that never finishes gives back the pending response once the time budget is spent."""
+        from Router.poller import JobPoller
+
+        pending = Mock(status_code=202, headers={})
+        poller = JobPoller(lambda url, **kwargs: pending, 'https://example/results/job', {}, threading.Event(), 2)
+        assert poller.run() is pending
+        assert poller.elapsed() <= 2.5
+        assert poller.polls <= 4
+
+    def test_job_poller_cancel(self) -> None:
+        """Cancelling gives up on a poll that's waiting on a slow reply within its read timeout and closes a late response."""
+        from Router.poller import JobPoller
+        from Router.constants import POLL_READ
+
+        server:ResultsServer = ResultsServer([(202, 10, {}, b'', 0)])
+        cancel = threading.Event()
+        with results_client(server) as client:
+            poller = JobPoller(client.endpoint('results').get, f"{server.url()}/job", {}, cancel, 30)
+            threading.Timer(0.2, cancel.set).start()
+            assert poller.run() is None
+            assert poller.elapsed() < POLL_READ + 0.5
+
+        late = Mock(status_code=200, headers={})
+        cancel = threading.Event()
+        def slow_get(url, *args, **kwargs):
+            cancel.set()
+            return late
+
+        assert JobPoller(slow_get, 'https://example/results/job', {}, cancel, 30).run() is None
+        late.close.assert_called_once()
+
+    def test_plot_cache(self, tmp_path:Path) -> None:
+        """Equivalent plots share a cache entry, which expires after its route type's TTL."""
+        from Router.plot_cache import PlotCache
+
+        cache = PlotCache(tmp_path)
+        params = {'from': 'Sol', 'to': 'Colonia', 'range': '32.50', 'max_time': 20}
+        same = {'to': ' colonia', 'from': 'SOL', 'range': 32.5, 'max_time': 60}
+        assert cache.key('Neutron', params) == cache.key('Neutron', same)
+        assert cache.key('Neutron', params) != cache.key('Galaxy', params)
+        assert cache.key('Neutron', params) != cache.key('Neutron', params | {'range': '33'})
+
+        assert cache.get('Neutron', params) is None
+        cache.put('Neutron', params, ['System Name', 'Jumps'], [['Sol', 0], ['Colonia', 100]])
+        assert cache.get('Neutron', same) == (['System Name', 'Jumps'], [['Sol', 0], ['Colonia', 100]])
+
+        # Trade routes go stale after an hour
+        cache.put('Trade', params, ['System Name'], [['Sol']])
+        with patch('Router.plot_cache.time', return_value=__import__('time').time() + 7200):
+            assert cache.get('Trade', params) is None
+            assert cache.get('Neutron', params) is not None
+
+    def test_plot_cache_systems(self, tmp_path:Path) -> None:
+        """The cached routes' systems are listed without reading the routes, and listed for routes cached before that."""
+        from Router.plot_cache import PlotCache
+
+        cache = PlotCache(tmp_path)
+        cache.put('Neutron', {'from': 'Sol'}, ['System Name', 'Jumps'], [['Sol', 0], ['Colonia', 100]])
+        cache.put('Trade', {'from': 'Lave'}, ['Jumps'], [[1]])
+        with patch('Router.plot_cache.json.load') as load:
+            assert sorted(cache.systems()) == ['Colonia', 'Sol']
+            load.assert_not_called()
+
+        # A route cached before the lists were kept gets one the first time
+        older = tmp_path / f"{cache.key('Galaxy', {'from': 'Achenar'})}.json"
+        older.write_text(json.dumps({'which': 'Galaxy', 'time': 0, 'hdrs': ['System Name'], 'route': [['Achenar'], ['Maia']]}))
+        assert sorted(cache.systems()) == ['Achenar', 'Colonia', 'Maia', 'Sol']
+        assert older.with_suffix('.systems').read_text().split() == ['Achenar', 'Maia']
+
+        cache.clear()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_plot_cache_eviction(self, tmp_path:Path) -> None:
+        """The least recently used routes are dropped once the cache is over its size."""
+        from Router.plot_cache import PlotCache
+        import os
+
+        cache = PlotCache(tmp_path, size=3000)
+        rows = [[f"System {i}", i] for i in range(40)]
+        for i in range(3):
+            cache.put('Neutron', {'from': f"Start {i}"}, ['System Name', 'Jumps'], rows)
+            f = tmp_path / f"{cache.key('Neutron', {'from': f'Start {i}'})}.json"
+            os.utime(f, (1000 + i, 1000 + i))
+        cache.get('Neutron', {'from': 'Start 0'}) # Touch the oldest
+
+        cache.put('Neutron', {'from': 'Start 3'}, ['System Name', 'Jumps'], rows)
+        assert cache.get('Neutron', {'from': 'Start 0'}) is not None
+        assert cache.get('Neutron', {'from': 'Start 3'}) is not None
+        assert cache.get('Neutron', {'from': 'Start 1'}) is None
+
+    def test_typeahead_cache(self, tmp_path:Path) -> None:
+        """Complete suggestions answer longer input locally, they expire, the least recently used go and they're saved."""
+        from Router.typeahead import TypeaheadCache
+
+        cache = TypeaheadCache(tmp_path / "typeahead.json", size=3)
+        assert cache.get('systems', 'Col') is None
+        cache.put('systems', 'Col ', ['Colonia', 'Col 285 Sector AA-A a1', 'Colonia Hub'])
+        assert cache.get('systems', 'col') == ['Colonia', 'Col 285 Sector AA-A a1', 'Colonia Hub']
+        assert cache.get('systems', 'Colon') == ['Colonia', 'Colonia Hub']
+        assert cache.get('systems', 'Colx') == []
+
+        # A full reply might be missing matches so isn't filtered
+        cache.put('systems', 'Sag', [f"Sag {i}" for i in range(10)])
+        assert cache.get('systems', 'Sag 1') is None
+
+        cache.put('stations', 'Jam', ['Shinrarta Dezhra / Jameson Memorial', 'Sol / Jamestown'])
+        assert cache.get('stations', 'Jameson', match=lambda s: s.split(' / ', 1)[-1]) == ['Shinrarta Dezhra / Jameson Memorial']
+
+        cache.get('systems', 'Col') # Touch it so Sag is the oldest
+        cache.put('systems', 'Bleae', ['Bleae Thua'])
+        assert cache.get('systems', 'Sag') is None
+        cache.save()
+
+        saved = TypeaheadCache(tmp_path / "typeahead.json")
+        assert saved.get('systems', 'Bleae') == ['Bleae Thua']
+        with patch('Router.typeahead.time', return_value=__import__('time').time() + 86400 * 8):
+            assert saved.get('systems', 'Bleae') is None
+
+        # Saved along the way, not only when EDMC stops
+        from Router.constants import TYPEAHEAD_SAVE_EVERY
+        busy = TypeaheadCache(tmp_path / "busy.json")
+        for i in range(TYPEAHEAD_SAVE_EVERY - 1):
+            busy.put('systems', f"Sys {i}", [f"Sys {i} A"])
+        assert not (tmp_path / "busy.json").exists()
+        busy.put('systems', 'Sol', ['Sol'])
+        assert TypeaheadCache(tmp_path / "busy.json").get('systems', 'Sol') == ['Sol']
+        assert not busy.dirty
+
+    def test_system_index(self, tmp_path:Path) -> None:
+        """Known systems are completed by prefix and found whatever their case, including ones from a dump."""
+        from Router.system_index import SystemIndex
+
+        index = SystemIndex()
+        assert index.add(['Colonia', 'Sol', 'colonia', '', None, 'Col 285 Sector AA-A a1']) == 3
+        assert index.search('col') == ['Col 285 Sector AA-A a1', 'Colonia']
+        assert index.search('Colon') == ['Colonia']
+        assert index.search('So') == [] # Too short to look up
+        assert index.find('SOL') == 'Sol' and index.find('Sagittarius A*') is None
+
+        (tmp_path / "systems.txt").write_text('[\n{"id64":1,"name":"Sagittarius A*"},\n{"id64":2,"name":"Sadr"}\n]\nSag Sector\n')
+        index.load(tmp_path / "systems.txt")
+        assert index.search('Sa', limit=5) == [] and index.search('Sag') == ['Sag Sector', 'Sagittarius A*']
+
+        index.add(f"Bleae Thua AA-A h{i}" for i in range(100)) # Enough to be merged rather than inserted
+        assert len(index) == 106 and len(index.search('Bleae')) == 10
+        assert index.keys == sorted(index.keys)
+
 
 
 class TestUIFunctions:
@@ -1899,9 +2649,70 @@ class TestUIFunctions:
             ]).encode()
             return resp
 
-        with patch('requests.get', side_effect=fake_get):
+        with patch('Router.client.HTTP.session.get', side_effect=fake_get):
             assert ui.query_station_names('Jameson') == ['Shinrarta Dezhra / Jameson Memorial']
 
+    def test_query_systems_cached(self, harness:TestHarness) -> None:
+        """ Repeated and longer input is answered from the typeahead cache without asking Spansh again """
+        ui = harness.plugin.ui
+
+        def fake_get(url, *args, **kwargs):
+            resp = Mock()
+            resp.status_code = 200
+            resp.content = json.dumps(['Colonia', 'Colonia Hub', 'Col 285 Sector AA-A a1']).encode()
+            return resp
+
+        with patch('Router.client.HTTP.session.get', side_effect=fake_get) as get:
+            assert ui.query_systems('Col') == ['Colonia', 'Colonia Hub', 'Col 285 Sector AA-A a1']
+            assert ui.query_systems('col') == ['Colonia', 'Colonia Hub', 'Col 285 Sector AA-A a1']
+            assert ui.query_systems('Colonia H') == ['Colonia Hub']
+            assert get.call_count == 1
+
+    def test_dispatcher_refused(self) -> None:
+        """ When Tk won't schedule a run only the callback being posted is lost, the rest go with the next post """
+        from Router.utils.th import Dispatcher
+        d = Dispatcher()
+        ran:list = []
+        d.post(ran.append, 'early') # Before there's a window, so it waits
+
+        root = Mock()
+        root.winfo_toplevel.return_value = root
+        root.after_idle.side_effect = RuntimeError("main thread is not in main loop")
+        d.attach(root)
+        d.post(ran.append, 'refused')
+        assert [args for _, args in d.waiting] == [('early',)]
+
+        root.after_idle.side_effect = None
+        d.post(ran.append, 'later')
+        root.after_idle.assert_called_with(d._run)
+        d._run()
+        assert ran == ['early', 'later'] and d.waiting == []
+
+    def test_plot_progress(self, harness:TestHarness) -> None:
+        """ Progress from the plotting thread reaches the label through the dispatcher, not the frame's timers """
+        ui = harness.plugin.ui
+        ui.show_spinner = True
+        with patch.object(ui.busy_fr, 'after') as after:
+            worker = threading.Thread(target=ui.plot_progress, args=(12.3, 7.6))
+            worker.start()
+            worker.join(5)
+            after.assert_not_called()
+        harness._pump_ui(0.2)
+        assert ui.eta_lbl['text'] == lbls["plot_remaining"].format(e=12, r=8)
+        ui.show_spinner = False
+
+    def test_system_index_routes(self, harness:TestHarness) -> None:
+        """ The current route's systems are indexed and validate without asking Spansh """
+        router = harness.plugin.router
+        router._indexer.join(10)
+        names:list = harness.plugin.route.column(harness.plugin.route.sc)
+        assert names != [] and all(router.systems.find(n) == n for n in names)
+
+        plotter = harness.plugin.ui.plotters['Neutron']
+        with patch('Router.client.HTTP.session.get') as get:
+            assert plotter._validate_system(names[-1].upper(), Mock()) == names[-1]
+            get.assert_not_called()
+
     def test_switch_ship(self, harness:TestHarness) -> None:
         ui = harness.plugin.ui
 
@@ -1964,6 +2775,42 @@ class TestUIFunctions:
         assert ui.get_item('Galaxy', 'cargo_entry') == '12'
         assert ui.get_item('Neutron', 'range_entry') == str(harness.plugin.router.ship.get_range(12))
 
+    def test_autocompleter_debounce(self, harness:TestHarness) -> None:
+        """ Typing only looks up what's there once it pauses and results for older input are never shown """
+        import time
+        calls:list = []
+        ac = th.Autocompleter(harness.plugin.ui.frame, 'System', func=lambda inp: calls.append(inp) or [inp.upper()])
+        for text in ('Col', 'Colo', 'Colon', 'Colonia'):
+            ac.var.set(text)
+
+        deadline:float = time.monotonic() + 5
+        while ac.lb.size() == 0 and time.monotonic() < deadline:
+            harness._pump_ui(0.05)
+            time.sleep(0.02)
+        assert calls == ['Colonia']
+        assert ac.lb.get(0, tk.END) == ('COLONIA',)
+
+        ac.deliver(ac.seq - 1, ['COL']) # A late reply to earlier input
+        assert ac.lb.get(0, tk.END) == ('COLONIA',)
+        ac.destroy()
+
+    def test_autocompleter_coalescing(self) -> None:
+        """ The same lookup from several entries at once is only made once """
+        from Router.utils.th.autocompleter import lookup
+        release:threading.Event = threading.Event()
+        calls:list = []
+        def func(inp:str) -> list:
+            calls.append(inp)
+            release.wait(5)
+            return [inp]
+
+        first = lookup(func, 'Colonia')
+        assert lookup(func, 'Colonia') is first
+        other = lookup(func, 'Sol')
+        release.set()
+        assert first.result(5) == ['Colonia'] and other.result(5) == ['Sol']
+        assert sorted(calls) == ['Colonia', 'Sol']
+
 
 class TestRouteWindow:
     """Test RouteWindow lifecycle and display behavior."""
@@ -2584,3 +3431,250 @@ class TestEventSequences:
         assert harness.plugin.router.carrier_state == CarrierStates.Jumping
         harness.fire_event(events[1])
         assert harness.plugin.router.carrier_state == CarrierStates.Cooldown
+
+
+def _galaxy_rows(n:int) -> list:
+    """ Synthetic one-row-per-jump route of n rows """
+    return [[f"Sys {i}", round(30 + (i % 17) * 1.5, 2), (i % 3) + 1, 'Yes' if i % 50 == 0 else 'No'] for i in range(n)]
+
+
+class TestPerformance:
+    """Benchmarks for route handling on large routes (prints timings, asserts the scaling)."""
+
+    def test_idle_timers(self, harness:TestHarness) -> None:
+        """Autocompleters don't poll, so an idle UI runs far fewer timer callbacks than the 10/s each used to."""
+        from time import monotonic, sleep
+
+        def walk(w:tk.Misc) -> Generator:
+            yield w
+            for c in w.winfo_children(): yield from walk(c)
+        count:int = sum(isinstance(w, th.Autocompleter) for w in walk(harness.root))
+
+        harness._pump_ui(0.2)
+        scheduler = harness._tk_scheduler
+        start:int = scheduler.enqueued_count
+        t:float = monotonic()
+        while monotonic() - t < 1:
+            harness._pump_ui(0.1)
+            sleep(0.05)
+        rate:float = (scheduler.enqueued_count - start) / (monotonic() - t)
+        print(f"{count} autocompleters, {rate:.1f} timer callbacks/s idle, polling was {count * 10}/s")
+        assert count > 0 and rate < count * 10 / 4
+
+    @pytest.mark.slow
+    def test_route_construction_scaling(self) -> None:
+        """Route construction (derived columns and indexes) scales linearly from 1k to 200k rows."""
+        from time import perf_counter
+        hdrs:list = ['System Name', 'Distance', 'Jumps', 'Refuel']
+        per_row:dict = {}
+        for n in [1_000, 10_000, 100_000, 200_000]:
+            best:float = float('inf')
+            for _ in range(3):
+                rows:list = _galaxy_rows(n)
+                start:float = perf_counter()
+                Route(list(hdrs), rows, 0)
+                best = min(best, perf_counter() - start)
+            per_row[n] = best / n
+            print(f"Route({n} rows): {best*1000:.1f} ms ({per_row[n]*1e6:.2f} us/row)")
+
+        assert per_row[200_000] < per_row[1_000] * 5
+
+    @pytest.mark.slow
+    def test_route_memory(self) -> None:
+        """A 50k row riches route held as columns takes a fraction of the memory of row lists."""
+        import tracemalloc
+        hdrs:list = ['System Name', 'Body Name', 'Body Subtype', 'Is Terraformable', 'Distance To Arrival',
+                     'Estimated Scan Value', 'Estimated Mapping Value', 'Jumps']
+        subtypes:list = ['High metal content world', 'Icy body', 'Rocky body', 'Water world', 'Earth-like world']
+
+        def riches(n:int) -> list:
+            return [[f"Sys {i//4}", f"Sys {i//4} {i%4+1}", subtypes[i % 5], i % 7 == 0, round(100 + i * 1.37, 2),
+                     300000 + i % 1000, 900000 + i % 3000, 1 if i % 4 == 0 else 0] for i in range(n)]
+
+        used:dict = {}
+        for compact in [False, True]:
+            tracemalloc.start()
+            route:Route = Route(list(hdrs), riches(50_000), 0, compact=compact)
+            used[compact] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            assert route.total_jumps() == 12_499
+            del route
+            print(f"{'Columns' if compact else 'Rows'}: {used[compact] / 2**20:.1f} MB")
+
+        assert used[True] < used[False] / 2
+
+    @pytest.mark.slow
+    def test_result_normalization(self) -> None:
+        """Normalizing a 100k row riches result column by column matches the per-cell regexes, only faster."""
+        import re
+        from time import perf_counter
+        from Router.columns import normalize_column
+
+        subtypes:list = ['High metal content world', 'Icy body', 'Rocky body', 'Water world', 'Earth-like world']
+        res:list = [{'system': f"Sys {i//4}", 'jumps': 1 if i % 4 == 0 else 0, 'body_name': f"Sys {i//4} {i%4+1}",
+                     'subtype': subtypes[i % 5], 'is_terraformable': i % 7 == 0,
+                     'distance_to_arrival': 100 + i * 1.3717, 'estimated_scan_value': 300000 + i % 1000,
+                     'estimated_mapping_value': 900000.0 + i % 3000} for i in range(100_000)]
+        cols:list = list(res[0].keys())
+
+        def per_cell(rows:list) -> list:
+            out:list = []
+            for waypoint in rows:
+                r:list = []
+                for c in cols:
+                    if re.match(r"^(\d+)$", str(waypoint.get(c, ''))):
+                        r.append(round(int(waypoint.get(c, 0)), 2))
+                        continue
+                    if re.match(r"^\d+\.(\d+)?$", str(waypoint.get(c, ''))):
+                        r.append(round(float(waypoint.get(c, 0)), 2))
+                        continue
+                    r.append(waypoint.get(c, ''))
+                out.append(r)
+            return out
+
+        def by_column(rows:list) -> list:
+            return [list(r) for r in zip(*[normalize_column([w.get(c, '') for w in rows]) for c in cols])]
+
+        # And the same again as CSV text
+        text:list = [{c: str(v) for c, v in w.items()} for w in res]
+
+        timings:dict = {}
+        for name, fn, rows in [('per cell', per_cell, res), ('by column', by_column, res),
+                               ('csv per cell', per_cell, text),
+                               ('csv by column', by_column, text)]:
+            start:float = perf_counter()
+            timings[name] = (fn(rows), perf_counter() - start)
+            print(f"{name}: {timings[name][1]*1000:.0f} ms")
+
+        assert timings['by column'][0] == timings['per cell'][0]
+        assert timings['csv by column'][0] == timings['csv per cell'][0]
+        assert timings['by column'][1] < timings['per cell'][1] / 3
+        assert timings['csv by column'][1] < timings['csv per cell'][1] / 1.5
+
+    @pytest.mark.slow
+    def test_streamed_result_memory(self) -> None:
+        """Streaming a large riches or trade result, built from the route fixtures, into the route's rows peaks at a fraction of the RSS of loading it whole."""
+        import csv
+        import subprocess
+        from Router.constants import SPANSH_RICHES_ROUTE, SPANSH_TRADE_ROUTE
+
+        config_dir:Path = Path(__file__).parent / "config"
+
+        # Spansh's result shapes, filled from the riches and neutron route fixtures repeated out to a long route
+        with open(config_dir / "riches-Apurui-M23.csv", newline='') as f:
+            bodies:list = list(csv.DictReader(f))
+        systems:dict = {}
+        for b in bodies:
+            systems.setdefault(b['System Name'], {'name': b['System Name'], 'jumps': int(b['Jumps']), 'bodies': []})['bodies'].append(
+                {'name': b['Body Name'], 'subtype': b['Body Subtype'], 'is_terraformable': b['Is Terraformable'] == 'Yes',
+                 'distance_to_arrival': float(b['Distance To Arrival']), 'estimated_scan_value': int(b['Estimated Scan Value']),
+                 'estimated_mapping_value': int(b['Estimated Mapping Value']), 'type': 'Planet'})
+        riches:dict = {'job': 'riches', 'status': 'ok', 'result': [
+            sys | {'name': f"{sys['name']} {n}", 'bodies': [b | {'name': f"{b['name']} {n}"} for b in sys['bodies']]}
+            for n in range(120) for sys in systems.values()]}
+
+        with open(config_dir / "route-Bleae-Voqooe.csv", newline='') as f:
+            hops:list = list(csv.DictReader(f))
+        trade:dict = {'job': 'trade', 'status': 'ok', 'result': [
+            {'source': {'system': f"{a['System Name']} {n}", 'station': f"{a['System Name']} Port"},
+             'destination': {'system': f"{b['System Name']} {n}", 'station': f"{b['System Name']} Port", 'distance_to_arrival': 120.5},
+             'distance': float(b['Distance']), 'cumulative_profit': (n * len(hops) + i) * 250000,
+             'commodities': [{'name': f"Goods {c}", 'amount': 720, 'profit': 1500 + c, 'total_profit': 720 * (1500 + c)}
+                             for c in range(4)]}
+            for n in range(1000) for i, (a, b) in enumerate(zip(hops, hops[1:]))]}
+
+        # Each way runs in its own process, fetching the result over HTTP, so the peak RSS includes what
+        # requests, urllib3 and the decoders hold outside Python's own allocations
+        child:str = """
+import hashlib, json, re, resource, sys
+def peak_rss():
+    # ru_maxrss starts at the parent's peak on Linux, this process's own high water mark doesn't
+    try:
+        with open('/proc/self/status') as f: return int(re.search(r'VmHWM:\\s+(\\d+)', f.read()).group(1)) * 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+sys.path[:0] = [sys.argv[4], sys.argv[4] + '/tests/edmc']
+import tests.edmc.requests
+import tests.edmc.mocks
+tests.edmc.requests.live_requests(True)
+import requests
+from Router.route_manager import flatten_bodies_result, flatten_trade_result, result_waypoints, route_rows
+from Router.constants import STREAM_CHUNK, SPANSH_TRADE_ROUTE
+how, server, url = sys.argv[1:4]
+before = peak_rss()
+if how == 'loaded':
+    flatten = flatten_trade_result if url == SPANSH_TRADE_ROUTE else flatten_bodies_result
+    rows = route_rows(list(flatten(json.loads(requests.Session().get(server).content)['result'])))
+else:
+    rows = route_rows(result_waypoints(url, requests.Session().get(server, stream=True).iter_content(STREAM_CHUNK)))
+peak = peak_rss() - before
+print(json.dumps({'peak': peak, 'rows': len(rows[1]), 'digest': hashlib.sha1(repr(rows).encode()).hexdigest()}))
+"""
+        root:str = str(Path(__file__).parent.parent)
+        for name, url, doc in [('Riches', SPANSH_RICHES_ROUTE, riches), ('Trade', SPANSH_TRADE_ROUTE, trade)]:
+            content:bytes = json.dumps(doc).encode()
+            server:ResultsServer = ResultsServer([(200, 0, {}, content, 0)])
+            runs:dict = {}
+            for how in ['loaded', 'streamed']:
+                out = subprocess.run([sys.executable, '-c', child, how, server.url(), url, root],
+                                     capture_output=True, text=True, timeout=300, cwd=root)
+                assert out.returncode == 0, out.stderr
+                runs[how] = json.loads(out.stdout.strip().splitlines()[-1])
+            server.shutdown()
+
+            print(f"{name} ({len(content) / 2**20:.1f} MB, {runs['streamed']['rows']} rows): loaded "
+                  f"{runs['loaded']['peak'] / 2**20:.1f} MB, streamed {runs['streamed']['peak'] / 2**20:.1f} MB peak RSS")
+            assert runs['streamed']['digest'] == runs['loaded']['digest']
+            assert runs['streamed']['peak'] < runs['loaded']['peak'] / 2
+
+    def test_stream_split_value(self) -> None:
+        """A value split over many chunks is decoded once it's all arrived, not again with every chunk."""
+        import Router.jsonstream
+        from Router.jsonstream import iter_items
+
+        doc:dict = {'result': [{'name': 'Sol', 'bodies': [{'name': f"Body \"{i}\"\\", 'v': i} for i in range(40_000)]}, 'x']}
+        content:bytes = json.dumps(doc).encode()
+        decoded:list = []
+
+        class Counting(json.JSONDecoder):
+            def raw_decode(self, s, idx=0):
+                decoded.append(len(s) - idx)
+                return super().raw_decode(s, idx)
+
+            def decode(self, s, *args, **kwargs):
+                decoded.append(len(s))
+                return super().decode(s, *args, **kwargs)
+
+        with patch.object(Router.jsonstream, 'DECODER', Counting()):
+            chunks = (content[i:i + 65536] for i in range(0, len(content), 65536))
+            assert list(iter_items(chunks, 'result')) == doc['result']
+        assert sum(decoded) < len(content) * 3
+
+    @pytest.mark.slow
+    def test_snapshot_startup(self, tmp_path:Path) -> None:
+        """Loading a 200k row route from a snapshot is much quicker than from JSON."""
+        from time import perf_counter
+        from Router.snapshot import write_snapshot, read_snapshot
+
+        route:Route = Route(['System Name', 'Distance', 'Jumps', 'Refuel'], _galaxy_rows(200_000), 0)
+        write_snapshot(tmp_path / "route.snap", route, 'abc')
+        hdrs, rows = route.to_dict()[0:2]
+        (tmp_path / "route_body.json").write_text(json.dumps({'id': 'abc', 'hdrs': hdrs, 'route': rows}, separators=(',', ':')))
+
+        def from_json() -> Route:
+            with open(tmp_path / "route_body.json") as f:
+                body:dict = json.load(f)
+            return Route(body['hdrs'], body['route'])
+
+        timings:dict = {}
+        for name, load in [('json', from_json), ('snapshot', lambda: read_snapshot(tmp_path / "route.snap")[1])]:
+            best:float = float('inf')
+            for _ in range(3):
+                start:float = perf_counter()
+                loaded:Route = load()
+                best = min(best, perf_counter() - start)
+            assert loaded.total_jumps() == route.total_jumps()
+            timings[name] = best
+            print(f"{name}: {best*1000:.0f} ms")
+
+        assert timings['snapshot'] < timings['json'] / 3